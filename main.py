@@ -10,7 +10,7 @@ import sys
 
 from PySide2 import QtWidgets
 
-from nuke_color_harmony.controller import Controller
+from nuke_color_harmony.controller import attach
 from nuke_color_harmony.view import ColorHarmonyUi
 
 
@@ -20,7 +20,7 @@ def start_from_main():
     """
     app = QtWidgets.QApplication(sys.argv)
     view_ = ColorHarmonyUi()
-    controller = Controller(view_)
+    controller = attach(view_)
     controller.view.raise_()
     controller.view.show()
 
@@ -4,13 +4,17 @@ import nuke
 import nukescripts
 
 from nuke_color_harmony import controller as harmony_controller
-from nuke_color_harmony import view as harmony_view
+from nuke_color_harmony import remote as harmony_remote
+# Used by name: Nuke evaluates the widget of the registered panel in the
+# namespace menu.py runs in.
+from nuke_color_harmony import view as harmony_view  # noqa: F401
 
 
 def add_to_menus():
 
     menu = nuke.menu("Nuke").addMenu("fhofmann")
     menu.addCommand("nuke_color_harmony", harmony_controller.start)
+    menu.addCommand("nuke_color_harmony Live Link Receiver", harmony_remote.serve)
     pane = nuke.getPaneFor("Properties.1")
     nukescripts.panels.registerWidgetAsPanel("harmony_view.ColorHarmonyUi", "Color Harmony",
                                              "de.kombinat-13b.ColorHarmonyUi", True).addToPane(pane)
@@ -1 +1,7 @@
 IDENTIFIER_NAME = "nuke_color_harmony"
+
+try:
+    import nuke  # noqa: F401
+    IN_NUKE = True
+except ImportError:
+    IN_NUKE = False
@@ -0,0 +1,146 @@
+"""
+This module holds the sampling of animated harmonies into Nuke curves.
+
+An animation is sampled for all frames and all colors into one flat list of
+rgb tuples, frame major, so color transforms can run over it in one pass. The
+samples of every channel are then reduced to the keys needed to reproduce them
+with linear interpolation and written as Nuke curve strings, which can be put
+straight into a .nk script or applied to a knob with fromScript.
+
+Functions:
+    morph
+    hue_rotation
+    reduce_keys
+    curve
+    to_curves
+"""
+
+from nuke_color_harmony.colorspace import (linear_to_oklab, linear_to_srgb,
+                                           oklab_to_linear, oklch_to_srgb,
+                                           srgb_to_linear, srgb_to_oklch)
+
+TOLERANCE = 0.0005
+
+
+def _progress(first: int, last: int) -> list:
+    frames = last - first
+    return [offset / frames if frames else 1.0 for offset in range(frames + 1)]
+
+
+def morph(start: list, end: list, first: int, last: int) -> list:
+    """
+    Sample a morph between two palettes, interpolated in OKLab.
+
+    Palettes of different length are matched by repeating the end palette.
+
+    Args:
+        start (list): Display referred rgb tuples at the first frame.
+        end (list): Display referred rgb tuples at the last frame.
+        first (int): First frame.
+        last (int): Last frame.
+
+    Returns:
+        list: Display referred rgb tuples, frame major.
+    """
+    start_labs = [linear_to_oklab(srgb_to_linear(rgb)) for rgb in start]
+    end_labs = [linear_to_oklab(srgb_to_linear(end[index % len(end)])) for index in range(len(start))]
+    deltas = [tuple(b - a for a, b in zip(start_lab, end_lab))
+              for start_lab, end_lab in zip(start_labs, end_labs)]
+
+    return [linear_to_srgb(oklab_to_linear((lightness + delta_l * progress,
+                                            a + delta_a * progress,
+                                            b + delta_b * progress)))
+            for progress in _progress(first, last)
+            for (lightness, a, b), (delta_l, delta_a, delta_b) in zip(start_labs, deltas)]
+
+
+def hue_rotation(rgbs: list, first: int, last: int, degrees: float = 360.0) -> list:
+    """
+    Sample a rotation of the hue of all colors in OKLCH, keeping lightness and chroma.
+
+    Args:
+        rgbs (list): Display referred rgb tuples at the first frame.
+        first (int): First frame.
+        last (int): Last frame.
+        degrees (float, optional): Rotation reached at the last frame. Defaults to 360.
+
+    Returns:
+        list: Display referred rgb tuples, frame major.
+    """
+    lchs = srgb_to_oklch(rgbs)
+    return oklch_to_srgb([(lightness, chroma, hue + degrees * progress)
+                          for progress in _progress(first, last)
+                          for lightness, chroma, hue in lchs])
+
+
+def reduce_keys(values: list, tolerance: float = TOLERANCE) -> list:
+    """
+    Get the indices of the keys needed to reproduce the values with linear interpolation.
+
+    Every segment between two keys stays within the tolerance of all values it spans.
+    The keys are found in a single pass by narrowing the range of valid slopes.
+
+    Args:
+        values (list): Value per frame.
+        tolerance (float, optional): Maximum deviation. Defaults to TOLERANCE.
+
+    Returns:
+        list: Indices of the keys.
+    """
+    if len(values) < 3:
+        return list(range(len(values)))
+
+    keys = [0]
+    anchor, anchor_value = 0, values[0]
+    low, high = float("-inf"), float("inf")
+    for index in range(1, len(values)):
+        value = values[index]
+        if not low <= (value - anchor_value) / (index - anchor) <= high:
+            anchor, anchor_value = index - 1, values[index - 1]
+            keys.append(anchor)
+            low, high = float("-inf"), float("inf")
+        distance = index - anchor
+        low = max(low, (value - tolerance - anchor_value) / distance)
+        high = min(high, (value + tolerance - anchor_value) / distance)
+    keys.append(len(values) - 1)
+    return keys
+
+
+def curve(first: int, values: list, tolerance: float = TOLERANCE) -> str:
+    """
+    Format the values of consecutive frames as linear Nuke curve.
+
+    Args:
+        first (int): Frame of the first value.
+        values (list): Value per frame.
+        tolerance (float, optional): Maximum deviation. Defaults to TOLERANCE.
+
+    Returns:
+        str: Curve, like {curve L x1 0.5 x100 0.7}.
+    """
+    parts = ["{curve L"]
+    previous = None
+    for index in reduce_keys(values, tolerance):
+        if previous is None or index != previous + 1:
+            parts.append(f"x{first + index}")
+        parts.append(f"{values[index]:.6g}")
+        previous = index
+    return " ".join(parts) + "}"
+
+
+def to_curves(samples: list, amount: int, first: int, tolerance: float = TOLERANCE) -> list:
+    """
+    Split frame major samples into one curve per color and channel.
+
+    Args:
+        samples (list): Rgb tuples, frame major.
+        amount (int): Amount of colors per frame.
+        first (int): First frame.
+        tolerance (float, optional): Maximum deviation. Defaults to TOLERANCE.
+
+    Returns:
+        list: Tuple of red, green and blue curve per color.
+    """
+    return [tuple(curve(first, [rgb[channel] for rgb in samples[index::amount]], tolerance)
+                  for channel in range(3))
+            for index in range(amount)]
@@ -0,0 +1,205 @@
+"""
+This module holds a bounded least recently used cache with counters for profiling.
+
+Every cache registers itself by name, so all caches of a session can be
+inspected in one place. Besides the amount of entries, a cache can be bounded
+by a budget in bytes. The size of every entry is then estimated once on put.
+
+Classes:
+    LruCache
+
+Functions:
+    cache_stats
+    format_stats
+"""
+
+from collections import OrderedDict
+
+from nuke_color_harmony.memory import estimate_size
+
+CACHES = {}
+
+
+class LruCache(object):
+    """
+    Bounded mapping which drops the least recently used entry once full.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, maxbytes: int = None) -> None:
+        """
+        Args:
+            name (str): Name to register the cache under.
+            maxsize (int, optional): Maximum amount of entries. Defaults to 1024.
+            maxbytes (int, optional): Budget in bytes. Defaults to None, unbounded.
+        """
+        self._name = name
+        self._maxsize = maxsize
+        self._maxbytes = None
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        CACHES[name] = self
+        self.maxbytes = maxbytes
+
+    def get(self, key, default=None):
+        """
+        Get the value of the given key and mark it as recently used.
+
+        Args:
+            key (hashable): Key to look up.
+            default (optional): Returned on a miss. Defaults to None.
+
+        Returns:
+            Cached value or default.
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value) -> None:
+        """
+        Store the given value, dropping the least recently used entries if full or
+        over budget.
+
+        Args:
+            key (hashable): Key to store the value under.
+            value: Value to store.
+        """
+        if self._maxbytes is not None:
+            size = estimate_size((key, value))
+            self._bytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Drop least recently used entries until the cache is within size and budget.
+        """
+        while len(self._entries) > self._maxsize or (
+                self._maxbytes is not None and self._bytes > self._maxbytes and self._entries):
+            key, __ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(key, 0)
+
+    def get_or_compute(self, key, compute):
+        """
+        Get the value of the given key, computing and storing it on a miss.
+
+        Args:
+            key (hashable): Key to look up.
+            compute (function): Called without arguments on a miss.
+
+        Returns:
+            Cached or computed value.
+        """
+        value = self.get(key, self)
+        if value is self:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Drop all entries and reset the counters.
+        """
+        self._entries.clear()
+        self._sizes.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._evict()
+
+    @property
+    def maxbytes(self) -> int:
+        return self._maxbytes
+
+    @maxbytes.setter
+    def maxbytes(self, maxbytes: int) -> None:
+        """
+        Set the budget in bytes, evicting entries beyond it. None removes the budget.
+
+        Args:
+            maxbytes (int): Budget in bytes or None.
+        """
+        self._maxbytes = maxbytes
+        self._sizes = ({key: estimate_size((key, value)) for key, value in self._entries.items()}
+                       if maxbytes is not None else {})
+        self._bytes = sum(self._sizes.values())
+        self._evict()
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Estimated size of all entries in bytes, tracked while a budget is set and
+        estimated on access otherwise.
+
+        Returns:
+            int: Size in bytes.
+        """
+        if self._maxbytes is not None:
+            return self._bytes
+        return sum(estimate_size((key, value)) for key, value in self._entries.items())
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counters of this cache.
+
+        Returns:
+            dict: Hits, misses, current size and maximum size.
+        """
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._entries), "maxsize": self._maxsize,
+                "maxbytes": self._maxbytes}
+
+
+def cache_stats() -> dict:
+    """
+    Get the counters of all registered caches.
+
+    Returns:
+        dict: Stats per cache name.
+    """
+    return {name: cache.stats for name, cache in CACHES.items()}
+
+
+def format_stats(stats: dict) -> str:
+    """
+    Format cache counters as aligned lines of text, for the memory report.
+
+    Args:
+        stats (dict): Stats per cache name, as returned by cache_stats.
+
+    Returns:
+        str: Formatted counters.
+    """
+    lines = [f"{'cache':<24} {'hits':>8} {'misses':>8} {'hit rate':>8} {'size':>13}"]
+    for name, stat in stats.items():
+        lookups = stat["hits"] + stat["misses"]
+        rate = f"{stat['hits'] / lookups:.0%}" if lookups else "-"
+        lines.append(f"{name:<24} {stat['hits']:>8} {stat['misses']:>8} {rate:>8} "
+                     f"{stat['size']:>6}/{stat['maxsize']:<6}")
+    return "\n".join(lines) + "\n"
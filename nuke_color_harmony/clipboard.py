@@ -0,0 +1,120 @@
+"""
+This module holds the clipboard payload offering color sets in several formats.
+
+Classes:
+    PaletteMimeData
+"""
+
+from PySide2 import QtCore
+
+from nuke_color_harmony.colorspace import ColorTransform
+from nuke_color_harmony.formatter import (csv_line, hex_line, json_text,
+                                          nuke_group, nuke_script_frame,
+                                          to_rgb_sets)
+
+PLAIN_TEXT = "text/plain"
+CSV = "text/csv"
+JSON = "application/json"
+HEX = "text/x-hex-list"
+NUKE_SCRIPT = "application/x-nuke-script"
+
+
+class PaletteMimeData(QtCore.QMimeData):
+    """
+    Mime data which renders each format only once a consumer requests it.
+    """
+
+    def __init__(self, color_sets: list, plain_format: str = CSV, delimiter: str = "|",
+                 nuke_frame: tuple = None, color_transform: ColorTransform = None) -> None:
+        """
+        Args:
+            color_sets (list): Tuples of color set and harmony.
+            plain_format (str, optional): Format offered as plain text. Falls back
+                to CSV if the format is not available. Defaults to CSV.
+            delimiter (str, optional): Delimiter between colors in CSV. Defaults to "|".
+            nuke_frame (tuple, optional): Width, height and version string of the
+                current script. Without it no Nuke script is offered.
+            color_transform (ColorTransform, optional): Transform applied to all values.
+        """
+        super().__init__()
+        self._color_sets = color_sets
+        self._rgb_sets = None
+        self._plain_format = plain_format
+        self._delimiter = delimiter
+        self._nuke_frame = nuke_frame
+        self._color_transform = color_transform
+        self._rendered = {}
+
+        self._renderers = {CSV: self.render_csv,
+                           JSON: self.render_json,
+                           HEX: self.render_hex}
+        if nuke_frame:
+            self._renderers[NUKE_SCRIPT] = self.render_nuke_script
+        if plain_format not in self._renderers:
+            self._plain_format = CSV
+
+    @property
+    def rgb_sets(self) -> list:
+        """
+        Color sets as plain rgb tuples, converted on first access.
+
+        Returns:
+            list: Tuples of harmony name and rgb tuples.
+        """
+        if self._rgb_sets is None:
+            self._rgb_sets = to_rgb_sets(self._color_sets)
+            if self._color_transform:
+                self._rgb_sets = self._color_transform.apply_sets(self._rgb_sets)
+        return self._rgb_sets
+
+    def render_csv(self) -> str:
+        return "".join(csv_line(rgbs, self._delimiter) for __, rgbs in self.rgb_sets)
+
+    def render_json(self) -> str:
+        return json_text(self.rgb_sets)
+
+    def render_hex(self) -> str:
+        return "".join(hex_line(rgbs) for __, rgbs in self.rgb_sets)
+
+    def render_nuke_script(self) -> str:
+        width, height, nuke_version = self._nuke_frame
+        header, footer = nuke_script_frame(nuke_version)
+        groups = "".join(nuke_group(name, rgbs, group_index, width, height)
+                         for group_index, (name, rgbs) in enumerate(self.rgb_sets, start=1))
+        return header + groups + footer
+
+    def text_for(self, mime_type: str) -> str:
+        """
+        Get the given format as text, rendering it on first request.
+
+        Args:
+            mime_type (str): Requested format.
+
+        Returns:
+            str: Rendered text.
+        """
+        if mime_type == PLAIN_TEXT:
+            mime_type = self._plain_format
+        if mime_type not in self._rendered:
+            self._rendered[mime_type] = self._renderers[mime_type]()
+        return self._rendered[mime_type]
+
+    def formats(self) -> list:
+        return [PLAIN_TEXT] + list(self._renderers)
+
+    def hasFormat(self, mime_type: str) -> bool:
+        return mime_type in self.formats()
+
+    def hasText(self) -> bool:
+        return True
+
+    def text(self) -> str:
+        return self.text_for(PLAIN_TEXT)
+
+    def retrieveData(self, mime_type: str, preferred_type):
+        if not self.hasFormat(mime_type):
+            return super().retrieveData(mime_type, preferred_type)
+        text = self.text_for(mime_type)
+        if mime_type == PLAIN_TEXT:
+            return text
+        return QtCore.QByteArray(text.encode("utf-8"))
@@ -0,0 +1,297 @@
+"""
+This module holds conversions between the color spaces used across this package.
+
+Transfer functions are evaluated exactly, which in Python is as fast as a lookup
+table. All functions work on plain tuples of floats.
+
+Classes:
+    ColorTransform
+
+Functions:
+    srgb_to_linear
+    linear_to_srgb
+    linear_to_oklab
+    oklab_to_linear
+    max_chroma
+    srgb_to_oklch
+    oklch_to_srgb
+    oklch_wheel
+
+Constants:
+    TRANSFORMS: Named transforms to select at export time.
+"""
+
+from math import atan2, copysign, cos, degrees, hypot, radians, sin
+
+# Upper bound of the chroma of sRGB colors in OKLCH.
+OKLCH_MAX_CHROMA = 0.32
+GAMUT_ITERATIONS = 16
+
+
+def _srgb_to_linear(component: float) -> float:
+    if component <= 0.04045:
+        return component / 12.92
+    return ((component + 0.055) / 1.055) ** 2.4
+
+
+def _linear_to_srgb(component: float) -> float:
+    if component <= 0.0031308:
+        return component * 12.92
+    return 1.055 * component ** (1 / 2.4) - 0.055
+
+
+def _rec709_to_linear(component: float) -> float:
+    if component < 0.081:
+        return component / 4.5
+    return ((component + 0.099) / 1.099) ** (1 / 0.45)
+
+
+def srgb_to_linear(rgb: tuple) -> tuple:
+    """
+    Decode display referred sRGB into linear values, clipped between 0 and 1.
+
+    Args:
+        rgb (tuple): Encoded red, green and blue.
+
+    Returns:
+        tuple: Linear red, green and blue.
+    """
+    return tuple(_srgb_to_linear(min(max(component, 0.0), 1.0)) for component in rgb)
+
+
+def linear_to_srgb(rgb: tuple) -> tuple:
+    """
+    Encode linear values into display referred sRGB, clipped between 0 and 1.
+
+    Args:
+        rgb (tuple): Linear red, green and blue.
+
+    Returns:
+        tuple: Encoded red, green and blue.
+    """
+    return tuple(_linear_to_srgb(min(max(component, 0.0), 1.0)) for component in rgb)
+
+
+def linear_to_oklab(rgb: tuple) -> tuple:
+    """
+    Convert linear sRGB into OKLab.
+
+    Args:
+        rgb (tuple): Linear red, green and blue.
+
+    Returns:
+        tuple: Lightness and the a and b components.
+    """
+    red, green, blue = rgb
+    l_ = 0.4122214708 * red + 0.5363325363 * green + 0.0514459929 * blue
+    m_ = 0.2119034982 * red + 0.6806995451 * green + 0.1073969566 * blue
+    s_ = 0.0883024619 * red + 0.2817188376 * green + 0.6299787005 * blue
+
+    l_ = copysign(abs(l_) ** (1 / 3), l_)
+    m_ = copysign(abs(m_) ** (1 / 3), m_)
+    s_ = copysign(abs(s_) ** (1 / 3), s_)
+
+    return (0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_,
+            1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_,
+            0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_)
+
+
+def oklab_to_linear(lab: tuple) -> tuple:
+    """
+    Convert OKLab into linear sRGB. The result is not clipped.
+
+    Args:
+        lab (tuple): Lightness and the a and b components.
+
+    Returns:
+        tuple: Linear red, green and blue.
+    """
+    lightness, a, b = lab
+    l_ = (lightness + 0.3963377774 * a + 0.2158037573 * b) ** 3
+    m_ = (lightness - 0.1055613458 * a - 0.0638541728 * b) ** 3
+    s_ = (lightness - 0.0894841775 * a - 1.2914855480 * b) ** 3
+
+    return (4.0767416621 * l_ - 3.3077115913 * m_ + 0.2309699292 * s_,
+            -1.2684380046 * l_ + 2.6097574011 * m_ - 0.3413193965 * s_,
+            -0.0041960863 * l_ - 0.7034186147 * m_ + 1.7076147010 * s_)
+
+
+def _oklch_to_linear(lightness: float, chroma: float, hue: float) -> tuple:
+    a = chroma * cos(hue)
+    b = chroma * sin(hue)
+    l_ = (lightness + 0.3963377774 * a + 0.2158037573 * b) ** 3
+    m_ = (lightness - 0.1055613458 * a - 0.0638541728 * b) ** 3
+    s_ = (lightness - 0.0894841775 * a - 1.2914855480 * b) ** 3
+    return (4.0767416621 * l_ - 3.3077115913 * m_ + 0.2309699292 * s_,
+            -1.2684380046 * l_ + 2.6097574011 * m_ - 0.3413193965 * s_,
+            -0.0041960863 * l_ - 0.7034186147 * m_ + 1.7076147010 * s_)
+
+
+def _in_gamut(rgb: tuple, epsilon: float = 1e-6) -> bool:
+    return all(-epsilon <= component <= 1.0 + epsilon for component in rgb)
+
+
+def max_chroma(lightness: float, hue: float, limit: float = OKLCH_MAX_CHROMA) -> float:
+    """
+    Find the largest chroma inside the sRGB gamut for a lightness and hue by bisection.
+
+    Args:
+        lightness (float): OKLCH lightness between 0 and 1.
+        hue (float): OKLCH hue in degrees.
+        limit (float, optional): Chroma to start from. Defaults to OKLCH_MAX_CHROMA.
+
+    Returns:
+        float: Largest chroma inside the gamut, at most the limit.
+    """
+    hue = radians(hue)
+    if _in_gamut(_oklch_to_linear(lightness, limit, hue)):
+        return limit
+    low, high = 0.0, limit
+    for __ in range(GAMUT_ITERATIONS):
+        middle = (low + high) * 0.5
+        if _in_gamut(_oklch_to_linear(lightness, middle, hue)):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def srgb_to_oklch(rgbs: list) -> list:
+    """
+    Convert display referred sRGB colors into OKLCH in one pass.
+
+    Args:
+        rgbs (list): Display referred rgb tuples between 0 and 1.
+
+    Returns:
+        list: Tuples of lightness, chroma and hue in degrees.
+    """
+    lchs = []
+    for rgb in rgbs:
+        lightness, a, b = linear_to_oklab(srgb_to_linear(rgb))
+        lchs.append((lightness, hypot(a, b), degrees(atan2(b, a)) % 360))
+    return lchs
+
+
+def oklch_to_srgb(lchs: list) -> list:
+    """
+    Convert OKLCH colors into display referred sRGB in one pass.
+
+    Colors outside of the gamut keep their lightness and hue while the chroma is
+    reduced until they fit, so they do not shift in hue like clipped values would.
+
+    Args:
+        lchs (list): Tuples of lightness, chroma and hue in degrees.
+
+    Returns:
+        list: Display referred rgb tuples between 0 and 1.
+    """
+    rgbs = []
+    for lightness, chroma, hue in lchs:
+        lightness = min(max(lightness, 0.0), 1.0)
+        linear = _oklch_to_linear(lightness, chroma, radians(hue))
+        if not _in_gamut(linear):
+            linear = _oklch_to_linear(lightness, max_chroma(lightness, hue, chroma), radians(hue))
+        rgbs.append(linear_to_srgb(linear))
+    return rgbs
+
+
+def oklch_wheel(lightness: float, hue_steps: int = 360, chroma_steps: int = 16) -> list:
+    """
+    Sample a wheel of OKLCH hues and chromas at one lightness, mapped into the gamut.
+
+    The gamut boundary is searched once per hue, every chroma beyond it is clamped.
+
+    Args:
+        lightness (float): OKLCH lightness between 0 and 1.
+        hue_steps (int, optional): Amount of hues. Defaults to 360.
+        chroma_steps (int, optional): Amount of chromas from 0 to OKLCH_MAX_CHROMA. Defaults to 16.
+
+    Returns:
+        list: Per hue the display referred rgb tuples from the center outwards.
+    """
+    rings = [OKLCH_MAX_CHROMA * step / (chroma_steps - 1) for step in range(chroma_steps)]
+    wheel = []
+    for step in range(hue_steps):
+        hue = 360 * step / hue_steps
+        limit = max_chroma(lightness, hue)
+        wheel.append(oklch_to_srgb([(lightness, min(chroma, limit), hue) for chroma in rings]))
+    return wheel
+
+
+IDENTITY = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
+# Linear sRGB / Rec.709 primaries (D65) to ACEScg (AP1, D60), Bradford adapted.
+REC709_TO_ACESCG = ((0.6130973, 0.3395229, 0.0473793),
+                    (0.0701942, 0.9163556, 0.0134526),
+                    (0.0206156, 0.1095698, 0.8698151))
+
+
+class ColorTransform(object):
+    """
+    Transform from display referred values into a working space: a transfer function,
+    applied to values clipped between 0 and 1, followed by a 3x3 matrix.
+    """
+
+    transfers = {"none": None,
+                 "srgb": _srgb_to_linear,
+                 "rec709": _rec709_to_linear}
+
+    def __init__(self, transfer: str = "none", matrix: tuple = IDENTITY) -> None:
+        """
+        Args:
+            transfer (str, optional): Name of the transfer to decode with. Defaults to "none".
+            matrix (tuple, optional): Rows of a 3x3 matrix applied to the decoded values.
+        """
+        self._decode = self.transfers[transfer]
+        self._matrix = tuple(tuple(float(value) for value in row) for row in matrix)
+        self._identity = self._decode is None and self._matrix == IDENTITY
+
+    def apply(self, rgbs: list) -> list:
+        """
+        Transform all given colors in one pass.
+
+        Args:
+            rgbs (list): Display referred rgb tuples between 0 and 1.
+
+        Returns:
+            list: Transformed rgb tuples.
+        """
+        if self._identity:
+            return [tuple(rgb) for rgb in rgbs]
+
+        if self._decode is not None:
+            decode = self._decode
+            rgbs = [(decode(min(max(red, 0.0), 1.0)),
+                     decode(min(max(green, 0.0), 1.0)),
+                     decode(min(max(blue, 0.0), 1.0)))
+                    for red, green, blue in rgbs]
+
+        (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = self._matrix
+        return [(m00 * red + m01 * green + m02 * blue,
+                 m10 * red + m11 * green + m12 * blue,
+                 m20 * red + m21 * green + m22 * blue)
+                for red, green, blue in rgbs]
+
+    def apply_sets(self, rgb_sets: list) -> list:
+        """
+        Transform the colors of all color sets in one pass.
+
+        Args:
+            rgb_sets (list): Tuples of harmony name and rgb tuples.
+
+        Returns:
+            list: Tuples of harmony name and transformed rgb tuples.
+        """
+        flat = self.apply([rgb for __, rgbs in rgb_sets for rgb in rgbs])
+        result = []
+        start = 0
+        for name, rgbs in rgb_sets:
+            result.append((name, flat[start:start + len(rgbs)]))
+            start += len(rgbs)
+        return result
+
+
+TRANSFORMS = {"display": ColorTransform(),
+              "srgb_linear": ColorTransform("srgb"),
+              "rec709_linear": ColorTransform("rec709"),
+              "acescg": ColorTransform("srgb", REC709_TO_ACESCG)}
@@ -0,0 +1,160 @@
+"""
+This module holds the pairwise contrast and legibility analysis of palettes.
+
+For every pair of colors of a palette the WCAG contrast ratio and the distance
+in OKLab are computed. Each color is decoded once, luminance and OKLab are
+derived from the same linear values, and whole stores are analyzed in one
+batch over their unique colors. Results are cached per palette content, the
+palette itself being the hashable key.
+
+Classes:
+    Legibility
+
+Functions:
+    legibility_matrix
+    analyze
+    analyze_store
+"""
+
+from typing import NamedTuple, Tuple
+
+from nuke_color_harmony.cache import LruCache
+from nuke_color_harmony.colorspace import linear_to_oklab, srgb_to_linear
+
+# WCAG AA for regular text.
+MIN_CONTRAST = 4.5
+# Colors closer than this in OKLab are hard to tell apart.
+MIN_DELTA_E = 0.04
+# Budget in bytes of the analyzed palettes, at about 1.3 KiB per palette of five.
+LEGIBILITY_CACHE_BUDGET = 16 * 2 ** 20
+LEGIBILITY_CACHE = LruCache("legibility", maxsize=65536, maxbytes=LEGIBILITY_CACHE_BUDGET)
+
+
+class Legibility(NamedTuple):
+
+    ratios: Tuple[float, ...]
+    delta_e: Tuple[float, ...]
+    best_contrast: float
+    min_delta_e: float
+
+    @property
+    def size(self) -> int:
+        """
+        Amount of colors of the analyzed palette.
+
+        Returns:
+            int: Amount of colors.
+        """
+        return round(len(self.ratios) ** 0.5)
+
+    @property
+    def warnings(self) -> tuple:
+        """
+        Describe what makes the palette hard to read. A palette with less than two
+        colors has no pairs to compare and never gets a warning.
+
+        Returns:
+            tuple: Warnings, empty if the palette is fine.
+        """
+        if self.size < 2:
+            return ()
+        warnings = []
+        if self.best_contrast < MIN_CONTRAST:
+            warnings.append(f"No pair reaches a contrast of {MIN_CONTRAST}:1 "
+                            f"(best {self.best_contrast:.1f}:1).")
+        if self.min_delta_e < MIN_DELTA_E:
+            warnings.append(f"Some colors are barely distinguishable "
+                            f"(ΔE {self.min_delta_e:.3f}).")
+        return tuple(warnings)
+
+
+def _decode(rgb: tuple) -> tuple:
+    """
+    Get relative luminance and OKLab of a display referred color.
+
+    Args:
+        rgb (tuple): Red, green and blue between 0 and 1.
+
+    Returns:
+        tuple: Luminance and the OKLab tuple.
+    """
+    linear = srgb_to_linear(rgb)
+    red, green, blue = linear
+    return 0.2126 * red + 0.7152 * green + 0.0722 * blue, linear_to_oklab(linear)
+
+
+def legibility_matrix(decoded: list) -> Legibility:
+    """
+    Build the pairwise matrices of decoded colors, row major and symmetric.
+
+    Args:
+        decoded (list): Luminance and OKLab per color, as returned by _decode.
+
+    Returns:
+        Legibility: Contrast ratios, OKLab distances and their extremes.
+    """
+    size = len(decoded)
+    ratios = [1.0] * (size * size)
+    delta_e = [0.0] * (size * size)
+    best_contrast = 1.0
+    # Without any pair no color can be confused, which keeps single colors last when sorted.
+    min_delta_e = float("inf")
+
+    for row in range(size):
+        luminance, (lightness, a, b) = decoded[row]
+        for column in range(row + 1, size):
+            other, (other_lightness, other_a, other_b) = decoded[column]
+            if luminance > other:
+                ratio = (luminance + 0.05) / (other + 0.05)
+            else:
+                ratio = (other + 0.05) / (luminance + 0.05)
+            distance = ((lightness - other_lightness) ** 2 + (a - other_a) ** 2
+                        + (b - other_b) ** 2) ** 0.5
+            ratios[row * size + column] = ratios[column * size + row] = ratio
+            delta_e[row * size + column] = delta_e[column * size + row] = distance
+            if ratio > best_contrast:
+                best_contrast = ratio
+            if distance < min_delta_e:
+                min_delta_e = distance
+
+    return Legibility(tuple(ratios), tuple(delta_e), best_contrast, min_delta_e)
+
+
+def analyze(rgbs: list) -> Legibility:
+    """
+    Analyze a single palette, cached on its content.
+
+    Args:
+        rgbs (list): Display referred rgb tuples between 0 and 1.
+
+    Returns:
+        Legibility: Result of the analysis.
+    """
+    return analyze_store([rgbs])[0]
+
+
+def analyze_store(rgb_sets: list) -> list:
+    """
+    Analyze many palettes in one batch.
+
+    Only palettes which are not cached are computed, and every unique color
+    among them is decoded once.
+
+    Args:
+        rgb_sets (list): Palettes as lists of display referred rgb tuples.
+
+    Returns:
+        list: Legibility per palette, in the given order.
+    """
+    palettes = [tuple(tuple(rgb) for rgb in rgbs) for rgbs in rgb_sets]
+    results = [LEGIBILITY_CACHE.get(palette) for palette in palettes]
+
+    missing = [index for index, result in enumerate(results) if result is None]
+    unique = {rgb for index in missing for rgb in palettes[index]}
+    decoded = dict(zip(unique, map(_decode, unique)))
+
+    for index in missing:
+        result = legibility_matrix([decoded[rgb] for rgb in palettes[index]])
+        LEGIBILITY_CACHE.put(palettes[index], result)
+        results[index] = result
+    return results
@@ -3,15 +3,22 @@ This module holds the controller whcih connects interface and model.
 
 Classes:
     Controller
+    ControllerService
 
 Functions:
+    attach
     start
 """
 
+from functools import partial
+
+from . import IN_NUKE
+from .clipboard import NUKE_SCRIPT
 from .export import Exporter
 from .linker import Linker
+from .remote import RemoteLinker
 
-controller = None
+EXPORT_TARGETS = ("nuke", "csv", "file", "clipboard")
 
 
 class Controller(object):
@@ -21,28 +28,44 @@ class Controller(object):
 
         self._view = view_
         self._linker = None
+        self._connected = False
+        self._color_transforms = {target: "display" for target in EXPORT_TARGETS}
         self.set_up_signals()
 
     def set_up_signals(self) -> None:
         """
-        Connect interface signal with model functions.
+        Connect interface signal with model functions. Only connects once.
         """
+        if self._connected:
+            return
+        self._connected = True
         self.view.import_to_nuke.connect(self.import_to_nuke)
         self.view.export_as_nukefile.connect(self.export_as_nukefile)
         self.view.export_for_csv.connect(self.export_for_csv)
+        self.view.export_for_writer.connect(self.export_for_writer)
+        self.view.export_for_shards.connect(self.export_for_shards)
         self.view.export_for_clipboard.connect(self.export_for_clipboard)
+        self.view.export_for_cube.connect(self.export_for_cube)
+        self.view.export_cvd_report.connect(self.export_cvd_report)
+        self.view.animate_store.connect(self.animate_store)
+        self.view.export_nodes_for_clipboard.connect(self.export_nodes_for_clipboard)
+        self.view.color_transform_changed.connect(self.set_color_transform)
         self.view.toggle_link.connect(self.toggle_live_link)
         self.view.current_colors.connect(self.set_live_color)
 
-    def import_to_nuke(self, items: list, callback, params: str) -> None:
+    def import_to_nuke(self, items: list, imported_ids, remove_orphans: bool, callback,
+                       params: str) -> None:
         """
         Export given color sets into Nuke.
 
         Args:
             items (list): Color sets to export.
+            imported_ids (iterable): Palette ids the store imported before.
+            remove_orphans (bool): Delete groups of imported palettes not in items anymore.
         """
-        exporter = Exporter(items=items)
-        exporter.import_into_nuke(callback, params)
+        exporter = Exporter(items=items, color_transform=self._color_transforms["nuke"])
+        exporter.import_into_nuke(callback, params, imported_ids=imported_ids,
+                                  remove_orphans=remove_orphans)
 
     def export_as_nukefile(self, items: list, callback, params: str) -> None:
         """
@@ -51,7 +74,7 @@ class Controller(object):
         Args:
             items (list): Color sets to export.
         """
-        exporter = Exporter(items=items)
+        exporter = Exporter(items=items, color_transform=self._color_transforms["nuke"])
         exporter.export_as_nukefile(callback, params)
 
     def export_for_csv(self, items: list, path: str, callback, param:str) -> None:
@@ -62,8 +85,83 @@ class Controller(object):
             items (list): Color sets to export.
             path (str): Location to save .csv file.
         """
+        exporter = Exporter(items=items, color_transform=self._color_transforms["csv"])
+        exporter.export_as_csv(path, callback, param)
+
+    def export_for_writer(self, items: list, writer_name: str, path: str, callback,
+                          param: str) -> None:
+        """
+        Stream given color sets into a file on given path with a registered writer.
+
+        Args:
+            items (list): Color sets to export.
+            writer_name (str): Name of the writer.
+            path (str): Location to save the file.
+        """
+        exporter = Exporter(items=items, color_transform=self._color_transforms["file"])
+        exporter.export_with(writer_name, path, callback, param)
+
+    def export_for_shards(self, items: list, path: str, concatenate: bool, callback,
+                          param: str) -> None:
+        """
+        Export given color sets split into part files, formatted in parallel.
+
+        Args:
+            items (list): Color sets to export.
+            path (str): Location of the full export, .nk or .csv.
+            concatenate (bool): Concatenate the parts to the given path as well.
+        """
+        target = "nuke" if path.endswith(".nk") else "csv"
+        exporter = Exporter(items=items, color_transform=self._color_transforms[target])
+        exporter.export_sharded(path, callback, param, concatenate=concatenate)
+
+    def export_for_cube(self, items: list, path: str, size: int, strength: float,
+                        softness: float, callback, param: str) -> None:
+        """
+        Export given color sets as 3D LUT .cube file on given path.
+
+        Args:
+            items (list): Color sets to bake into the LUT.
+            path (str): Location to save .cube file.
+            size (int): Lattice points per axis.
+            strength (float): Blend between input and palette.
+            softness (float): Width of the blend between palette colors in OKLab.
+        """
+        exporter = Exporter(items=items)
+        exporter.export_as_cube(path, callback, param, size=size, strength=strength,
+                                softness=softness)
+
+    def export_cvd_report(self, items: list, path: str, callback, param: str) -> None:
+        """
+        Export a report of given color sets under every color vision deficiency.
+
+        Args:
+            items (list): Color sets to report on.
+            path (str): Location to save the report.
+        """
         exporter = Exporter(items=items)
-        exporter.export_as_csv(path=path)
+        exporter.export_cvd_report(path, callback, param)
+
+    def animate_store(self, items: list, target, first: int, last: int, degrees: float,
+                      path: str, callback, param: str) -> None:
+        """
+        Import given color sets into Nuke as animation, or export them to a .nk file.
+
+        Args:
+            items (list): Color sets to animate.
+            target (StoreItem): Item to morph toward, or None to rotate the hue.
+            first (int): First frame.
+            last (int): Last frame.
+            degrees (float): Hue rotation reached at the last frame.
+            path (str): Location to save the .nk file, empty to import into Nuke.
+        """
+        exporter = Exporter(items=items, color_transform=self._color_transforms["nuke"])
+        if path:
+            exporter.export_animation_as_nukefile(path, callback, param, first, last,
+                                                  target=target, degrees=degrees)
+        else:
+            exporter.import_animation_into_nuke(callback, param, first, last,
+                                                target=target, degrees=degrees)
 
     def export_for_clipboard(self, items: list, callback, param:str) -> None:
         """
@@ -72,15 +170,43 @@ class Controller(object):
         Args:
             items (list): Color sets to copy.
         """
-        exporter = Exporter(items=items)
+        exporter = Exporter(items=items, color_transform=self._color_transforms["clipboard"])
         exporter.copy_to_clipboard(callback, param)
 
+    def export_nodes_for_clipboard(self, items: list, callback, param: str) -> None:
+        """
+        Copy given color sets in clipboard, pastable as nodes into Nuke.
+
+        Args:
+            items (list): Color sets to copy.
+        """
+        exporter = Exporter(items=items, color_transform=self._color_transforms["clipboard"])
+        exporter.copy_to_clipboard(callback, param, plain_format=NUKE_SCRIPT)
+
+    def set_color_transform(self, target: str, name: str) -> None:
+        """
+        Select the color transform applied when exporting to the given target.
+
+        Args:
+            target (str): One of EXPORT_TARGETS.
+            name (str): Name of the transform in TRANSFORMS.
+        """
+        self._color_transforms[target] = name
+
     def toggle_live_link(self, flag: bool) -> None:
-        if flag:
-            self._linker = Linker()
+        if self._linker is not None:
+            self._linker.stop()
+            self._linker = None
+        if flag and IN_NUKE:
+            self._linker = Linker(listener=self.view.apply_linked_colors)
+            self._linker.start()
+        elif flag:
+            # Standalone, send the colors to a receiver running inside Nuke.
+            self._linker = RemoteLinker()
+            self._linker.start()
 
     def set_live_color(self, colors) -> None:
-        if colors:
+        if colors and self._linker is not None:
             self._linker.values = colors
 
     @property
@@ -92,13 +218,60 @@ class Controller(object):
         self._view = view_
 
 
+class ControllerService(object):
+    """
+    Session wide service which attaches exactly one Controller per view.
+    """
+
+    def __init__(self) -> None:
+        self._controllers = {}
+
+    def attach(self, view_) -> Controller:
+        """
+        Get the controller of the given view, creating it on first call.
+
+        Args:
+            view_ (ColorHarmonyUi): View to connect.
+
+        Returns:
+            Controller: The only controller connected to this view.
+        """
+        key = id(view_)
+        controller = self._controllers.get(key)
+        if controller is None:
+            controller = Controller(view_)
+            self._controllers[key] = controller
+            view_.destroyed.connect(partial(self._controllers.pop, key, None))
+        return controller
+
+    @property
+    def controllers(self) -> list:
+        return list(self._controllers.values())
+
+
+service = ControllerService()
+
+
+def attach(view_) -> Controller:
+    """
+    Attach the given view to the session wide controller service.
+
+    Args:
+        view_ (ColorHarmonyUi): View to connect.
+
+    Returns:
+        Controller: The only controller connected to this view.
+    """
+    return service.attach(view_)
+
+
 def start():
     """
     Start up function.
     """
     from .view import ColorHarmonyUi
     view_ = ColorHarmonyUi()
-    controller = Controller(view_)
+    controller = attach(view_)
 
     controller.view.raise_()
     controller.view.show()
@@ -0,0 +1,105 @@
+"""
+This module holds the simulation of color vision deficiencies on palettes.
+
+The simulation uses the matrices of Machado et al. (2009) at full severity,
+applied in linear sRGB. Palettes are decoded, transformed and encoded as one
+flat list in a single pass, and simulated palettes are cached per deficiency
+and palette content, so switching a preview back and forth is free.
+
+Functions:
+    simulate
+    simulate_sets
+    cvd_report
+
+Constants:
+    DEFICIENCIES: Named transforms to simulate.
+"""
+
+from nuke_color_harmony.cache import LruCache
+from nuke_color_harmony.colorspace import ColorTransform, linear_to_srgb
+from nuke_color_harmony.contrast import analyze_store
+from nuke_color_harmony.formatter import hex_line
+
+PROTANOPIA = ((0.152286, 1.052583, -0.204868),
+              (0.114503, 0.786281, 0.099216),
+              (-0.003882, -0.048116, 1.051998))
+DEUTERANOPIA = ((0.367322, 0.860646, -0.227968),
+                (0.280085, 0.672501, 0.047413),
+                (-0.011820, 0.042940, 0.968881))
+TRITANOPIA = ((1.255528, -0.076749, -0.178779),
+              (-0.078411, 0.930809, 0.147602),
+              (0.004733, 0.691367, 0.303900))
+
+DEFICIENCIES = {"protanopia": ColorTransform("srgb", PROTANOPIA),
+                "deuteranopia": ColorTransform("srgb", DEUTERANOPIA),
+                "tritanopia": ColorTransform("srgb", TRITANOPIA)}
+# Budget in bytes of the simulated palettes, at about 1 KiB per palette of five.
+SIMULATION_CACHE_BUDGET = 8 * 2 ** 20
+SIMULATION_CACHE = LruCache("cvd", maxsize=4096, maxbytes=SIMULATION_CACHE_BUDGET)
+
+
+def simulate(rgbs: list, deficiency: str) -> tuple:
+    """
+    Simulate how a palette appears with the given deficiency.
+
+    Args:
+        rgbs (list): Display referred rgb tuples between 0 and 1.
+        deficiency (str): Name of the deficiency in DEFICIENCIES.
+
+    Returns:
+        tuple: Simulated display referred rgb tuples.
+    """
+    return simulate_sets([("", rgbs)], deficiency)[0][1]
+
+
+def simulate_sets(rgb_sets: list, deficiency: str) -> list:
+    """
+    Simulate many palettes at once. Palettes which are not cached yet are
+    transformed together in one pass.
+
+    Args:
+        rgb_sets (list): Tuples of harmony name and rgb tuples.
+        deficiency (str): Name of the deficiency in DEFICIENCIES.
+
+    Returns:
+        list: Tuples of harmony name and simulated rgb tuples.
+    """
+    keys = [(deficiency, tuple(tuple(rgb) for rgb in rgbs)) for __, rgbs in rgb_sets]
+    simulated = [SIMULATION_CACHE.get(key) for key in keys]
+    missing = [index for index, palette in enumerate(simulated) if palette is None]
+
+    if missing:
+        flat = DEFICIENCIES[deficiency].apply([rgb for index in missing for rgb in keys[index][1]])
+        start = 0
+        for index in missing:
+            end = start + len(keys[index][1])
+            simulated[index] = tuple(linear_to_srgb(rgb) for rgb in flat[start:end])
+            SIMULATION_CACHE.put(keys[index], simulated[index])
+            start = end
+
+    return [(name, palette) for (name, __), palette in zip(rgb_sets, simulated)]
+
+
+def cvd_report(rgb_sets: list, delimiter: str = ",") -> str:
+    """
+    Format a report of every palette under every deficiency.
+
+    Each line holds the harmony, the deficiency, the smallest OKLab distance
+    between two simulated colors and the simulated colors as hex.
+
+    Args:
+        rgb_sets (list): Tuples of harmony name and rgb tuples.
+        delimiter (str, optional): Delimiter between fields. Defaults to ",".
+
+    Returns:
+        str: Report including a header line.
+    """
+    lines = [delimiter.join(("harmony", "deficiency", "min_delta_e", "colors")) + "\n"]
+    variants = [("normal", rgb_sets)] + [(name, simulate_sets(rgb_sets, name)) for name in DEFICIENCIES]
+    for deficiency, sets in variants:
+        legibilities = analyze_store([rgbs for __, rgbs in sets])
+        for (name, rgbs), legibility in zip(sets, legibilities):
+            # Single colors have no distance to report.
+            min_delta_e = f"{legibility.min_delta_e:.4f}" if legibility.size > 1 else ""
+            lines.append(delimiter.join((name, deficiency, min_delta_e, hex_line(rgbs))))
+    return "".join(lines)
@@ -0,0 +1,112 @@
+"""
+This module holds the layout and pixel rendering of the palette explorer.
+
+The explorer shows a grid of candidate palettes around a base color. Every row
+holds one harmony at one value step and every column one hue step. The whole
+grid is rendered into a single BGRA pixel buffer, built from repeated scanlines
+instead of individual pixel writes, which the interface turns into one image.
+
+Functions:
+    explorer_cells
+    render_atlas
+    cell_at
+"""
+
+from colorsys import hsv_to_rgb
+
+from nuke_color_harmony.harmonies import HSV, derive_hsv
+from nuke_color_harmony.registry import compile_harmony
+
+HUE_STEPS = (-40, -30, -20, -10, 0, 10, 20, 30, 40)
+VALUE_STEPS = (0.6, 0.8, 1.0)
+CELL_WIDTH = 60
+CELL_HEIGHT = 16
+CELL_GAP = 2
+
+
+def explorer_cells(base: HSV, harmonies: list, hue_steps: tuple = HUE_STEPS,
+                   value_steps: tuple = VALUE_STEPS) -> list:
+    """
+    Get the candidate palettes around the given base color.
+
+    Args:
+        base (HSV): Base color.
+        harmonies (list): Harmonies to sweep across.
+        hue_steps (tuple, optional): Hue offsets in degrees, one per column.
+        value_steps (tuple, optional): Value scales, one row per harmony and step.
+
+    Returns:
+        list: Rows of cells. Each cell holds the base color, harmony and palette as HSV.
+    """
+    rows = []
+    for harmony in harmonies:
+        harmony_rows = compile_harmony(harmony)
+        for value_scale in value_steps:
+            row = []
+            for hue_step in hue_steps:
+                cell_base = HSV((base.hue + hue_step / 360) % 1.0, base.saturation,
+                                min(base.value * value_scale, 1.0))
+                row.append((cell_base, harmony, [cell_base] + derive_hsv(*cell_base, harmony_rows)))
+            rows.append(row)
+    return rows
+
+
+def _pixel(hsv: HSV) -> bytes:
+    red, green, blue = hsv_to_rgb(*hsv)
+    return bytes((round(blue * 255), round(green * 255), round(red * 255), 255))
+
+
+def render_atlas(rows: list, cell_width: int = CELL_WIDTH, cell_height: int = CELL_HEIGHT,
+                 gap: int = CELL_GAP) -> tuple:
+    """
+    Render all cells into one BGRA pixel buffer.
+
+    Each cell shows its palette as vertical stripes. A single scanline is built per
+    row of cells and repeated for the height of the cells.
+
+    Args:
+        rows (list): Rows of cells from explorer_cells.
+        cell_width (int, optional): Width of one cell in pixels.
+        cell_height (int, optional): Height of one cell in pixels.
+        gap (int, optional): Gap between cells in pixels.
+
+    Returns:
+        tuple: Pixel buffer, width and height.
+    """
+    columns = len(rows[0]) if rows else 0
+    width = columns * (cell_width + gap)
+    gap_pixels = b"\0\0\0\0" * gap
+    gap_line = b"\0\0\0\0" * width
+
+    blocks = []
+    for row in rows:
+        scanline = []
+        for __, __, palette in row:
+            stripe_width, rest = divmod(cell_width, len(palette))
+            for index, hsv in enumerate(palette):
+                scanline.append(_pixel(hsv) * (stripe_width + (rest if index == 0 else 0)))
+            scanline.append(gap_pixels)
+        blocks.append(b"".join(scanline) * cell_height)
+        blocks.append(gap_line * gap)
+
+    return b"".join(blocks), width, len(rows) * (cell_height + gap)
+
+
+def cell_at(rows: list, x: float, y: float, cell_width: int = CELL_WIDTH,
+            cell_height: int = CELL_HEIGHT, gap: int = CELL_GAP) -> tuple:
+    """
+    Get the cell at the given position in atlas pixels.
+
+    Args:
+        rows (list): Rows of cells from explorer_cells.
+        x (float): Horizontal position in atlas pixels.
+        y (float): Vertical position in atlas pixels.
+
+    Returns:
+        tuple: The cell or None if the position is outside the grid.
+    """
+    row_index = int(y // (cell_height + gap))
+    column_index = int(x // (cell_width + gap))
+    if 0 <= row_index < len(rows) and 0 <= column_index < len(rows[row_index]):
+        return rows[row_index][column_index]
+    return None
@@ -13,19 +13,46 @@ try:
 except ImportError:
     pass
 
-from nuke_color_harmony import IDENTIFIER_NAME
-from nuke_color_harmony.harmony_template import (ADD_KNOB, GROUP, MAIN_SCRIPT,
-                                                 SINGLE_COLOR)
-
-
+from nuke_color_harmony import IDENTIFIER_NAME, IN_NUKE
+from nuke_color_harmony.animation import hue_rotation, morph, to_curves
+from nuke_color_harmony.clipboard import CSV, PaletteMimeData
+from nuke_color_harmony.colorspace import TRANSFORMS
+from nuke_color_harmony.cvd import cvd_report
+from nuke_color_harmony.formatter import (csv_line, nuke_group,
+                                          nuke_script_frame, to_rgb_sets)
+from nuke_color_harmony.incremental import content_hash, write_incremental
+from nuke_color_harmony.lut import write_cube
+from nuke_color_harmony.sharding import export_sharded
+from nuke_color_harmony.tracing import trace_methods
+from nuke_color_harmony.writers import get_writer
+
+PALETTE_ID_KNOB = "palette_id"
+CONTENT_HASH_KNOB = "content_hash"
+# Color sets transformed together while streaming into a writer.
+STREAM_BATCH = 256
+
+
+@trace_methods
 class Exporter(object):
     """
-    Object to export to various targets. Nuke, .csv file or clipboard.
+    Object to export to various targets. Nuke, .csv file, registered writers or clipboard.
     """
     delimiter = "|"
 
-    def __init__(self, items: list) -> None:
+    def __init__(self, items: list, color_transform="display") -> None:
+        """
+        Args:
+            items (list): StoreItems to export.
+            color_transform (str or ColorTransform, optional): Transform applied to all
+                values before export, by name from TRANSFORMS. Defaults to "display",
+                which exports the values as displayed.
+        """
         self._color_sets = [(item.color_set, item.harmony) for item in items]
+        self._palette_ids = [item.palette_id for item in items]
+        self._color_transform_name = color_transform if isinstance(color_transform, str) else None
+        if isinstance(color_transform, str):
+            color_transform = TRANSFORMS[color_transform]
+        self._color_transform = color_transform
 
     def to_rgb(self, color: QColor) -> tuple:
         """
@@ -39,6 +66,29 @@ class Exporter(object):
         """
         return color.getRgbF()[:3]
 
+    def rgb_sets(self) -> list:
+        """
+        Get all color sets as rgb tuples, with the color transform applied in one pass.
+
+        Returns:
+            list: Tuples of harmony name and rgb tuples.
+        """
+        return self._color_transform.apply_sets(to_rgb_sets(self._color_sets))
+
+    def iter_rgb_sets(self, batch: int = STREAM_BATCH):
+        """
+        Stream all color sets as rgb tuples, transforming one batch of sets at a time.
+
+        Args:
+            batch (int, optional): Color sets per batch. Defaults to STREAM_BATCH.
+
+        Yields:
+            tuple: Harmony name and rgb tuples.
+        """
+        for start in range(0, len(self._color_sets), batch):
+            yield from self._color_transform.apply_sets(
+                to_rgb_sets(self._color_sets[start:start + batch]))
+
     def colorsets_to_text(self):
         """
         Convert colorsets in a format to store in csv or clipboard.
@@ -50,85 +100,145 @@ class Exporter(object):
                 r, g, b | r, g, b | r, g, b | r, g, b | r, g, b
                 r, g, b | r, g, b | r, g, b | r, g, b
         """
-        text = ""
-        for color_set, harmony in self._color_sets:
-            colors_amount = len(color_set)
-            for index, color in enumerate(color_set, start=1):
-                text += ", ".join(str(val) for val in self.to_rgb(color))
-                if index < colors_amount:
-                    text += self.delimiter
+        return "".join(csv_line(rgbs, self.delimiter)
+                       for __, rgbs in self.rgb_sets())
 
-            text += "\n"
-
-        return text
-
-    def copy_to_clipboard(self, callback, params: str) -> None:
+    def copy_to_clipboard(self, callback, params: str, plain_format: str = CSV) -> None:
         """
-        Copy colorsets as text into clipboard.
+        Copy colorsets into clipboard as CSV, JSON, hex list and, inside Nuke, as nodes.
+
+        Each format is only rendered once something pastes it.
 
         Args:
             callback (function): Callback after success.
             params (str): Parameter for callback.
+            plain_format (str, optional): Format to offer as plain text. Defaults to CSV.
         """
-        text = self.colorsets_to_text()
+        nuke_frame = (*self.root_size(), self.nuke_version()) if IN_NUKE else None
+        mime_data = PaletteMimeData(self._color_sets, plain_format=plain_format,
+                                    color_transform=self._color_transform,
+                                    delimiter=self.delimiter, nuke_frame=nuke_frame)
 
         app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
         clipboard = app.clipboard()
-        clipboard.setText(text)
+        clipboard.setMimeData(mime_data)
 
         callback(params)
 
-    def import_into_nuke(self, callback, params: str) -> None:
+    def import_into_nuke(self, callback, params: str, imported_ids=(),
+                         remove_orphans: bool = False) -> None:
         """
         Export colorsets into Nuke as group nodes, displaying those color sets.
 
-        This could also use the export to .nk logic to reduce code
+        Groups which have been imported before are matched by their palette id. Those
+        are only updated if their content hash changed and only on the changed colors.
 
         Args:
             callback (function): Callback after success.
             params (str): Parameter for callback.
+            imported_ids (iterable, optional): Palette ids the store imported before.
+            remove_orphans (bool, optional): Delete the groups of imported_ids whose
+                palette is not part of this import anymore. Groups of other stores are
+                never touched. Defaults to False.
         """
-        root_format = nuke.root().format()
-        width, height = root_format.width(), root_format.height()
-        for color_set, harmony in self._color_sets:
-            reformats = []
-            group_node = nuke.nodes.Group(
-                postage_stamp=True, label=harmony.name)
-
-            constants = []
-            with group_node:
-                for color in color_set:
-                    constant = nuke.nodes.Constant(channels="rgb")
-                    colors = len(color_set)
-                    c_width = width/colors
-                    for index, component in enumerate(self.to_rgb(color=color)):
-                        constant.knob("color").setValue(component, index)
-
-                    constant.knob("color").setValue(1.0, 3)
-                    reformat = nuke.nodes.Reformat(type="to box", box_fixed=True, box_width=c_width,  box_height=height,
-                                                   resize="distort", xpos=constant.xpos(), ypos=constant.ypos() + 100, inputs=[constant])
-                    reformats.append(reformat)
-                    constants.append(constant)
-
-                contactsheet = nuke.nodes.ContactSheet(width=width, height=height,
-                                                       rows=1, columns=len(reformats), gap=20, center=True,
-                                                       ypos=constant.ypos() + 300)
-                for index, reformat in enumerate(reformats):
-                    contactsheet.setInput(index, reformat)
-                nuke.nodes.Output(inputs=[contactsheet])
-
-            tab_knob = nuke.Tab_Knob(IDENTIFIER_NAME, IDENTIFIER_NAME)
-            txt_knob = nuke.Text_Knob("harmony", f"<b>{harmony.name}</b>")
-            group_node.addKnob(tab_knob)
-            group_node.addKnob(txt_knob)
-
-            for index, constant in enumerate(constants, start=1):
-                link = nuke.Link_Knob(f"color{index}", f"color{index}")
-                link.setLink(f"{constant.fullName()}.color")
-                group_node.addKnob(link)
+        width, height = self.root_size()
+        existing = {node.knob(PALETTE_ID_KNOB).value(): node for node in nuke.allNodes("Group")
+                    if node.knob(PALETTE_ID_KNOB)}
+
+        for palette_id, (__, harmony), (__, rgbs) in zip(self._palette_ids, self._color_sets,
+                                                         self.rgb_sets()):
+            palette_hash = content_hash(harmony.name, rgbs)
+            group_node = existing.pop(palette_id, None)
+
+            if group_node is not None and group_node.knob(CONTENT_HASH_KNOB).value() == palette_hash:
+                continue
+            if group_node is not None and group_node.knob(f"color{len(rgbs)}") \
+                    and not group_node.knob(f"color{len(rgbs) + 1}"):
+                self.update_group(group_node, harmony, rgbs)
+            else:
+                if group_node is not None:
+                    nuke.delete(group_node)
+                group_node = self.create_group(harmony, rgbs, width, height)
+                group_node.knob(PALETTE_ID_KNOB).setValue(palette_id)
+            group_node.knob(CONTENT_HASH_KNOB).setValue(palette_hash)
+
+        if remove_orphans:
+            for palette_id in set(imported_ids).intersection(existing):
+                nuke.delete(existing[palette_id])
 
         callback(params)
 
+    def create_group(self, harmony, rgbs: list, width: int, height: int):
+        """
+        Create a group node displaying the given colors as colorbars.
+
+        Args:
+            harmony (Harmony): Harmony of the color set.
+            rgbs (list): Rgb tuples of the color set.
+            width (int): Width of the root format.
+            height (int): Height of the root format.
+
+        Returns:
+            nuke.Node: The created group node.
+        """
+        reformats = []
+        group_node = nuke.nodes.Group(
+            postage_stamp=True, label=harmony.name)
+
+        constants = []
+        with group_node:
+            for rgb in rgbs:
+                constant = nuke.nodes.Constant(channels="rgb")
+                c_width = width/len(rgbs)
+                for index, component in enumerate(rgb):
+                    constant.knob("color").setValue(component, index)
+
+                constant.knob("color").setValue(1.0, 3)
+                reformat = nuke.nodes.Reformat(type="to box", box_fixed=True, box_width=c_width,  box_height=height,
+                                               resize="distort", xpos=constant.xpos(), ypos=constant.ypos() + 100, inputs=[constant])
+                reformats.append(reformat)
+                constants.append(constant)
+
+            contactsheet = nuke.nodes.ContactSheet(width=width, height=height,
+                                                   rows=1, columns=len(reformats), gap=20, center=True,
+                                                   ypos=constant.ypos() + 300)
+            for index, reformat in enumerate(reformats):
+                contactsheet.setInput(index, reformat)
+            nuke.nodes.Output(inputs=[contactsheet])
+
+        tab_knob = nuke.Tab_Knob(IDENTIFIER_NAME, IDENTIFIER_NAME)
+        txt_knob = nuke.Text_Knob("harmony", f"<b>{harmony.name}</b>")
+        group_node.addKnob(tab_knob)
+        group_node.addKnob(txt_knob)
+
+        for index, constant in enumerate(constants, start=1):
+            link = nuke.Link_Knob(f"color{index}", f"color{index}")
+            link.setLink(f"{constant.fullName()}.color")
+            group_node.addKnob(link)
+
+        for name in (PALETTE_ID_KNOB, CONTENT_HASH_KNOB):
+            knob = nuke.String_Knob(name, name)
+            knob.setFlag(nuke.INVISIBLE)
+            group_node.addKnob(knob)
+
+        return group_node
+
+    def update_group(self, group_node, harmony, rgbs: list) -> None:
+        """
+        Update the colors of an already imported group, touching only changed knobs.
+
+        Args:
+            group_node (nuke.Node): Previously imported group node.
+            harmony (Harmony): Harmony of the color set.
+            rgbs (list): Rgb tuples of the color set.
+        """
+        group_node.knob("label").setValue(harmony.name)
+        group_node.knob("harmony").setValue(f"<b>{harmony.name}</b>")
+        for index, rgb in enumerate(rgbs, start=1):
+            knob = group_node.knob(f"color{index}")
+            if tuple(knob.value()[:3]) != tuple(rgb):
+                knob.setValue(list(rgb) + [1.0])
+
     def export_as_csv(self, path: str, callback, params: str) -> None:
         """
         Export color sets as .csv file on given path.
@@ -138,9 +248,55 @@ class Exporter(object):
             callback (function): Callback after success.
             params (str): Parameter for callback.
         """
-        self.export_to_disk(path=path, content=self.colorsets_to_text(),
+        self.export_with("csv", path, callback, params)
+
+    def export_with(self, writer_name: str, path: str, callback, params: str) -> None:
+        """
+        Stream color sets into a file on given path with a writer of the writer registry.
+
+        Args:
+            writer_name (str): Name of the writer, like "json" or "ase".
+            path (str): Path to save the file.
+            callback (function): Callback after success.
+            params (str): Parameter for callback.
+        """
+        writer = get_writer(writer_name, delimiter=self.delimiter,
+                            color_transform=self._color_transform_name)
+        with open(path, "wb" if writer.binary else "w") as dst:
+            writer.write(dst, self.iter_rgb_sets())
+
+        callback(params)
+
+    def export_cvd_report(self, path: str, callback, params: str) -> None:
+        """
+        Export a report of all color sets simulated under every color vision deficiency.
+
+        Args:
+            path (str): Path to save the .csv report.
+            callback (function): Callback after success.
+            params (str): Parameter for callback.
+        """
+        self.export_to_disk(path=path, content=cvd_report(to_rgb_sets(self._color_sets)),
                             callback=callback, params=params)
 
+    def export_as_cube(self, path: str, callback, params: str, size: int = 33,
+                       strength: float = 1.0, softness: float = 0.05) -> None:
+        """
+        Bake the colors of all color sets as one palette into a 3D LUT .cube file.
+
+        Args:
+            path (str): Path to save .cube file.
+            callback (function): Callback after success.
+            params (str): Parameter for callback.
+            size (int, optional): Lattice points per axis, 33 or 65. Defaults to 33.
+            strength (float, optional): Blend between input and palette. Defaults to 1.
+            softness (float, optional): Width of the blend between palette colors.
+        """
+        palette = [rgb for __, rgbs in to_rgb_sets(self._color_sets) for rgb in rgbs]
+        title = " ".join(harmony.name for __, harmony in self._color_sets)
+        write_cube(path, palette, size=size, strength=strength, softness=softness, title=title)
+        callback(params)
+
     def export_to_disk(self, path: str, content: str, callback, params: str):
         """
         Export color hamony sets directly to disk.
@@ -156,10 +312,90 @@ class Exporter(object):
 
         callback(params)
 
+    def animated_sets(self, first: int, last: int, target=None, degrees: float = 360.0) -> list:
+        """
+        Sample an animation of every color set into one curve per color and channel.
+
+        All frames of all colors of a set are sampled, transformed and reduced in one pass.
+
+        Args:
+            first (int): First frame.
+            last (int): Last frame.
+            target (StoreItem, optional): Morph toward the colors of this item. Defaults to
+                None, rotating the hue instead.
+            degrees (float, optional): Hue rotation reached at the last frame. Defaults to 360.
+
+        Returns:
+            list: Tuples of harmony name and a tuple of red, green and blue curve per color.
+        """
+        target_rgbs = [self.to_rgb(color) for color in target.color_set] if target else None
+        animated = []
+        for name, rgbs in to_rgb_sets(self._color_sets):
+            if target_rgbs:
+                samples = morph(rgbs, target_rgbs, first, last)
+            else:
+                samples = hue_rotation(rgbs, first, last, degrees)
+            samples = self._color_transform.apply(samples)
+            animated.append((name, to_curves(samples, len(rgbs), first)))
+        return animated
+
+    def import_animation_into_nuke(self, callback, params: str, first: int, last: int,
+                                   target=None, degrees: float = 360.0) -> None:
+        """
+        Import color sets as animated group nodes. The curves of every constant are
+        assigned in one call through fromScript instead of a key per frame.
+
+        Args:
+            callback (function): Callback after success.
+            params (str): Parameter for callback.
+            first (int): First frame.
+            last (int): Last frame.
+            target (StoreItem, optional): Morph toward the colors of this item. Defaults to
+                None, rotating the hue instead.
+            degrees (float, optional): Hue rotation reached at the last frame. Defaults to 360.
+        """
+        width, height = self.root_size()
+        animated = self.animated_sets(first, last, target=target, degrees=degrees)
+        for (color_set, harmony), (__, curves) in zip(self._color_sets, animated):
+            group_node = self.create_group(harmony, [self.to_rgb(color) for color in color_set],
+                                           width, height)
+            for index, channel_curves in enumerate(curves, start=1):
+                link = group_node.knob(f"color{index}").getLink()
+                constant = nuke.toNode(link.rsplit(".", 1)[0])
+                constant.knob("color").fromScript(" ".join(channel_curves) + " 1")
+
+        callback(params)
+
+    def export_animation_as_nukefile(self, path: str, callback, params: str, first: int,
+                                     last: int, target=None, degrees: float = 360.0) -> None:
+        """
+        Export color sets as animated group nodes, writing the curves straight into the script.
+
+        Args:
+            path (str): Path to save the .nk file.
+            callback (function): Callback after success.
+            params (str): Parameter for callback.
+            first (int): First frame.
+            last (int): Last frame.
+            target (StoreItem, optional): Morph toward the colors of this item. Defaults to
+                None, rotating the hue instead.
+            degrees (float, optional): Hue rotation reached at the last frame. Defaults to 360.
+        """
+        width, height = self.root_size()
+        header, footer = nuke_script_frame(self.nuke_version())
+        groups = "".join(nuke_group(name, curves, index, width, height)
+                         for index, (name, curves) in enumerate(
+                             self.animated_sets(first, last, target=target, degrees=degrees), start=1))
+        self.export_to_disk(path=path, content=header + groups + footer,
+                            callback=callback, params=params)
+
     def export_as_nukefile(self, callback, params: str) -> None:
         """
         Export color harmonines durectly to dis in native nuke format.
 
+        Unchanged groups are reused from a content hashed cache and an existing
+        script on the same path is patched from the first changed group onwards.
+
         Args:
             callback (function): Callback function to confirm success.
             params (str): Message parameter for callback.
@@ -171,52 +407,55 @@ class Exporter(object):
         if not path:
             return
 
+        width, height = self.root_size()
+        write_incremental(path, self.rgb_sets(), width, height,
+                          self.nuke_version())
+        callback(params.format(path=path))
+
+    def export_sharded(self, path: str, callback, params: str, shard_size: int = 1000,
+                       workers: int = None, concatenate: bool = False) -> None:
+        """
+        Export color sets split into part files, formatted in parallel by a process pool,
+        or a thread pool if there is no Python interpreter to spawn workers with.
+
+        The extension of the given path decides between .nk and .csv parts. A manifest
+        holding the byte offset of every color set is written next to the parts.
+
+        Args:
+            path (str): Path of the full export.
+            callback (function): Callback function to confirm success.
+            params (str): Message parameter for callback.
+            shard_size (int, optional): Amount of color sets per part. Defaults to 1000.
+            workers (int, optional): Amount of workers. Defaults to the cpu count.
+            concatenate (bool, optional): Concatenate all parts to the given path as well.
+        """
+        format_options = {"delimiter": self.delimiter}
+        if path.endswith(".nk"):
+            width, height = self.root_size()
+            format_options.update(width=width, height=height,
+                                  nuke_version=self.nuke_version())
+
+        export_sharded(path, self.rgb_sets(), shard_size=shard_size,
+                       workers=workers, concatenate=concatenate, **format_options)
+        callback(params.format(path=path))
+
+    @staticmethod
+    def root_size() -> tuple:
+        """
+        Get the size of the current root format.
+
+        Returns:
+            tuple: Width and height.
+        """
         root_format = nuke.root().format()
-        width, height = root_format.width(), root_format.height()
-        nuke_version = f"{nuke.env['NukeVersionMajor']}.{nuke.env['NukeVersionMinor']} v{nuke.env['NukeVersionRelease']}"
-        group_index = 1
-
-        data = {"nuke_version_string": nuke_version,
-                "reformat_height": height,
-                "cs_width": width,
-                "cs_height": height
-                }
-
-        groups = ""
-        for color_set, harmony in self._color_sets:
-
-            extend_data = {"color_harmony": harmony.name,
-                           "group_index": group_index,
-                           "group_xpos": 100 * group_index,
-                           "reformat_width": width / len(color_set),
-                           "color_amount": len(color_set),
-                           }
-
-            data = {**data, **extend_data}
-
-            add_user_knobs = ""
-            single_colors = ""
-
-            for constant_index, color in enumerate(reversed(color_set), start=1):
-                components = self.to_rgb(color=color)
-                color_data = {"red": components[0],
-                              "green": components[1],
-                              "blue": components[2],
-                              "constant_index": constant_index,
-                              "xpos": 100 + (100 * constant_index)}
-                data = {**data, **color_data}
-
-                add_user_knobs += ADD_KNOB.format(**data) + "\n"
-                single_colors += SINGLE_COLOR.format(**data) + "\n"
-
-            data["add_user_knobs_to_script"] = add_user_knobs
-            data["add_colors_to_script"] = single_colors
-            group_node = GROUP.format(**data)
-            groups += group_node + "\n"
-            group_index += 1
-
-        data["add_groups_to_script"] = groups
-        main_script = MAIN_SCRIPT.format(**data)
-        self.export_to_disk(path, main_script,
-                            callback=callback,
-                            params=params.format(path=path))
+        return root_format.width(), root_format.height()
+
+    @staticmethod
+    def nuke_version() -> str:
+        """
+        Get the version string of the running Nuke, as written into .nk scripts.
+
+        Returns:
+            str: Version string.
+        """
+        return f"{nuke.env['NukeVersionMajor']}.{nuke.env['NukeVersionMinor']} v{nuke.env['NukeVersionRelease']}"
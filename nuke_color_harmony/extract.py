@@ -0,0 +1,254 @@
+"""
+This module holds the extraction of dominant colors from images and plates.
+
+Raw float buffers and .ppm files are memory mapped and sampled row by row
+with a fixed stride, so only the touched pages are read and memory stays
+bounded by the amount of samples. Other formats like .png or .exr are read
+through imageio, if it is available, which decodes the whole image first, so
+their memory grows with the resolution. The samples are clustered with
+mini-batch k-means in OKLab.
+
+Functions:
+    mapped
+    ppm_header
+    sample_raw
+    sample_ppm
+    sample_image
+    kmeans
+    dominant_colors
+"""
+
+import mmap
+from contextlib import contextmanager
+from random import Random
+
+try:
+    import imageio.v3 as iio
+except ImportError:
+    iio = None
+
+from nuke_color_harmony.colorspace import (linear_to_oklab, linear_to_srgb,
+                                           oklab_to_linear, srgb_to_linear)
+
+SAMPLES = 20000
+BATCH_SIZE = 1024
+ITERATIONS = 40
+
+
+@contextmanager
+def mapped(source):
+    """
+    Get a memoryview onto a bytes like object or a memory mapped file.
+
+    The view has to be released before leaving the context.
+
+    Args:
+        source (str or bytes): Path of a file or bytes like buffer.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with memoryview(source) as view:
+            yield view
+        return
+    with open(source, "rb") as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        with memoryview(mapped_file) as view:
+            yield view
+
+
+def ppm_header(view: memoryview) -> tuple:
+    """
+    Parse the header of a binary 8 bit .ppm file.
+
+    Args:
+        view (memoryview): Content of the file.
+
+    Raises:
+        ValueError: If the file is no binary 8 bit .ppm or its header is truncated.
+
+    Returns:
+        tuple: Width, height and offset of the pixel data.
+    """
+    fields = []
+    position = 0
+    size = len(view)
+    while len(fields) < 4:
+        while position < size and view[position] in b" \t\r\n":
+            position += 1
+        if position < size and view[position] == ord("#"):
+            while position < size and view[position] not in b"\r\n":
+                position += 1
+            continue
+        start = position
+        while position < size and view[position] not in b" \t\r\n":
+            position += 1
+        if position >= size:
+            raise ValueError("Truncated .ppm header.")
+        fields.append(bytes(view[start:position]))
+    if fields[0] != b"P6" or int(fields[3]) > 255:
+        raise ValueError("Only binary 8 bit .ppm files are supported.")
+    return int(fields[1]), int(fields[2]), position + 1
+
+
+def _stride(width: int, height: int, max_samples: int) -> int:
+    return max(1, int((width * height / max_samples) ** 0.5))
+
+
+def _sample_rows(values: memoryview, width: int, height: int, channels: int,
+                 max_samples: int) -> list:
+    """
+    Sample every n-th pixel of every n-th row from interleaved pixel values.
+
+    Args:
+        values (memoryview): One dimensional pixel values.
+        width (int): Width of the image.
+        height (int): Height of the image.
+        channels (int): Amount of interleaved channels, at least three.
+        max_samples (int): Upper bound of samples.
+
+    Returns:
+        list: Rgb tuples.
+    """
+    step = _stride(width, height, max_samples)
+    row_size = width * channels
+    pixel_step = channels * step
+    samples = []
+    for y in range(0, height, step):
+        with values[y * row_size:(y + 1) * row_size] as row:
+            samples.extend(zip(row[0::pixel_step].tolist(),
+                               row[1::pixel_step].tolist(),
+                               row[2::pixel_step].tolist()))
+    return samples
+
+
+def sample_raw(source, width: int, height: int, channels: int = 3, offset: int = 0,
+               max_samples: int = SAMPLES) -> list:
+    """
+    Sample a raw buffer of interleaved 32 bit float pixels, top row first.
+
+    Args:
+        source (str or bytes): Path of a raw file or bytes like buffer.
+        width (int): Width of the image.
+        height (int): Height of the image.
+        channels (int, optional): Amount of interleaved channels. Defaults to 3.
+        offset (int, optional): Bytes to skip at the beginning. Defaults to 0.
+        max_samples (int, optional): Upper bound of samples. Defaults to SAMPLES.
+
+    Returns:
+        list: Linear rgb tuples.
+    """
+    size = width * height * channels * 4
+    with mapped(source) as view, view[offset:offset + size] as pixels, pixels.cast("f") as values:
+        return _sample_rows(values, width, height, channels, max_samples)
+
+
+def sample_ppm(path: str, max_samples: int = SAMPLES) -> list:
+    """
+    Sample a binary 8 bit .ppm file.
+
+    Args:
+        path (str): Path of the .ppm file.
+        max_samples (int, optional): Upper bound of samples. Defaults to SAMPLES.
+
+    Returns:
+        list: Linear rgb tuples.
+    """
+    with mapped(path) as view:
+        width, height, offset = ppm_header(view)
+        with view[offset:offset + width * height * 3] as values:
+            samples = _sample_rows(values, width, height, 3, max_samples)
+
+    scale = 1.0 / 255
+    return [srgb_to_linear((red * scale, green * scale, blue * scale))
+            for red, green, blue in samples]
+
+
+def sample_image(path: str, max_samples: int = SAMPLES) -> list:
+    """
+    Sample an image file, choosing the reader from its extension. Only .ppm files
+    are memory mapped, other formats are decoded as a whole by imageio.
+
+    Args:
+        path (str): Path of the image.
+        max_samples (int, optional): Upper bound of samples. Defaults to SAMPLES.
+
+    Raises:
+        RuntimeError: If the format needs imageio which is not installed.
+
+    Returns:
+        list: Linear rgb tuples.
+    """
+    if path.lower().endswith(".ppm"):
+        return sample_ppm(path, max_samples=max_samples)
+    if iio is None:
+        raise RuntimeError(f"Reading {path} requires the optional dependency imageio.")
+
+    pixels = iio.imread(path)
+    if pixels.ndim == 2:
+        pixels = pixels[..., None].repeat(3, axis=2)
+    height, width = pixels.shape[:2]
+    step = _stride(width, height, max_samples)
+    samples = pixels[::step, ::step, :3].reshape(-1, 3).tolist()
+    if pixels.dtype.kind == "f":
+        return [tuple(sample) for sample in samples]
+    scale = 1.0 / (2 ** (8 * pixels.dtype.itemsize) - 1)
+    return [srgb_to_linear((red * scale, green * scale, blue * scale))
+            for red, green, blue in samples]
+
+
+def kmeans(points: list, k: int, iterations: int = ITERATIONS, batch_size: int = BATCH_SIZE,
+           rng: Random = None) -> tuple:
+    """
+    Cluster points with mini-batch k-means.
+
+    Args:
+        points (list): Points as tuples of three floats.
+        k (int): Amount of clusters.
+        iterations (int, optional): Amount of mini-batches. Defaults to ITERATIONS.
+        batch_size (int, optional): Points per mini-batch. Defaults to BATCH_SIZE.
+        rng (Random, optional): Random generator. Defaults to a generator seeded with 0.
+
+    Returns:
+        tuple: Cluster centers and the amount of points assigned to each.
+    """
+    rng = rng or Random(0)
+    unique = list(set(points))
+    centers = [list(point) for point in rng.sample(unique, min(k, len(unique)))]
+    counts = [0] * len(centers)
+
+    def nearest(point) -> int:
+        x, y, z = point
+        distances = [(x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2 for cx, cy, cz in centers]
+        return distances.index(min(distances))
+
+    for __ in range(iterations):
+        for point in rng.sample(points, min(batch_size, len(points))):
+            index = nearest(point)
+            counts[index] += 1
+            rate = 1.0 / counts[index]
+            center = centers[index]
+            center[0] += (point[0] - center[0]) * rate
+            center[1] += (point[1] - center[1]) * rate
+            center[2] += (point[2] - center[2]) * rate
+
+    weights = [0] * len(centers)
+    for point in points:
+        weights[nearest(point)] += 1
+    return [tuple(center) for center in centers], weights
+
+
+def dominant_colors(samples: list, k: int = 5, rng: Random = None) -> list:
+    """
+    Get the dominant colors of the given samples, clustered in OKLab.
+
+    Args:
+        samples (list): Linear rgb tuples, as returned by the sample functions.
+        k (int, optional): Amount of colors. Defaults to 5.
+        rng (Random, optional): Random generator for the clustering.
+
+    Returns:
+        list: Display referred rgb tuples between 0 and 1, most dominant first.
+    """
+    if not samples:
+        return []
+    centers, weights = kmeans([linear_to_oklab(sample) for sample in samples], k, rng=rng)
+    ordered = sorted(zip(weights, centers), key=lambda pair: pair[0], reverse=True)
+    return [linear_to_srgb(oklab_to_linear(center)) for __, center in ordered]
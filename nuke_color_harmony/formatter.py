@@ -0,0 +1,133 @@
+"""
+This module holds plain text formatting for exported color sets.
+
+Everything in here works on plain rgb tuples instead of QColors, so it can run
+without Qt or Nuke, for example inside worker processes.
+
+Functions:
+    to_rgb_sets
+    csv_line
+    hex_line
+    json_text
+    nuke_group
+    nuke_script_frame
+"""
+
+import json
+
+from nuke_color_harmony.harmony_template import (ADD_KNOB, GROUP, MAIN_SCRIPT,
+                                                 SINGLE_COLOR)
+
+
+def to_rgb_sets(color_sets: list) -> list:
+    """
+    Convert color sets holding QColors into plain (harmony name, rgb tuples) pairs.
+
+    Args:
+        color_sets (list): Tuples of color set and harmony.
+
+    Returns:
+        list: Tuples of harmony name and list of rgb tuples.
+    """
+    return [(harmony.name, [color.getRgbF()[:3] for color in color_set])
+            for color_set, harmony in color_sets]
+
+
+def csv_line(rgbs: list, delimiter: str = "|") -> str:
+    """
+    Format one color set as a single line of text.
+
+    Args:
+        rgbs (list): Rgb tuples of one color set.
+        delimiter (str, optional): Delimiter between colors. Defaults to "|".
+
+    Returns:
+        str: Formatted line including line break.
+    """
+    return delimiter.join(", ".join(str(val) for val in rgb) for rgb in rgbs) + "\n"
+
+
+def hex_line(rgbs: list) -> str:
+    """
+    Format one color set as a single line of hex colors.
+
+    Args:
+        rgbs (list): Rgb tuples of one color set.
+
+    Returns:
+        str: Formatted line including line break.
+    """
+    return " ".join("#" + "".join(f"{round(min(max(val, 0.0), 1.0) * 255):02x}" for val in rgb)
+                    for rgb in rgbs) + "\n"
+
+
+def json_text(rgb_sets: list) -> str:
+    """
+    Format color sets as json list of harmonies and their colors.
+
+    Args:
+        rgb_sets (list): Tuples of harmony name and rgb tuples.
+
+    Returns:
+        str: Formatted json text.
+    """
+    return json.dumps([{"harmony": name, "colors": [list(rgb) for rgb in rgbs]}
+                       for name, rgbs in rgb_sets])
+
+
+def nuke_group(name: str, rgbs: list, group_index: int, width: int, height: int) -> str:
+    """
+    Format one color set as Nuke group node.
+
+    Args:
+        name (str): Name of the color harmony.
+        rgbs (list): Rgb tuples of one color set. Components may be Nuke curve strings.
+        group_index (int): Index of the group inside the script.
+        width (int): Width of the root format.
+        height (int): Height of the root format.
+
+    Returns:
+        str: Group node as text including line break.
+    """
+    data = {"color_harmony": name,
+            "group_index": group_index,
+            "group_xpos": 100 * group_index,
+            "reformat_width": width / len(rgbs),
+            "reformat_height": height,
+            "color_amount": len(rgbs),
+            "cs_width": width,
+            "cs_height": height,
+            }
+
+    add_user_knobs = ""
+    single_colors = ""
+    for constant_index, rgb in enumerate(reversed(rgbs), start=1):
+        color_data = {"red": rgb[0],
+                      "green": rgb[1],
+                      "blue": rgb[2],
+                      "constant_index": constant_index,
+                      "xpos": 100 + (100 * constant_index)}
+        data = {**data, **color_data}
+
+        add_user_knobs += ADD_KNOB.format(**data) + "\n"
+        single_colors += SINGLE_COLOR.format(**data) + "\n"
+
+    data["add_user_knobs_to_script"] = add_user_knobs
+    data["add_colors_to_script"] = single_colors
+    return GROUP.format(**data) + "\n"
+
+
+def nuke_script_frame(nuke_version: str) -> tuple:
+    """
+    Get the text surrounding the groups inside a .nk script.
+
+    Args:
+        nuke_version (str): Version string written into the script.
+
+    Returns:
+        tuple: Header and footer of the script.
+    """
+    marker = "\0"
+    header, footer = MAIN_SCRIPT.format(nuke_version_string=nuke_version,
+                                        add_groups_to_script=marker).split(marker)
+    return header, footer
@@ -0,0 +1,140 @@
+"""
+This module holds the content hashed, incremental export of .nk scripts.
+
+Every group node is rendered once per content hash and reused on following
+exports. Next to the script an index with the hash, offset and length of every
+group is stored, so an existing script can be patched in place from the first
+changed group onwards instead of being written again.
+
+Functions:
+    content_hash
+    render_group
+    write_incremental
+"""
+
+import hashlib
+import json
+import os
+
+from nuke_color_harmony.cache import LruCache
+from nuke_color_harmony.formatter import nuke_group, nuke_script_frame
+
+INDEX_SUFFIX = ".index.json"
+CACHE_SIZE = 50000
+# Budget in bytes of the rendered groups, at about 2 KiB per group.
+GROUP_CACHE_BUDGET = 32 * 2 ** 20
+
+GROUP_CACHE = LruCache("nk_groups", maxsize=CACHE_SIZE, maxbytes=GROUP_CACHE_BUDGET)
+
+
+def content_hash(*content) -> str:
+    """
+    Hash the given content, which has to have a stable representation.
+
+    Returns:
+        str: Hex digest of the content.
+    """
+    return hashlib.sha1(repr(content).encode("utf-8")).hexdigest()
+
+
+def render_group(name: str, rgbs: list, group_index: int, width: int, height: int,
+                 nuke_version: str) -> tuple:
+    """
+    Get a group node as bytes, rendering it only if its content has not been seen before.
+
+    Args:
+        name (str): Name of the color harmony.
+        rgbs (list): Rgb tuples of one color set.
+        group_index (int): Index of the group inside the script.
+        width (int): Width of the root format.
+        height (int): Height of the root format.
+        nuke_version (str): Version string of the script.
+
+    Returns:
+        tuple: Content hash and the rendered group.
+    """
+    key = content_hash(name, [tuple(rgb) for rgb in rgbs], group_index,
+                       width, height, nuke_version)
+    block = GROUP_CACHE.get_or_compute(
+        key, lambda: nuke_group(name, rgbs, group_index, width, height).encode("utf-8"))
+    return key, block
+
+
+def _read_index(path: str) -> dict:
+    """
+    Read the index of a previous export if the size and modification time of the file on
+    disk still match it, so a script edited or replaced since is written again.
+
+    Args:
+        path (str): Path of the script.
+
+    Returns:
+        dict: The index or None if it is missing or outdated.
+    """
+    try:
+        with open(path + INDEX_SUFFIX, "r") as src:
+            index = json.load(src)
+        stat = os.stat(path)
+        if stat.st_size == index["size"] and stat.st_mtime_ns == index["mtime"]:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def write_incremental(path: str, rgb_sets: list, width: int, height: int,
+                      nuke_version: str, patch: bool = True) -> dict:
+    """
+    Write color sets as .nk script, reusing cached groups and patching an existing script.
+
+    Args:
+        path (str): Path of the script.
+        rgb_sets (list): Tuples of harmony name and rgb tuples.
+        width (int): Width of the root format.
+        height (int): Height of the root format.
+        nuke_version (str): Version string of the script.
+        patch (bool, optional): Patch an existing script in place. Defaults to True.
+
+    Returns:
+        dict: The index which has been written.
+    """
+    header, footer = (part.encode("utf-8") for part in nuke_script_frame(nuke_version))
+    groups = [render_group(name, rgbs, group_index, width, height, nuke_version)
+              for group_index, (name, rgbs) in enumerate(rgb_sets, start=1)]
+
+    blocks = []
+    position = len(header)
+    for key, block in groups:
+        blocks.append([key, position, len(block)])
+        position += len(block)
+
+    start = 0
+    previous = _read_index(path) if patch else None
+    if previous and previous["header"] == content_hash(header):
+        start = len(groups)
+        for index, (old, new) in enumerate(zip(previous["blocks"], blocks)):
+            if old != new:
+                start = index
+                break
+        start = min(start, len(previous["blocks"]))
+
+    if start:
+        with open(path, "r+b") as dst:
+            dst.seek(blocks[start - 1][1] + blocks[start - 1][2])
+            dst.writelines(block for __, block in groups[start:])
+            dst.write(footer)
+            dst.truncate()
+    else:
+        with open(path, "wb") as dst:
+            dst.write(header)
+            dst.writelines(block for __, block in groups)
+            dst.write(footer)
+
+    index = {"header": content_hash(header),
+             "size": position + len(footer),
+             "mtime": os.stat(path).st_mtime_ns,
+             "blocks": blocks}
+    with open(path + INDEX_SUFFIX, "w") as dst:
+        json.dump(index, dst)
+
+    return index
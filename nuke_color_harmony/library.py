@@ -0,0 +1,331 @@
+"""
+This module holds the import of external palette libraries.
+
+Adobe Swatch Exchange (.ase), Adobe Color (.aco) and GIMP (.gpl) files are
+memory mapped and parsed incrementally, yielding one palette at a time, so
+libraries with thousands of swatches never have to be held as a whole. Groups
+of .ase files become palettes, ungrouped swatches and the flat lists of .aco
+and .gpl files are split into palettes of consecutive swatches. Every palette
+is then fit to the harmony whose colors lie closest to its colors in OKLab.
+
+Functions:
+    read_ase
+    read_aco
+    read_gpl
+    read_palettes
+    fit_harmony
+    fit_palettes
+"""
+
+import io
+import mmap
+import os
+import struct
+from colorsys import hsv_to_rgb, rgb_to_hsv
+from contextlib import contextmanager
+from itertools import chain
+
+from nuke_color_harmony.colorspace import (linear_to_oklab, linear_to_srgb,
+                                           srgb_to_linear)
+from nuke_color_harmony.extract import mapped
+from nuke_color_harmony.harmonies import derive_hsv
+from nuke_color_harmony.registry import compile_harmony
+
+CHUNK_SIZE = 5
+# CIE XYZ of the D50 white point and the Bradford adapted D50 XYZ to linear sRGB matrix.
+_D50 = (0.96422, 1.0, 0.82521)
+_XYZ_D50_TO_SRGB = ((3.1338561, -1.6168667, -0.4906146),
+                    (-0.9787684, 1.9161415, 0.0334540),
+                    (0.0719453, -0.2289914, 1.4052427))
+
+
+def _lab_to_rgb(lightness: float, a: float, b: float) -> tuple:
+    """
+    Convert CIELAB (D50), as used by Adobe, to display referred sRGB.
+    """
+    fy = (lightness + 16) / 116
+    fx = fy + a / 500
+    fz = fy - b / 200
+
+    def inverse(value: float) -> float:
+        return value ** 3 if value > 6 / 29 else 3 * (6 / 29) ** 2 * (value - 4 / 29)
+
+    xyz = [inverse(fx) * _D50[0], inverse(fy) * _D50[1], inverse(fz) * _D50[2]]
+    return linear_to_srgb(tuple(sum(row[index] * xyz[index] for index in range(3))
+                                for row in _XYZ_D50_TO_SRGB))
+
+
+def _cmyk_to_rgb(cyan: float, magenta: float, yellow: float, key: float) -> tuple:
+    return ((1 - cyan) * (1 - key), (1 - magenta) * (1 - key), (1 - yellow) * (1 - key))
+
+
+def _chunks(swatches, name: str, size: int):
+    """
+    Group consecutive swatches into palettes.
+
+    Args:
+        swatches (generator): Rgb tuples.
+        name (str): Base name of the palettes.
+        size (int): Swatches per palette.
+
+    Yields:
+        tuple: Name and rgb tuples of a palette.
+    """
+    palette = []
+    for rgb in swatches:
+        palette.append(rgb)
+        if len(palette) == size:
+            yield name, palette
+            palette = []
+    if palette:
+        yield name, palette
+
+
+def read_ase(source, chunk_size: int = CHUNK_SIZE):
+    """
+    Read palettes from an Adobe Swatch Exchange file.
+
+    Args:
+        source (str or bytes): Path or content of the file.
+        chunk_size (int, optional): Swatches per palette outside of groups.
+
+    Raises:
+        ValueError: If the file is no .ase file.
+
+    Yields:
+        tuple: Name and rgb tuples of a palette.
+    """
+    with mapped(source) as view:
+        if bytes(view[:4]) != b"ASEF":
+            raise ValueError("Not an Adobe Swatch Exchange file.")
+        blocks, = struct.unpack_from(">I", view, 8)
+        position = 12
+        group, grouped, loose = None, [], []
+
+        for __ in range(blocks):
+            block_type, length = struct.unpack_from(">HI", view, position)
+            data = position + 6
+            position = data + length
+
+            if block_type == 0xC001:
+                # The length counts UTF-16 code units, including the trailing NUL.
+                name_length, = struct.unpack_from(">H", view, data)
+                name_end = data + 2 + 2 * (name_length - 1)
+                group = bytes(view[data + 2:name_end]).decode("utf-16-be").rstrip("\0")
+                grouped = []
+            elif block_type == 0xC002:
+                if grouped:
+                    yield group, grouped
+                group, grouped = None, []
+            elif block_type == 0x0001:
+                name_length, = struct.unpack_from(">H", view, data)
+                model_start = data + 2 + 2 * name_length
+                model = bytes(view[model_start:model_start + 4])
+                values_start = model_start + 4
+                if model == b"RGB ":
+                    rgb = struct.unpack_from(">3f", view, values_start)
+                elif model == b"CMYK":
+                    rgb = _cmyk_to_rgb(*struct.unpack_from(">4f", view, values_start))
+                elif model == b"LAB ":
+                    lightness, a, b = struct.unpack_from(">3f", view, values_start)
+                    rgb = _lab_to_rgb(lightness * 100, a, b)
+                elif model == b"Gray":
+                    gray, = struct.unpack_from(">f", view, values_start)
+                    rgb = (gray, gray, gray)
+                else:
+                    continue
+                if group is None:
+                    loose.append(rgb)
+                    if len(loose) == chunk_size:
+                        yield "swatches", loose
+                        loose = []
+                else:
+                    grouped.append(rgb)
+
+        if loose:
+            yield "swatches", loose
+
+
+def read_aco(source, chunk_size: int = CHUNK_SIZE):
+    """
+    Read palettes from an Adobe Color file. Only the first section is read, the
+    second one holds the same colors with names.
+
+    Args:
+        source (str or bytes): Path or content of the file.
+        chunk_size (int, optional): Swatches per palette.
+
+    Raises:
+        ValueError: If the file is no .aco file.
+
+    Yields:
+        tuple: Name and rgb tuples of a palette.
+    """
+    with mapped(source) as view:
+        version, amount = struct.unpack_from(">HH", view, 0)
+        if version not in (1, 2) or len(view) < 4 + amount * 10:
+            raise ValueError("Not an Adobe Color file.")
+
+        def swatches():
+            for index in range(amount):
+                space, w, x, y, z = struct.unpack_from(">HHHHH", view, 4 + index * 10)
+                if space == 0:
+                    yield (w / 65535, x / 65535, y / 65535)
+                elif space == 1:
+                    yield hsv_to_rgb(w / 65535, x / 65535, y / 65535)
+                elif space == 2:
+                    yield _cmyk_to_rgb(1 - w / 65535, 1 - x / 65535, 1 - y / 65535, 1 - z / 65535)
+                elif space == 7:
+                    a, b = struct.unpack(">hh", struct.pack(">HH", x, y))
+                    yield _lab_to_rgb(w / 100, a / 100, b / 100)
+                elif space == 8:
+                    gray = 1 - w / 10000
+                    yield (gray, gray, gray)
+
+        yield from _chunks(swatches(), "swatches", chunk_size)
+
+
+@contextmanager
+def _lines(source):
+    """
+    Get an object to read lines from a memory mapped file or a bytes like buffer.
+
+    Args:
+        source (str or bytes): Path or content of the file.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+        return
+    with open(source, "rb") as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        yield mapped_file
+
+
+def read_gpl(source, chunk_size: int = CHUNK_SIZE):
+    """
+    Read palettes from a GIMP palette file.
+
+    Args:
+        source (str or bytes): Path or content of the file.
+        chunk_size (int, optional): Swatches per palette.
+
+    Raises:
+        ValueError: If the file is no .gpl file.
+
+    Yields:
+        tuple: Name and rgb tuples of a palette.
+    """
+    with _lines(source) as lines:
+        if not lines.readline().startswith(b"GIMP Palette"):
+            raise ValueError("Not a GIMP palette file.")
+
+        # Read the header up to the first color, the name is needed before chunking.
+        name = "swatches"
+        for first in iter(lines.readline, b""):
+            header = first.strip()
+            if header.startswith(b"Name:"):
+                name = header[5:].strip().decode("utf-8", "replace") or name
+            elif header and not header.startswith((b"#", b"Columns:")):
+                break
+        else:
+            return
+
+        def swatches():
+            for line in chain((first,), iter(lines.readline, b"")):
+                line = line.strip()
+                if not line or line.startswith((b"#", b"Columns:", b"Name:")):
+                    continue
+                fields = line.split(None, 3)
+                if len(fields) < 3:
+                    continue
+                try:
+                    yield tuple(int(value) / 255 for value in fields[:3])
+                except ValueError:
+                    continue
+
+        yield from _chunks(swatches(), name, chunk_size)
+
+
+READERS = {".ase": read_ase, ".aco": read_aco, ".gpl": read_gpl}
+
+
+def read_palettes(path: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Read palettes from a palette library, choosing the reader from its extension.
+
+    Args:
+        path (str): Path of the file.
+        chunk_size (int, optional): Swatches per palette where the file has no groups.
+
+    Raises:
+        ValueError: If the format is not supported or the file is corrupt.
+
+    Yields:
+        tuple: Name and rgb tuples of a palette.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Unsupported palette format {extension}.")
+    try:
+        yield from READERS[extension](path, chunk_size=chunk_size)
+    except struct.error as error:
+        raise ValueError(f"Corrupt palette file {path}: {error}") from error
+
+
+def _labs(rgbs) -> list:
+    return [linear_to_oklab(srgb_to_linear(rgb)) for rgb in rgbs]
+
+
+def _mean_nearest(labs: list, targets: list) -> float:
+    """
+    Get the mean OKLab distance from every color to its nearest target.
+    """
+    return sum(min((l - tl) ** 2 + (a - ta) ** 2 + (b - tb) ** 2 for tl, ta, tb in targets) ** 0.5
+               for l, a, b in labs) / len(labs)
+
+
+def fit_harmony(rgbs: list, harmonies: list, compiled: list = None) -> tuple:
+    """
+    Find the harmony which, applied to the first color, derives colors closest to the others.
+
+    The distance is symmetric: every palette color is matched to its nearest color
+    of the harmony and every color of the harmony to its nearest palette color, in
+    OKLab. Colors without a counterpart so cost their actual distance, which keeps
+    palettes and harmonies of different length comparable.
+
+    Args:
+        rgbs (list): Display referred rgb tuples, base color first.
+        harmonies (list): Harmonies to choose from.
+        compiled (list, optional): Compiled rows per harmony, to reuse across palettes.
+
+    Returns:
+        tuple: Best harmony and its mean distance.
+    """
+    compiled = compiled or [compile_harmony(harmony) for harmony in harmonies]
+    base = rgb_to_hsv(*(min(max(value, 0.0), 1.0) for value in rgbs[0]))
+    palette = _labs(rgbs)
+
+    best = (None, float("inf"))
+    for harmony, rows in zip(harmonies, compiled):
+        # The base color is part of both, as it is of every stored harmony.
+        derived = palette[:1] + _labs(hsv_to_rgb(*hsv) for hsv in derive_hsv(*base, rows))
+        distance = (_mean_nearest(palette, derived) + _mean_nearest(derived, palette)) / 2
+        if distance < best[1]:
+            best = (harmony, distance)
+    return best
+
+
+def fit_palettes(palettes, harmonies: list):
+    """
+    Fit every palette of a stream to its closest harmony.
+
+    Args:
+        palettes (generator): Name and rgb tuples per palette.
+        harmonies (list): Harmonies to choose from.
+
+    Yields:
+        tuple: Name, rgb tuples and the fitted harmony of a palette.
+    """
+    compiled = [compile_harmony(harmony) for harmony in harmonies]
+    for name, rgbs in palettes:
+        harmony, __ = fit_harmony(rgbs, harmonies, compiled)
+        yield name, rgbs, harmony
@@ -1,15 +1,37 @@
 """
 This module holds one class for linking live edit in panel with nodes..
 
+The link works both ways. Panel colors are written into the linked groups, and
+edits of their color knobs are sent back to the panel. The knob callback is only
+registered for group nodes and returns early for anything but the color knobs
+of linked groups. Changes are coalesced until the next tick of the event loop,
+and the link's own writes are ignored so they do not echo back. Linked groups
+which get deleted are released, so the link holds no dead node references over
+long sessions.
+
 Classes:
     Linker
 """
+from PySide2 import QtCore
+
 try:
     import nuke
 except ImportError:
     pass
 
 from nuke_color_harmony import IDENTIFIER_NAME
+from nuke_color_harmony.memory import register_component
+from nuke_color_harmony.tracing import TRACER, traced
+
+
+def _node_name(node) -> str:
+    """
+    Get the full name of a node, or None if the node was deleted.
+    """
+    try:
+        return node.fullName()
+    except ValueError:
+        return None
 
 
 class Linker(object):
@@ -17,10 +39,118 @@ class Linker(object):
     Object to handle th live connection between pyside panel and Nuke nodes.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, listener=None) -> None:
+        """
+        Args:
+            listener (function, optional): Called with the rgba tuples of a linked group
+                after its colors were edited in Nuke. Defaults to None, linking one way.
+        """
         self._activated = False
         self._nodes = []
+        self._names = frozenset()
         self._values = []
+        self._written = None
+        self._writing = False
+        self._listener = listener
+        self._pending = None
+        register_component("linker", self.linked_nodes)
+
+    def start(self) -> None:
+        """
+        Link the selected harmony groups and listen to edits of their colors.
+        """
+        self.link_nodes(nuke.selectedNodes())
+        if self._listener is not None:
+            nuke.addKnobChanged(self._knob_changed, nodeClass="Group")
+        nuke.addOnDestroy(self._node_destroyed, nodeClass="Group")
+        self._activated = True
+
+    def stop(self) -> None:
+        """
+        Stop listening to edits in Nuke.
+        """
+        if self._listener is not None:
+            nuke.removeKnobChanged(self._knob_changed, nodeClass="Group")
+        nuke.removeOnDestroy(self._node_destroyed, nodeClass="Group")
+        self._activated = False
+        self._pending = None
+        self._nodes = []
+        self._names = frozenset()
+
+    def link_nodes(self, nodes: list) -> None:
+        """
+        Set the groups to link, ignoring nodes which are no harmony groups.
+
+        Args:
+            nodes (list): Nodes to link.
+        """
+        self._nodes = [node for node in nodes if IDENTIFIER_NAME in node.knobs()]
+        self._names = frozenset(node.fullName() for node in self._nodes)
+
+    def linked_nodes(self) -> list:
+        """
+        Get the linked groups, releasing groups which were deleted.
+
+        Returns:
+            list: Linked nodes.
+        """
+        self.prune()
+        return self._nodes
+
+    def prune(self) -> int:
+        """
+        Release linked groups which were deleted in Nuke. Accessing a deleted node
+        raises a ValueError.
+
+        Returns:
+            int: Amount of released nodes.
+        """
+        alive = [node for node in self._nodes if _node_name(node) is not None]
+        released = len(self._nodes) - len(alive)
+        if released:
+            self.link_nodes(alive)
+        return released
+
+    def _node_destroyed(self) -> None:
+        """
+        Callback on deletion of group nodes. Releases the node if it is linked.
+        """
+        name = nuke.thisNode().fullName()
+        if name in self._names:
+            self._names = self._names - {name}
+            self._nodes = [node for node in self._nodes if _node_name(node) in self._names]
+
+    def _knob_changed(self) -> None:
+        """
+        Callback on knob changes of group nodes. Remembers the edited group and
+        schedules a single flush for all changes within this tick.
+        """
+        if self._writing or not nuke.thisKnob().name().startswith("color"):
+            return
+        node = nuke.thisNode()
+        if node.fullName() not in self._names:
+            return
+        if self._pending is None:
+            QtCore.QTimer.singleShot(0, self._flush)
+        self._pending = node
+
+    def _flush(self) -> None:
+        """
+        Send the colors of the last edited group to the listener, unless they are
+        the values the link wrote itself.
+        """
+        node, self._pending = self._pending, None
+        if node is None or not self._activated:
+            return
+        rgbas = []
+        index = 1
+        while node.knob(f"color{index}"):
+            rgbas.append(tuple(node.knob(f"color{index}").value()))
+            index += 1
+        if not rgbas or rgbas == self._written:
+            return
+        self._written = rgbas
+        self._listener(rgbas)
 
     @property
     def state(self) -> None:
@@ -35,13 +165,37 @@ class Linker(object):
         return self._values
 
     @values.setter
+    @traced("Linker.values")
     def values(self, colors) -> None:
         self._values = colors
-        self._nodes = self._nodes or nuke.selectedNodes()
-        for node in self._nodes:
-            if not IDENTIFIER_NAME in node.knobs():
-                return
-            for index, color in enumerate(self._values, start=1):
-                knob = node.knob(f"color{index}")
-                if knob:
-                    knob.setValue(color.getRgbF())
+        self.write([color.getRgbF() for color in colors])
+
+    def write(self, rgbas: list) -> None:
+        """
+        Write the given colors into the linked groups, skipping unchanged values.
+
+        Args:
+            rgbas (list): Rgba tuples, base color first.
+        """
+        if rgbas == self._written:
+            return
+        self._written = rgbas
+        if not self._nodes:
+            self.link_nodes(nuke.selectedNodes())
+        stale = False
+        self._writing = True
+        try:
+            for node in self._nodes:
+                try:
+                    for index, rgba in enumerate(rgbas, start=1):
+                        knob = node.knob(f"color{index}")
+                        if knob:
+                            knob.setValue(rgba)
+                except ValueError:
+                    # The group was deleted without notice, like on closing the script.
+                    stale = True
+        finally:
+            self._writing = False
+        if stale:
+            self.prune()
+        TRACER.mark_written()
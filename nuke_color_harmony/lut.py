@@ -0,0 +1,92 @@
+"""
+This module holds the baking of palettes into 3D LUTs.
+
+Every lattice point of the LUT is pulled toward the palette, measured in OKLab.
+With a softness of zero the nearest palette color wins, otherwise all palette
+colors are blended with gaussian weights of their distance. The OKLab
+conversion is split into per axis contributions which are computed once per
+axis instead of once per lattice point.
+
+Functions:
+    lattice
+    write_cube
+"""
+
+from math import exp
+
+from nuke_color_harmony.colorspace import linear_to_oklab, srgb_to_linear
+
+# Rows of the linear sRGB to LMS matrix used by OKLab.
+_LMS = ((0.4122214708, 0.5363325363, 0.0514459929),
+        (0.2119034982, 0.6806995451, 0.1073969566),
+        (0.0883024619, 0.2817188376, 0.6299787005))
+
+
+def lattice(palette: list, size: int = 33, strength: float = 1.0, softness: float = 0.0):
+    """
+    Generate the output of every lattice point, red varying fastest.
+
+    Args:
+        palette (list): Display referred rgb tuples between 0 and 1.
+        size (int, optional): Lattice points per axis. Defaults to 33.
+        strength (float, optional): Blend between input (0) and palette (1). Defaults to 1.
+        softness (float, optional): Width of the blend between palette colors in OKLab.
+            Defaults to 0, snapping to the nearest color.
+
+    Yields:
+        tuple: Output rgb of a lattice point.
+    """
+    targets = [tuple(rgb) for rgb in palette]
+    labs = [linear_to_oklab(srgb_to_linear(rgb)) for rgb in targets]
+    axis = [index / (size - 1) for index in range(size)]
+    linear = [srgb_to_linear((value,))[0] for value in axis]
+    # Contribution of each axis value to l, m and s.
+    red_lms = [tuple(row[0] * value for row in _LMS) for value in linear]
+    green_lms = [tuple(row[1] * value for row in _LMS) for value in linear]
+    blue_lms = [tuple(row[2] * value for row in _LMS) for value in linear]
+    inverse = 1.0 / (softness * softness) if softness > 0 else 0.0
+    keep = 1.0 - strength
+
+    for blue, (bl, bm, bs) in zip(axis, blue_lms):
+        for green, (gl, gm, gs) in zip(axis, green_lms):
+            for red, (rl, rm, rs) in zip(axis, red_lms):
+                l_ = (rl + gl + bl) ** (1 / 3)
+                m_ = (rm + gm + bm) ** (1 / 3)
+                s_ = (rs + gs + bs) ** (1 / 3)
+                lightness = 0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_
+                a = 1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_
+                b = 0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_
+                distances = [(lightness - pl) ** 2 + (a - pa) ** 2 + (b - pb) ** 2
+                             for pl, pa, pb in labs]
+
+                if inverse:
+                    nearest = min(distances)
+                    weights = [exp((nearest - distance) * inverse) for distance in distances]
+                    total = sum(weights)
+                    target = [sum(weight * rgb[channel] for weight, rgb in zip(weights, targets)) / total
+                              for channel in range(3)]
+                else:
+                    target = targets[distances.index(min(distances))]
+
+                yield (red * keep + target[0] * strength,
+                       green * keep + target[1] * strength,
+                       blue * keep + target[2] * strength)
+
+
+def write_cube(path: str, palette: list, size: int = 33, strength: float = 1.0,
+               softness: float = 0.0, title: str = "nuke_color_harmony") -> None:
+    """
+    Bake a palette into a .cube file, written in one buffered pass.
+
+    Args:
+        path (str): Path of the .cube file.
+        palette (list): Display referred rgb tuples between 0 and 1.
+        size (int, optional): Lattice points per axis, usually 33 or 65. Defaults to 33.
+        strength (float, optional): Blend between input (0) and palette (1). Defaults to 1.
+        softness (float, optional): Width of the blend between palette colors in OKLab.
+    """
+    header = f'TITLE "{title}"\nLUT_3D_SIZE {size}\nDOMAIN_MIN 0 0 0\nDOMAIN_MAX 1 1 1\n'
+    lines = "".join(f"{red:.6f} {green:.6f} {blue:.6f}\n"
+                    for red, green, blue in lattice(palette, size, strength, softness))
+    with open(path, "w", newline="\n") as dst:
+        dst.write(header + lines)
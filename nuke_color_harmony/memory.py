@@ -0,0 +1,174 @@
+"""
+This module holds the memory accounting of the panel's components.
+
+Components like the store, the colorwheel or the live link register a function
+returning the data they hold, every registered cache is accounted as well.
+Sizes are cheap estimates by default, summing sys.getsizeof over the objects
+reachable through containers, with the native size of Qt values added. In debug
+mode, enabled with the environment variable DEBUG_ENV or set_debug, tracemalloc
+runs as well and the report adds the exact size allocated per module of this
+package and still alive.
+
+Classes:
+    Usage
+
+Functions:
+    estimate_size
+    register_component
+    set_debug
+    memory_report
+    format_report
+"""
+
+import inspect
+import os
+import sys
+import tracemalloc
+import weakref
+from collections import deque
+from typing import NamedTuple
+
+DEBUG_ENV = "NUKE_COLOR_HARMONY_DEBUG"
+DEBUG_FRAMES = 1
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Size of the C++ values behind Qt wrappers, which sys.getsizeof does not see.
+NATIVE_SIZES = {"QColor": 16, "QPointF": 16, "QRect": 16}
+_CONTAINERS = (list, tuple, set, frozenset, deque)
+
+_components = {}
+
+
+class Usage(NamedTuple):
+    """
+    Memory used by one component.
+    """
+    name: str
+    size: int
+    count: int
+    source: str
+
+
+def estimate_size(obj) -> int:
+    """
+    Estimate the deep size of an object in bytes. Containers and dictionaries are
+    followed, every object is counted once, Qt images by their pixel data.
+
+    Args:
+        obj: Object to measure.
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    size = 0
+    seen = set()
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        type_name = type(current).__name__
+        if type_name in NATIVE_SIZES:
+            size += NATIVE_SIZES[type_name]
+        elif type_name in ("QImage", "QPixmap"):
+            size += current.width() * current.height() * current.depth() // 8
+        elif isinstance(current, _CONTAINERS):
+            stack.extend(current)
+        elif isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+    return size
+
+
+def register_component(name: str, measure) -> None:
+    """
+    Register a component to account, replacing one of the same name. Bound methods
+    are held weakly, so a deleted panel drops out of the report.
+
+    Args:
+        name (str): Name of the component.
+        measure (function): Called without arguments, returns a sized container
+            of the data the component holds.
+    """
+    if inspect.ismethod(measure):
+        _components[name] = weakref.WeakMethod(measure)
+    else:
+        _components[name] = lambda: measure
+
+
+def set_debug(flag: bool = True) -> None:
+    """
+    Start or stop tracing allocations with tracemalloc. Only allocations made while
+    tracing are accounted.
+
+    Args:
+        flag (bool, optional): Whether to trace. Defaults to True.
+    """
+    if flag and not tracemalloc.is_tracing():
+        tracemalloc.start(DEBUG_FRAMES)
+    elif not flag and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def _traced_modules() -> list:
+    """
+    Get the size allocated per module of this package, according to tracemalloc.
+    """
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(True, os.path.join(PACKAGE_DIR, "*")),))
+    return [Usage(os.path.basename(statistic.traceback[0].filename), statistic.size,
+                  statistic.count, "tracemalloc")
+            for statistic in snapshot.statistics("filename")]
+
+
+def memory_report() -> list:
+    """
+    Account all registered components and caches.
+
+    Returns:
+        list: Usage per component and cache, in debug mode followed by the usage
+            per module.
+    """
+    # Imported here, caches take their size estimates from this module.
+    from nuke_color_harmony.cache import CACHES
+
+    report = []
+    for name, reference in list(_components.items()):
+        measure = reference()
+        if measure is None:
+            del _components[name]
+            continue
+        data = measure()
+        report.append(Usage(name, estimate_size(data), len(data), "estimate"))
+    for name, cache in CACHES.items():
+        report.append(Usage(f"cache {name}", cache.nbytes, len(cache), "estimate"))
+    if tracemalloc.is_tracing():
+        report.extend(_traced_modules())
+    return report
+
+
+def format_report(report: list) -> str:
+    """
+    Format a report as aligned lines of text, largest first per source.
+
+    Args:
+        report (list): Usage per component.
+
+    Returns:
+        str: Formatted report.
+    """
+    lines = []
+    for source in ("estimate", "tracemalloc"):
+        usages = sorted((usage for usage in report if usage.source == source),
+                        key=lambda usage: usage.size, reverse=True)
+        if not usages:
+            continue
+        lines.append(f"{source} (total {sum(usage.size for usage in usages) / 1024:.1f} KiB)")
+        lines.extend(f"  {usage.name:<24} {usage.size / 1024:>10.1f} KiB {usage.count:>8}"
+                     for usage in usages)
+    return "\n".join(lines) + "\n"
+
+
+if os.environ.get(DEBUG_ENV):
+    set_debug()
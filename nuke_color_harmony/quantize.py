@@ -0,0 +1,255 @@
+"""
+This module holds the engine which maps every pixel of an image onto a palette.
+
+The nearest palette color, measured in OKLab, is precomputed once for every bin
+of a lookup table over 5 bit per channel. Images are memory mapped and
+processed in tiles of rows. Per tile the bin keys are built with bytes
+translations and big integer bit operations, so the only per pixel work left
+in Python is a single lookup through map. The quantized image is streamed to
+disk tile by tile and the coverage of each palette color is counted on the fly,
+so memory stays constant for any frame size.
+
+Classes:
+    PaletteQuantizer
+"""
+
+import struct
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from nuke_color_harmony.colorspace import (linear_to_oklab, linear_to_srgb,
+                                           srgb_to_linear)
+from nuke_color_harmony.extract import mapped, ppm_header
+
+TILE_ROWS = 64
+BITS = 5
+# Tiles in flight per worker, bounding memory while keeping all workers busy.
+TILES_PER_WORKER = 2
+
+
+@lru_cache(maxsize=1)
+def _float_to_srgb8() -> bytes:
+    """
+    Build the table from the upper 16 bits of a linear 32 bit float to 8 bit sRGB.
+
+    Returns:
+        bytes: Encoded value per upper half.
+    """
+    amount = 1 << 16
+    uppers = struct.unpack(f"={amount}f", struct.pack(f"={amount}I", *(upper << 16 for upper in range(amount))))
+    return bytes(0 if value != value else round(linear_to_srgb((value,))[0] * 255)
+                 for value in uppers)
+
+
+class PaletteQuantizer(object):
+    """
+    Map images onto the colors of a palette and count the coverage of each color.
+    """
+
+    def __init__(self, palette: list) -> None:
+        """
+        Args:
+            palette (list): Display referred rgb tuples between 0 and 1, at most 255.
+        """
+        self._palette = [tuple(rgb) for rgb in palette]
+        self._lut = self.build_lut()
+
+        shift = 8 - BITS
+        # Key of a pixel is r << 10 | g << 5 | b, split into a high and low byte.
+        self._high_red = bytes(((value >> shift) << 2) for value in range(256))
+        self._high_green = bytes(((value >> shift) >> 3) for value in range(256))
+        self._low_green = bytes((((value >> shift) & 7) << 5) for value in range(256))
+        self._low_blue = bytes((value >> shift) for value in range(256))
+
+        self._out_planes = [bytes(round(rgb[channel] * 255) for rgb in self._palette).ljust(256, b"\0")
+                            for channel in range(3)]
+
+    def build_lut(self) -> bytes:
+        """
+        Find the nearest palette color for the center of every bin.
+
+        Returns:
+            bytes: Palette index per bin key.
+        """
+        bins = 1 << BITS
+        palette = [linear_to_oklab(srgb_to_linear(rgb)) for rgb in self._palette]
+        centers = [srgb_to_linear(((index + 0.5) / bins,))[0] for index in range(bins)]
+
+        lut = bytearray(bins ** 3)
+        key = 0
+        for red in centers:
+            for green in centers:
+                for blue in centers:
+                    lightness, a, b = linear_to_oklab((red, green, blue))
+                    distances = [(lightness - pl) ** 2 + (a - pa) ** 2 + (b - pb) ** 2
+                                 for pl, pa, pb in palette]
+                    lut[key] = distances.index(min(distances))
+                    key += 1
+        return bytes(lut)
+
+    def quantize_pixels(self, pixels: bytes) -> tuple:
+        """
+        Quantize interleaved 8 bit rgb pixels.
+
+        Args:
+            pixels (bytes): Interleaved display referred rgb bytes.
+
+        Returns:
+            tuple: Palette index per pixel and the quantized rgb bytes.
+        """
+        reds, greens, blues = pixels[0::3], pixels[1::3], pixels[2::3]
+        size = len(reds)
+
+        def combine(first: bytes, second: bytes) -> bytes:
+            # The bits of both operands never overlap, so OR combines them element wise.
+            return (int.from_bytes(first, "big") | int.from_bytes(second, "big")).to_bytes(size, "big")
+
+        high = combine(reds.translate(self._high_red), greens.translate(self._high_green))
+        low = combine(greens.translate(self._low_green), blues.translate(self._low_blue))
+
+        keys = bytearray(size * 2)
+        if sys.byteorder == "little":
+            keys[0::2], keys[1::2] = low, high
+        else:
+            keys[0::2], keys[1::2] = high, low
+        with memoryview(keys) as view, view.cast("H") as key_values:
+            indices = bytes(map(self._lut.__getitem__, key_values))
+
+        quantized = bytearray(size * 3)
+        for channel, plane in enumerate(self._out_planes):
+            quantized[channel::3] = indices.translate(plane)
+        return indices, bytes(quantized)
+
+    def _encode_floats(self, values: memoryview, channels: int) -> bytes:
+        """
+        Encode linear 32 bit float pixels into interleaved 8 bit sRGB.
+
+        The upper 16 bits of a float hold sign, exponent and the top of the mantissa,
+        so they index a lookup table directly without converting to Python floats.
+
+        Args:
+            values (memoryview): Float pixel values as raw bytes.
+            channels (int): Amount of interleaved channels.
+
+        Returns:
+            bytes: Interleaved rgb bytes.
+        """
+        table = _float_to_srgb8()
+        high = 1 if sys.byteorder == "little" else 0
+        encoded = bytearray(len(values) // (4 * channels) * 3)
+        with values.cast("H") as halves:
+            for channel in range(3):
+                upper = halves[2 * channel + high::2 * channels]
+                encoded[channel::3] = bytes(map(table.__getitem__, upper))
+        return bytes(encoded)
+
+    def _run(self, tiles, width: int, height: int, dst: str, workers: int) -> dict:
+        """
+        Quantize all tiles, stream the result to disk and count coverage.
+
+        Tiles are read and submitted lazily, at most TILES_PER_WORKER per worker are
+        in flight, and every result is written as soon as it is next in order.
+
+        Args:
+            tiles (generator): Interleaved rgb bytes per tile.
+            width (int): Width of the image.
+            height (int): Height of the image.
+            dst (str): Path of the .ppm to write. None skips writing.
+            workers (int): Amount of threads.
+
+        Returns:
+            dict: Coverage per palette color.
+        """
+        counts = [0] * len(self._palette)
+        out = open(dst, "wb") if dst else None
+        try:
+            if out:
+                out.write(f"P6\n{width} {height}\n255\n".encode("ascii"))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for tile in tiles:
+                    pending.append(pool.submit(self.quantize_pixels, tile))
+                    if len(pending) >= workers * TILES_PER_WORKER:
+                        self._collect(pending.popleft().result(), counts, out)
+                while pending:
+                    self._collect(pending.popleft().result(), counts, out)
+        finally:
+            if out:
+                out.close()
+
+        total = width * height or 1
+        return {"palette": self._palette,
+                "pixels": counts,
+                "coverage": [count / total for count in counts]}
+
+    @staticmethod
+    def _collect(result: tuple, counts: list, out) -> None:
+        """
+        Count the coverage of a quantized tile and write it.
+
+        Args:
+            result (tuple): Palette index per pixel and quantized rgb bytes of a tile.
+            counts (list): Pixels per palette color, updated in place.
+            out (file): File to write into, or None.
+        """
+        indices, quantized = result
+        for index in range(len(counts)):
+            counts[index] += indices.count(index)
+        if out:
+            out.write(quantized)
+
+    def quantize_ppm(self, src, dst: str = None, tile_rows: int = TILE_ROWS, workers: int = 1) -> dict:
+        """
+        Quantize a binary 8 bit .ppm file.
+
+        Args:
+            src (str or bytes): Path or content of the .ppm file.
+            dst (str, optional): Path of the quantized .ppm. Defaults to None, only counting.
+            tile_rows (int, optional): Rows per tile. Defaults to TILE_ROWS.
+            workers (int, optional): Amount of threads. Defaults to 1.
+
+        Returns:
+            dict: Coverage per palette color.
+        """
+        with mapped(src) as view:
+            width, height, offset = ppm_header(view)
+            row_size = width * 3
+
+            def tiles():
+                for row in range(0, height, tile_rows):
+                    start = offset + row * row_size
+                    yield bytes(view[start:start + min(tile_rows, height - row) * row_size])
+
+            return self._run(tiles(), width, height, dst, workers)
+
+    def quantize_raw(self, src, width: int, height: int, channels: int = 3, offset: int = 0,
+                     dst: str = None, tile_rows: int = TILE_ROWS, workers: int = 1) -> dict:
+        """
+        Quantize a raw buffer of interleaved linear 32 bit float pixels.
+
+        Args:
+            src (str or bytes): Path of a raw file or bytes like buffer.
+            width (int): Width of the image.
+            height (int): Height of the image.
+            channels (int, optional): Amount of interleaved channels. Defaults to 3.
+            offset (int, optional): Bytes to skip at the beginning. Defaults to 0.
+            dst (str, optional): Path of the quantized .ppm. Defaults to None, only counting.
+            tile_rows (int, optional): Rows per tile. Defaults to TILE_ROWS.
+            workers (int, optional): Amount of threads. Defaults to 1.
+
+        Returns:
+            dict: Coverage per palette color.
+        """
+        row_size = width * channels * 4
+        with mapped(src) as view:
+
+            def tiles():
+                for row in range(0, height, tile_rows):
+                    start = offset + row * row_size
+                    end = start + min(tile_rows, height - row) * row_size
+                    with view[start:end] as tile:
+                        yield self._encode_floats(tile, channels)
+
+            return self._run(tiles(), width, height, dst, workers)
@@ -0,0 +1,105 @@
+"""
+This module holds the scored batch randomization of base color and harmony.
+
+Instead of drawing a single random color, a batch of candidate pairs of base
+color and harmony is generated, every candidate is scored on the spread
+between its colors in OKLab, its contrast and how well it stays inside sensible value
+and saturation ranges, and the best candidate wins.
+
+Functions:
+    relative_luminance
+    score_palette
+    smart_randomize
+"""
+
+from colorsys import hsv_to_rgb
+from itertools import combinations
+from random import Random
+
+from nuke_color_harmony.colorspace import linear_to_oklab, srgb_to_linear
+from nuke_color_harmony.harmonies import HSV, derive_hsv
+from nuke_color_harmony.registry import compile_harmony
+
+# Scored in plain Python, this many candidates stay below 20 ms.
+CANDIDATES = 768
+MIN_VALUE = 0.15
+MAX_SATURATION = 0.95
+
+LUT_SIZE = 1024
+_LINEAR_LUT = srgb_to_linear([index / (LUT_SIZE - 1) for index in range(LUT_SIZE)])
+
+
+def _decode(rgb: tuple) -> tuple:
+    """
+    Decode a display referred rgb color into linear values through the lookup table.
+    """
+    lut, scale = _LINEAR_LUT, LUT_SIZE - 1
+    red, green, blue = rgb
+    return lut[round(red * scale)], lut[round(green * scale)], lut[round(blue * scale)]
+
+
+def relative_luminance(rgb: tuple) -> float:
+    """
+    Get the relative luminance of a display referred rgb color.
+
+    Args:
+        rgb (tuple): Red, green and blue between 0 and 1.
+
+    Returns:
+        float: Relative luminance between 0 and 1.
+    """
+    red, green, blue = _decode(rgb)
+    return 0.2126 * red + 0.7152 * green + 0.0722 * blue
+
+
+def score_palette(hsvs: list) -> float:
+    """
+    Score a palette on spread, contrast and value and saturation constraints.
+
+    Args:
+        hsvs (list): Colors of the palette as hsv tuples.
+
+    Returns:
+        float: Score, higher is better.
+    """
+    linears = [_decode(hsv_to_rgb(*hsv)) for hsv in hsvs]
+
+    # Smallest OKLab distance, black to white is 1.
+    labs = [linear_to_oklab(linear) for linear in linears]
+    spread = min(((l1 - l2) ** 2 + (a1 - a2) ** 2 + (b1 - b2) ** 2) ** 0.5
+                 for (l1, a1, b1), (l2, a2, b2) in combinations(labs, 2))
+
+    luminances = [0.2126 * red + 0.7152 * green + 0.0722 * blue for red, green, blue in linears]
+    contrast = (max(luminances) + 0.05) / (min(luminances) + 0.05)
+
+    penalty = sum(max(0.0, MIN_VALUE - value) + max(0.0, saturation - MAX_SATURATION)
+                  for __, saturation, value in hsvs)
+
+    return spread + min(contrast, 7.0) / 7.0 - 4 * penalty
+
+
+def smart_randomize(harmonies: list, candidates: int = CANDIDATES, rng: Random = None) -> tuple:
+    """
+    Generate a batch of candidate base colors and harmonies and return the best one.
+
+    Args:
+        harmonies (list): Harmonies to choose from.
+        candidates (int, optional): Amount of candidates to score. Defaults to CANDIDATES.
+        rng (Random, optional): Random generator, seed it for reproducible results.
+
+    Returns:
+        tuple: Base color as HSV, the harmony and its score, or None without harmonies.
+    """
+    if not harmonies:
+        return None
+    rng = rng or Random()
+    rows = [(harmony, compile_harmony(harmony)) for harmony in harmonies]
+
+    best = None
+    for __ in range(candidates):
+        base = HSV(rng.uniform(0.0, 1.0), rng.uniform(0.2, 1.0), rng.uniform(0.4, 1.0))
+        harmony, harmony_rows = rows[rng.randrange(len(rows))]
+        score = score_palette([base] + derive_hsv(*base, harmony_rows))
+        if best is None or score > best[2]:
+            best = (base, harmony, score)
+    return best
@@ -0,0 +1,171 @@
+"""
+This module holds the registry which loads harmony definitions from disk.
+
+Definitions are read from the builtin definitions shipped with this package,
+the user directory and every directory listed in NUKE_COLOR_HARMONY_PATH.
+Each .json (or .toml, where supported) file holds a list of harmonies. Later
+definitions replace earlier ones with the same name, so shows can override
+builtins. Loading happens once on first access and is cached afterwards.
+Files outside the package which can not be read, and invalid definitions in
+them, are skipped with a warning, so one broken file does not stop the panel.
+
+Functions:
+    search_paths
+    load_harmonies
+    compile_harmony
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+from nuke_color_harmony.harmonies import Color, Harmony
+
+HARMONY_PATH_ENV = "NUKE_COLOR_HARMONY_PATH"
+BUILTIN_PATH = os.path.join(os.path.dirname(__file__), "definitions")
+USER_PATH = os.path.join(os.path.expanduser("~"), ".nuke", "nuke_color_harmony")
+COLOR_FIELDS = ("hue_offset", "saturation_scale", "value_scale")
+
+LOGGER = logging.getLogger(__name__)
+
+
+def search_paths() -> list:
+    """
+    Get all directories to load harmony definitions from, in order of priority.
+
+    Returns:
+        list: Directories, lowest priority first.
+    """
+    paths = [BUILTIN_PATH, USER_PATH]
+    paths.extend(path for path in os.environ.get(HARMONY_PATH_ENV, "").split(os.pathsep) if path)
+    return paths
+
+
+def _read_file(path: str) -> list:
+    """
+    Read raw harmony definitions from a single file.
+
+    Args:
+        path (str): Path of a .json or .toml file.
+
+    Raises:
+        ValueError: If the file is malformed.
+
+    Returns:
+        list: Raw definitions.
+    """
+    if path.endswith(".toml"):
+        with open(path, "rb") as src:
+            content = tomllib.load(src)
+    else:
+        with open(path, "r", encoding="utf-8") as src:
+            content = json.load(src)
+    if not isinstance(content, dict) or not isinstance(content.get("harmonies", []), list):
+        raise ValueError(f"{path} holds no list of harmonies")
+    return content.get("harmonies", [])
+
+
+def _validate(definition: dict, path: str) -> Harmony:
+    """
+    Validate a raw definition and convert it into a Harmony.
+
+    Args:
+        definition (dict): Raw definition.
+        path (str): File the definition comes from, used in error messages.
+
+    Raises:
+        ValueError: If the definition is invalid.
+
+    Returns:
+        Harmony: The validated harmony.
+    """
+    if not isinstance(definition, dict):
+        raise ValueError(f"Harmony definition in {path} is no mapping")
+    name = definition.get("name")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"Harmony without name in {path}")
+
+    colors = definition.get("colors")
+    if not isinstance(colors, list) or not colors:
+        raise ValueError(f"Harmony '{name}' in {path} has no colors")
+
+    for color in colors:
+        if not isinstance(color, dict):
+            raise ValueError(f"Harmony '{name}' in {path} has a color which is no mapping")
+        unknown = set(color) - set(COLOR_FIELDS)
+        if unknown:
+            raise ValueError(f"Harmony '{name}' in {path} has unknown fields {sorted(unknown)}")
+        for field in COLOR_FIELDS:
+            if not isinstance(color.get(field, 0.0), (int, float)):
+                raise ValueError(f"Harmony '{name}' in {path} has non numeric {field}")
+        if color.get("saturation_scale", 1.0) < 0 or color.get("value_scale", 1.0) < 0:
+            raise ValueError(f"Harmony '{name}' in {path} has negative scales")
+
+    return Harmony(name=name,
+                   colors=tuple(Color(**{field: float(value) for field, value in color.items()})
+                                for color in colors),
+                   tooltip=definition.get("tooltip", ""))
+
+
+@lru_cache(maxsize=None)
+def load_harmonies() -> tuple:
+    """
+    Load and validate all harmony definitions. Only reads from disk on first call.
+
+    Unreadable files and invalid definitions outside the builtin definitions are
+    skipped with a warning.
+
+    Raises:
+        ValueError: If a builtin definition is invalid.
+
+    Returns:
+        tuple: All harmonies in order of definition.
+    """
+    extensions = (".json", ".toml") if tomllib else (".json",)
+    harmonies = {}
+    for directory in search_paths():
+        if not os.path.isdir(directory):
+            continue
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.endswith(extensions):
+                continue
+            path = os.path.join(directory, file_name)
+            strict = directory == BUILTIN_PATH
+            try:
+                definitions = _read_file(path)
+            except (OSError, ValueError) as error:
+                if strict:
+                    raise
+                LOGGER.warning("Skipping harmony definitions %s: %s", path, error)
+                continue
+            for definition in definitions:
+                try:
+                    harmony = _validate(definition, path)
+                except ValueError as error:
+                    if strict:
+                        raise
+                    LOGGER.warning("Skipping harmony definition: %s", error)
+                    continue
+                harmonies[harmony.name] = harmony
+    return tuple(harmonies.values())
+
+
+@lru_cache(maxsize=None)
+def compile_harmony(harmony: Harmony) -> tuple:
+    """
+    Compile the colors of a harmony into rows of (hue offset, saturation scale, value scale).
+
+    Args:
+        harmony (Harmony): Harmony to compile.
+
+    Returns:
+        tuple: One row per color, cached per harmony.
+    """
+    return tuple(tuple(color) for color in harmony.colors)
+
@@ -0,0 +1,307 @@
+"""
+This module holds the live link between a standalone panel and Nuke over a local socket.
+
+The panel sends JSON lines, one per update, each holding all colors of the
+current harmony. Updates are coalesced on both ends: the sender keeps only the
+latest colors and sends at most MAX_RATE updates per second, the receiver keeps
+only the latest received colors and schedules a single apply on Nuke's main
+thread until that apply ran. Without Nuke, the module runs a stand-in receiver
+which prints the updates:
+
+    python -m nuke_color_harmony.remote
+
+Classes:
+    RemoteLinker
+    LinkReceiver
+
+Functions:
+    encode
+    decode
+    serve
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from nuke_color_harmony import IN_NUKE
+from nuke_color_harmony.formatter import hex_line
+from nuke_color_harmony.tracing import TRACER, traced
+
+try:
+    import nuke
+except ImportError:
+    pass
+
+HOST = "127.0.0.1"
+PORT = int(os.environ.get("NUKE_COLOR_HARMONY_LINK_PORT", 50505))
+MAX_RATE = 30
+RECONNECT_DELAY = 1.0
+
+_receiver = None
+
+
+def encode(rgbas: list) -> bytes:
+    """
+    Encode colors as one JSON line.
+
+    Args:
+        rgbas (list): Rgba tuples.
+
+    Returns:
+        bytes: Encoded line including line break.
+    """
+    colors = [[round(component, 6) for component in rgba] for rgba in rgbas]
+    return json.dumps({"colors": colors}, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> list:
+    """
+    Decode one JSON line into colors.
+
+    Args:
+        line (bytes): Encoded line.
+
+    Raises:
+        ValueError: If the line holds no valid update.
+
+    Returns:
+        list: Rgba tuples.
+    """
+    message = json.loads(line)
+    if not isinstance(message, dict) or not isinstance(message.get("colors"), list):
+        raise ValueError(f"Invalid live link update: {line!r}")
+    for rgba in message["colors"]:
+        if (not isinstance(rgba, list) or not 3 <= len(rgba) <= 4
+                or not all(isinstance(component, (int, float)) and not isinstance(component, bool)
+                           for component in rgba)):
+            raise ValueError(f"Invalid color in live link update: {rgba!r}")
+    return [tuple(float(component) for component in rgba) for rgba in message["colors"]]
+
+
+class RemoteLinker(object):
+    """
+    Drop-in for Linker in the standalone panel, which sends the colors to a LinkReceiver.
+    """
+
+    def __init__(self, host: str = HOST, port: int = PORT, max_rate: int = MAX_RATE) -> None:
+        """
+        Args:
+            host (str, optional): Host of the receiver. Defaults to HOST.
+            port (int, optional): Port of the receiver. Defaults to PORT.
+            max_rate (int, optional): Maximum updates per second. Defaults to MAX_RATE.
+        """
+        self._address = (host, port)
+        self._interval = 1.0 / max_rate
+        self._activated = False
+        self._values = []
+        self._latest = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._socket = None
+
+    def start(self) -> None:
+        """
+        Start the sender thread.
+        """
+        self._activated = True
+        self._thread = threading.Thread(target=self._run, name="nuke_color_harmony_link",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the sender thread, dropping updates which were not sent yet.
+        """
+        self._activated = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    @property
+    def state(self) -> bool:
+        return self._activated
+
+    @property
+    def values(self):
+        return self._values
+
+    @values.setter
+    @traced("RemoteLinker.values")
+    def values(self, colors) -> None:
+        self._values = colors
+        self.write([color.getRgbF() for color in colors])
+
+    def write(self, rgbas: list) -> None:
+        """
+        Queue the given colors, replacing any update which was not sent yet.
+
+        Args:
+            rgbas (list): Rgba tuples, base color first.
+        """
+        with self._lock:
+            self._latest = rgbas
+        self._wake.set()
+
+    def _connect(self) -> bool:
+        try:
+            self._socket = socket.create_connection(self._address, timeout=RECONNECT_DELAY)
+        except OSError:
+            self._socket = None
+        return self._socket is not None
+
+    def _run(self) -> None:
+        """
+        Send the latest colors at most once per interval until stopped.
+        """
+        sent = None
+        next_send = 0.0
+        try:
+            while self._activated:
+                self._wake.wait()
+                self._wake.clear()
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                with self._lock:
+                    rgbas, self._latest = self._latest, None
+                if not self._activated or rgbas is None or rgbas == sent:
+                    continue
+                if self._socket is None and not self._connect():
+                    # Keep the update for the next attempt unless a newer one arrived.
+                    with self._lock:
+                        self._latest = self._latest or rgbas
+                    next_send = time.monotonic() + RECONNECT_DELAY
+                    self._wake.set()
+                    continue
+                try:
+                    self._socket.sendall(encode(rgbas))
+                    sent = rgbas
+                    # Beyond this point the latency is on the side of Nuke.
+                    TRACER.mark_written()
+                except OSError:
+                    self._socket.close()
+                    self._socket = None
+                next_send = time.monotonic() + self._interval
+        finally:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+
+
+class LinkReceiver(object):
+    """
+    Receive colors from a RemoteLinker and apply the latest ones on the main thread.
+    """
+
+    def __init__(self, apply, schedule=None, host: str = HOST, port: int = PORT) -> None:
+        """
+        Args:
+            apply (function): Called with the rgba tuples of an update.
+            schedule (function, optional): Runs a function on the main thread. Defaults
+                to nuke.executeInMainThread, or a direct call outside Nuke.
+            host (str, optional): Host to listen on. Defaults to HOST.
+            port (int, optional): Port to listen on. Defaults to PORT.
+        """
+        if schedule is None:
+            schedule = nuke.executeInMainThread if IN_NUKE else (lambda function: function())
+        self._apply = apply
+        self._schedule = schedule
+        self._latest = None
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+        receiver = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def handle(self) -> None:
+                for line in self.rfile:
+                    try:
+                        receiver.receive(decode(line))
+                    except ValueError:
+                        continue
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self) -> tuple:
+        return self._server.server_address
+
+    def start(self) -> None:
+        """
+        Start listening in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="nuke_color_harmony_receiver", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop listening and close the socket. Shutting down waits for the serving
+        thread, so it is only done if the receiver was started.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def receive(self, rgbas: list) -> None:
+        """
+        Keep the given colors as latest update and schedule an apply, if none is pending.
+
+        Args:
+            rgbas (list): Rgba tuples.
+        """
+        with self._lock:
+            self._latest = rgbas
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule(self._flush)
+
+    def _flush(self) -> None:
+        with self._lock:
+            rgbas, self._latest = self._latest, None
+            self._scheduled = False
+        if rgbas:
+            self._apply(rgbas)
+
+
+def serve(port: int = PORT) -> LinkReceiver:
+    """
+    Start a receiver inside Nuke which writes updates into the selected harmony groups.
+    Only one receiver runs at a time.
+
+    Args:
+        port (int, optional): Port to listen on. Defaults to PORT.
+
+    Returns:
+        LinkReceiver: The running receiver.
+    """
+    global _receiver
+    if _receiver is None:
+        # Imported here, the stand-in receiver has to run without Qt.
+        from nuke_color_harmony.linker import Linker
+
+        _receiver = LinkReceiver(Linker().write, port=port)
+        _receiver.start()
+    return _receiver
+
+
+if __name__ == "__main__":
+    stand_in = LinkReceiver(lambda rgbas: print(hex_line(rgbas), end="", flush=True))
+    print(f"Listening on {stand_in.address[0]}:{stand_in.address[1]}", flush=True)
+    stand_in.start()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        stand_in.stop()
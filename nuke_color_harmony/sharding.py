@@ -0,0 +1,240 @@
+"""
+This module holds the sharded export for very large amounts of color sets.
+
+The color sets are split into shards which get formatted and written in
+parallel by a process pool. Each shard is written as its own part file and a
+manifest lists the byte offsets of every color set, so readers can seek
+straight to a single palette.
+
+Workers are always spawned, never forked from the host application. Inside
+Nuke sys.executable is Nuke itself, so workers are spawned with the Python
+interpreter shipped next to it, and without one the shards are written by a
+thread pool instead.
+
+Functions:
+    shard_path
+    write_shard
+    python_executable
+    export_sharded
+    benchmark
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from nuke_color_harmony.formatter import csv_line, nuke_group, nuke_script_frame
+
+NUKE_EXTENSION = ".nk"
+PYTHON_NAMES = ("python3", "python", "python.exe")
+
+
+def shard_path(path: str, index: int) -> str:
+    """
+    Get the path of a single part file.
+
+    Args:
+        path (str): Path of the full export.
+        index (int): Index of the shard.
+
+    Returns:
+        str: Path of the part file.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.part{index:04d}{ext}"
+
+
+def write_shard(path: str, first_index: int, rgb_sets: list, width: int = 0,
+                height: int = 0, nuke_version: str = "", delimiter: str = "|") -> dict:
+    """
+    Format the given color sets and write them as one part file.
+
+    Args:
+        path (str): Path of the part file. The extension decides the format.
+        first_index (int): Index of the first color set across all shards.
+        rgb_sets (list): Tuples of harmony name and rgb tuples.
+        width (int, optional): Width of the root format. Only used for .nk.
+        height (int, optional): Height of the root format. Only used for .nk.
+        nuke_version (str, optional): Version string. Only used for .nk.
+        delimiter (str, optional): Delimiter between colors. Only used for .csv.
+
+    Returns:
+        dict: Shard entry for the manifest.
+    """
+    if path.endswith(NUKE_EXTENSION):
+        header, footer = nuke_script_frame(nuke_version)
+        blocks = [nuke_group(name, rgbs, first_index + index, width, height)
+                  for index, (name, rgbs) in enumerate(rgb_sets, start=1)]
+    else:
+        header, footer = "", ""
+        blocks = [csv_line(rgbs, delimiter) for __, rgbs in rgb_sets]
+
+    header = header.encode("utf-8")
+    footer = footer.encode("utf-8")
+    blocks = [block.encode("utf-8") for block in blocks]
+
+    offsets = []
+    position = len(header)
+    for block in blocks:
+        offsets.append([position, len(block)])
+        position += len(block)
+
+    with open(path, "wb") as dst:
+        dst.write(header)
+        dst.write(b"".join(blocks))
+        dst.write(footer)
+
+    return {"file": os.path.basename(path),
+            "first": first_index,
+            "count": len(blocks),
+            "header": len(header),
+            "footer": len(footer),
+            "offsets": offsets}
+
+
+def _concatenate(path: str, shards: list) -> list:
+    """
+    Concatenate part files in order to a single file, keeping only one header and footer.
+
+    Args:
+        path (str): Path of the concatenated file.
+        shards (list): Shard entries from the manifest.
+
+    Returns:
+        list: Offsets of every color set inside the concatenated file.
+    """
+    directory = os.path.dirname(path)
+    offsets = []
+    footer = b""
+    with open(path, "wb") as dst:
+        for index, shard in enumerate(shards):
+            with open(os.path.join(directory, shard["file"]), "rb") as src:
+                content = src.read()
+            header_size = shard["header"]
+            body = content[header_size:len(content) - shard["footer"]]
+            if index == 0:
+                dst.write(content[:header_size])
+            position = dst.tell() - header_size
+            offsets.extend([offset + position, length]
+                           for offset, length in shard["offsets"])
+            dst.write(body)
+            footer = content[len(content) - shard["footer"]:]
+        dst.write(footer)
+    return offsets
+
+
+def python_executable() -> str:
+    """
+    Find a Python interpreter to spawn workers with. Inside Nuke sys.executable is
+    Nuke, its interpreter lies next to it or in the directory of sys.exec_prefix.
+
+    Returns:
+        str: Path of the interpreter or None if there is none.
+    """
+    directories = (os.path.dirname(sys.executable), sys.exec_prefix,
+                   os.path.join(sys.exec_prefix, "bin"))
+    candidates = [sys.executable]
+    candidates.extend(os.path.join(directory, name)
+                      for directory in directories for name in PYTHON_NAMES)
+    for candidate in candidates:
+        if (os.path.basename(candidate).lower().startswith("python")
+                and os.path.isfile(candidate) and os.access(candidate, os.X_OK)):
+            return candidate
+    return None
+
+
+def _executor(workers: int):
+    """
+    Create the pool writing the shards, spawning processes with a real Python
+    interpreter if there is one and falling back to threads otherwise.
+    """
+    executable = python_executable()
+    if executable is None:
+        return ThreadPoolExecutor(max_workers=workers)
+    context = multiprocessing.get_context("spawn")
+    if executable != sys.executable:
+        context.set_executable(executable)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def export_sharded(path: str, rgb_sets: list, shard_size: int = 1000, workers: int = None,
+                   concatenate: bool = False, **format_options) -> dict:
+    """
+    Export color sets in parallel as part files and write a manifest next to them.
+
+    Args:
+        path (str): Path of the full export. The extension decides the format.
+        rgb_sets (list): Tuples of harmony name and rgb tuples.
+        shard_size (int, optional): Amount of color sets per shard. Defaults to 1000.
+        workers (int, optional): Amount of workers. 1 formats in this process.
+            Defaults to None, which uses the cpu count.
+        concatenate (bool, optional): Concatenate all parts to the given path afterwards.
+        **format_options: Passed along to write_shard.
+
+    Returns:
+        dict: The manifest which has been written.
+    """
+    jobs = [(shard_path(path, index), start, rgb_sets[start:start + shard_size])
+            for index, start in enumerate(range(0, len(rgb_sets), shard_size))]
+
+    if workers == 1 or len(jobs) < 2:
+        shards = [write_shard(*job, **format_options) for job in jobs]
+    else:
+        with _executor(workers) as pool:
+            futures = [pool.submit(write_shard, *job, **format_options) for job in jobs]
+            shards = [future.result() for future in futures]
+
+    manifest = {"format": os.path.splitext(path)[1],
+                "count": len(rgb_sets),
+                "shards": shards}
+    if concatenate:
+        manifest["concatenated"] = {"file": os.path.basename(path),
+                                    "offsets": _concatenate(path, shards)}
+
+    with open(f"{os.path.splitext(path)[0]}.manifest.json", "w") as dst:
+        json.dump(manifest, dst)
+
+    return manifest
+
+
+def benchmark(directory: str, amount: int = 20000, max_workers: int = None,
+              shard_size: int = None) -> dict:
+    """
+    Time the sharded export of generated color sets from one up to max_workers processes.
+
+    The shard size stays the same for every amount of workers, so the timings only
+    differ in the parallelism.
+
+    Args:
+        directory (str): Directory to write the benchmark files into.
+        amount (int, optional): Amount of color sets to export. Defaults to 20000.
+        max_workers (int, optional): Highest amount of processes. Defaults to the cpu count.
+        shard_size (int, optional): Amount of color sets per shard. Defaults to four
+            shards per process at max_workers.
+
+    Returns:
+        dict: Seconds per amount of workers.
+    """
+    rgb_sets = [("analogous", [((index % 255) / 255.0, 0.5, 0.25)] * 5)
+                for index in range(amount)]
+    path = os.path.join(directory, "benchmark.nk")
+    max_workers = max_workers or os.cpu_count() or 1
+    shard_size = shard_size or max(1, amount // (max_workers * 4))
+    timings = {}
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        export_sharded(path, rgb_sets, shard_size=shard_size, workers=workers,
+                       width=1920, height=1080, nuke_version="14.0 v1")
+        timings[workers] = time.perf_counter() - start
+    return timings
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for amount_workers, seconds in benchmark(temp_dir).items():
+            print(f"{amount_workers} worker(s): {seconds:.3f}s")
@@ -0,0 +1,89 @@
+"""
+This module holds the persistence of the harmony store.
+
+Every palette keeps the id it was given on creation, also through edits, so groups
+imported into Nuke are recognized again. Next to the palettes the ids which have
+been imported by this store are recorded, so only those groups are ever removed as
+orphans. Saving is opt-in: the store is only saved, and restored in later
+sessions, if STORE_PATH_ENV names a file.
+
+Functions:
+    new_palette_id
+    save_store
+    load_store
+"""
+
+import json
+import os
+import uuid
+
+from nuke_color_harmony.harmonies import Color, Harmony
+
+STORE_PATH_ENV = "NUKE_COLOR_HARMONY_STORE"
+STORE_PATH = os.environ.get(STORE_PATH_ENV) or None
+
+
+def new_palette_id() -> str:
+    """
+    Get a new, unique palette id.
+
+    Returns:
+        str: Hex string of a random uuid.
+    """
+    return uuid.uuid4().hex
+
+
+def save_store(path: str, palettes: list, imported_ids) -> None:
+    """
+    Save the palettes of the store as json. The file is replaced as a whole, so an
+    interrupted save keeps the previous store.
+
+    Args:
+        path (str): Location of the store file.
+        palettes (list): Tuples of palette id, name or None, harmony and rgb tuples.
+        imported_ids (iterable): Palette ids which have been imported into Nuke.
+    """
+    content = {"imported": sorted(imported_ids),
+               "palettes": [{"id": palette_id,
+                             "name": name,
+                             "harmony": {"name": harmony.name,
+                                         "colors": [list(color) for color in harmony.colors],
+                                         "tooltip": harmony.tooltip},
+                             "colors": [list(rgb) for rgb in rgbs]}
+                            for palette_id, name, harmony, rgbs in palettes]}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as dst:
+        json.dump(content, dst)
+    os.replace(path + ".tmp", path)
+
+
+def load_store(path: str) -> tuple:
+    """
+    Load the palettes of a store saved before.
+
+    Args:
+        path (str): Location of the store file.
+
+    Raises:
+        ValueError: If the file is malformed.
+
+    Returns:
+        tuple: Palettes as tuples of palette id, name, harmony and rgb tuples, and the set of
+            imported palette ids. Both are empty if there is no store file yet.
+    """
+    if not os.path.exists(path):
+        return [], set()
+    with open(path, "r", encoding="utf-8") as src:
+        content = json.load(src)
+    try:
+        palettes = [(str(palette["id"]),
+                     palette.get("name"),
+                     Harmony(name=palette["harmony"]["name"],
+                             colors=tuple(Color(*color) for color in palette["harmony"]["colors"]),
+                             tooltip=palette["harmony"].get("tooltip", "")),
+                     [tuple(float(value) for value in rgb[:3]) for rgb in palette["colors"]])
+                    for palette in content["palettes"]]
+        imported_ids = set(content.get("imported", ()))
+    except (KeyError, TypeError) as error:
+        raise ValueError(f"{path} is no valid store: {error}") from error
+    return palettes, imported_ids
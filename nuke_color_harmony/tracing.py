@@ -0,0 +1,246 @@
+"""
+This module holds opt-in tracing of the hot paths of the panel.
+
+Traced functions record their duration into one session wide Tracer, while
+tracing is disabled they only check a flag and call through. Inputs on the
+colorwheel and slider are marked, and the first knob write after an input
+records the latency between both, which tells whether a laggy session is the
+panel or Nuke. Tracing is enabled with the panel's Trace toggle or by setting
+the environment variable TRACE_ENV; if it holds a path, the trace is written
+there in Chrome's trace event format when the session ends. The trace can be
+opened with chrome://tracing or https://ui.perfetto.dev.
+
+Classes:
+    Tracer
+
+Functions:
+    traced
+    trace_methods
+
+Constants:
+    TRACER: Tracer of the session.
+"""
+
+import atexit
+import inspect
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from functools import wraps
+
+from nuke_color_harmony.memory import register_component
+
+TRACE_ENV = "NUKE_COLOR_HARMONY_TRACE"
+MAX_EVENTS = 100000
+MAX_LATENCIES = 1024
+# Upper bounds of the latency histogram buckets in milliseconds, 16.7 is one frame at 60 fps.
+LATENCY_BUCKETS = (1.0, 2.0, 4.0, 8.0, 16.7, 33.3, 66.7, float("inf"))
+BARS = " ▁▂▃▄▅▆▇█"
+LATENCY_NAME = "input -> knob write"
+
+
+class Tracer(object):
+    """
+    Bounded recorder of timed spans and input latencies.
+    """
+
+    def __init__(self, max_events: int = MAX_EVENTS) -> None:
+        """
+        Args:
+            max_events (int, optional): Spans kept, older ones are dropped. Defaults
+                to MAX_EVENTS.
+        """
+        self.enabled = False
+        self._events = deque(maxlen=max_events)
+        self._latencies = deque(maxlen=MAX_LATENCIES)
+        self._input = None
+        self._origin = time.perf_counter()
+
+    def enable(self, flag: bool = True) -> None:
+        """
+        Start or stop recording. Recorded spans are kept.
+
+        Args:
+            flag (bool, optional): Whether to record. Defaults to True.
+        """
+        self.enabled = flag
+        self._input = None
+
+    def clear(self) -> None:
+        """
+        Drop all recorded spans and latencies.
+        """
+        self._events.clear()
+        self._latencies.clear()
+        self._input = None
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """
+        Record a span.
+
+        Args:
+            name (str): Name of the span.
+            start (float): perf_counter at the start.
+            end (float): perf_counter at the end.
+        """
+        self._events.append((name, start, end, threading.get_ident()))
+
+    def mark_input(self) -> None:
+        """
+        Mark a user input. Only the first input since the last knob write counts,
+        so the latency spans the whole wait of the user.
+        """
+        if self.enabled and self._input is None:
+            self._input = time.perf_counter()
+
+    def mark_written(self) -> None:
+        """
+        Mark a knob write, recording the latency since the pending input.
+        """
+        start, self._input = self._input, None
+        if not self.enabled or start is None:
+            return
+        end = time.perf_counter()
+        self._latencies.append((end - start) * 1000)
+        self.record(LATENCY_NAME, start, end)
+
+    def recorded(self) -> deque:
+        """
+        Get the recorded spans as tuples of name, start, end and thread id.
+
+        Returns:
+            deque: Recorded spans, oldest first.
+        """
+        return self._events
+
+    @property
+    def latencies(self) -> list:
+        """
+        Recent input latencies in milliseconds.
+        """
+        return list(self._latencies)
+
+    def histogram(self) -> list:
+        """
+        Count the recent latencies per bucket of LATENCY_BUCKETS.
+
+        Returns:
+            list: Amount of latencies per bucket.
+        """
+        counts = [0] * len(LATENCY_BUCKETS)
+        for latency in self.latencies:
+            counts[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        return counts
+
+    def latency_summary(self) -> str:
+        """
+        Format the recent latencies for a status bar, like
+        "input -> knob write p50 3.1 ms p95 9.8 ms ▁█▃▁  (n=120)".
+
+        Returns:
+            str: Summary, or an empty string without latencies.
+        """
+        latencies = sorted(self.latencies)
+        if not latencies:
+            return ""
+        counts = self.histogram()
+        peak = max(counts)
+        bars = "".join(BARS[count * (len(BARS) - 1) // peak] for count in counts)
+
+        def percentile(fraction: float) -> float:
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+        return (f"{LATENCY_NAME} p50 {percentile(0.5):.1f} ms p95 {percentile(0.95):.1f} ms "
+                f"{bars}  (n={len(latencies)})")
+
+    def chrome_trace(self) -> dict:
+        """
+        Convert the recorded spans into Chrome's trace event format.
+
+        Returns:
+            dict: Trace holding one complete event per span.
+        """
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid,
+                   "args": {"name": "nuke_color_harmony"}}]
+        events.extend({"name": name, "cat": "nuke_color_harmony", "ph": "X", "pid": pid,
+                       "tid": tid, "ts": round((start - self._origin) * 1e6, 3),
+                       "dur": round((end - start) * 1e6, 3)}
+                      for name, start, end, tid in list(self._events))
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> None:
+        """
+        Write the trace as JSON.
+
+        Args:
+            path (str): Path of the .json file.
+        """
+        with open(path, "w") as dst:
+            json.dump(self.chrome_trace(), dst)
+
+
+TRACER = Tracer()
+register_component("tracer", TRACER.recorded)
+
+
+def traced(name: str = None):
+    """
+    Decorator timing every call of a function into TRACER while tracing is enabled.
+
+    Args:
+        name (str, optional): Name of the span. Defaults to the qualified function name.
+
+    Returns:
+        function: Decorator.
+    """
+    def decorate(function):
+        label = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                TRACER.record(label, start, time.perf_counter())
+        return wrapper
+    return decorate
+
+
+def trace_methods(cls: type) -> type:
+    """
+    Class decorator tracing all methods defined on the class, except dunder methods.
+
+    Generator functions are skipped, a span around them would only time creating
+    the generator. Their cost is traced by the methods consuming them.
+
+    Args:
+        cls (type): Class to trace.
+
+    Returns:
+        type: The same class.
+    """
+    for attribute, value in list(vars(cls).items()):
+        if attribute.startswith("__"):
+            continue
+        function = value.__func__ if isinstance(value, staticmethod) else value
+        if inspect.isgeneratorfunction(function):
+            continue
+        if isinstance(value, staticmethod):
+            setattr(cls, attribute, staticmethod(traced()(value.__func__)))
+        elif callable(value):
+            setattr(cls, attribute, traced()(value))
+    return cls
+
+
+_trace_path = os.environ.get(TRACE_ENV, "")
+if _trace_path:
+    TRACER.enable()
+    if _trace_path != "1":
+        atexit.register(TRACER.write, _trace_path)
@@ -6,20 +6,26 @@ Classes:
     ValueSlider
     HarmonyButton
     HarmonieSelection
-    Variation
+    ColorStrip
     ColorBars
+    PaletteExplorer
     StoreItem
     ColorHarmonyUi
 
 Functions:
     set_style_sheet
     pen_color
+    to_color
+    from_color
+    harmony_colors
 
 """
 
+import logging
 import os
 from functools import partial
-from random import choice, uniform
+from itertools import count
+from random import Random, choice, uniform
 
 from PySide2 import QtCore, QtGui, QtWidgets
 from PySide2.QtCore import QLineF, QPointF, QRect, Qt
@@ -27,8 +33,26 @@ from PySide2.QtGui import (QBrush, QColor, QConicalGradient, QLinearGradient,
                            QMouseEvent, QPainter, QPaintEvent, QRadialGradient,
                            QResizeEvent)
 
-from nuke_color_harmony.controller import Controller as HarmonyController
-from nuke_color_harmony.harmonies import HARMONY_SETS, Color, Harmony
+from nuke_color_harmony import IN_NUKE
+from nuke_color_harmony.cache import LruCache, cache_stats, format_stats
+from nuke_color_harmony.colorspace import (OKLCH_MAX_CHROMA, TRANSFORMS,
+                                           oklch_to_srgb, oklch_wheel,
+                                           srgb_to_oklch)
+from nuke_color_harmony.contrast import Legibility, analyze, analyze_store
+from nuke_color_harmony.controller import EXPORT_TARGETS
+from nuke_color_harmony.controller import attach as attach_controller
+from nuke_color_harmony.cvd import DEFICIENCIES, simulate
+from nuke_color_harmony.explorer import cell_at, explorer_cells, render_atlas
+from nuke_color_harmony.extract import dominant_colors, sample_image
+from nuke_color_harmony.harmonies import HSV, Color, Harmony, derive_hsv
+from nuke_color_harmony.library import fit_palettes, read_palettes
+from nuke_color_harmony.memory import format_report, memory_report, register_component
+from nuke_color_harmony.quantize import PaletteQuantizer
+from nuke_color_harmony.randomizer import smart_randomize
+from nuke_color_harmony.registry import compile_harmony, load_harmonies
+from nuke_color_harmony.store import STORE_PATH, load_store, new_palette_id, save_store
+from nuke_color_harmony.tracing import TRACER, traced
+from nuke_color_harmony.writers import load_writers
 
 
 def set_style_sheet(widget: QtWidgets.QWidget) -> None:
@@ -59,6 +83,85 @@ def pen_color(value: float) -> QColor:
     return QtGui.QColor(10, 10, 10) if value > 0.3 else QtGui.QColor(150, 150, 150)
 
 
+LOGGER = logging.getLogger(__name__)
+
+HSV_STEPS = 10000
+EXTRACTED_HARMONY = Harmony(name="extracted", colors=(),
+                            tooltip="Dominant colors extracted from an image.")
+# Budget in bytes of each cache holding rendered images.
+IMAGE_CACHE_BUDGET = 64 * 2 ** 20
+# Budget in bytes of the evaluated harmonies, which hold a few QColors each.
+HARMONY_CACHE_BUDGET = 8 * 2 ** 20
+HARMONY_CACHE = LruCache("harmony_colors", maxsize=4096, maxbytes=HARMONY_CACHE_BUDGET)
+WHEEL_CACHE = LruCache("wheel", maxsize=32, maxbytes=IMAGE_CACHE_BUDGET)
+# Spaces the offsets and scales of a harmony are applied in. Coordinates of the
+# wheel are hue, radius and value between 0 and 1. In OKLCH these are the hue,
+# the chroma relative to OKLCH_MAX_CHROMA and the lightness.
+HARMONY_SPACES = ("hsv", "oklch")
+
+
+def to_color(space: str, coordinates: list) -> list:
+    """
+    Convert wheel coordinates of the given space into colors.
+
+    Args:
+        space (str): One of HARMONY_SPACES.
+        coordinates (list): Tuples of hue, radius and value between 0 and 1.
+
+    Returns:
+        list: Colors as QColor.
+    """
+    if space == "hsv":
+        return [QColor.fromHsvF(*hsv) for hsv in coordinates]
+    lchs = [(value, radius * OKLCH_MAX_CHROMA, hue * 360) for hue, radius, value in coordinates]
+    return [QColor.fromRgbF(*rgb) for rgb in oklch_to_srgb(lchs)]
+
+
+def from_color(space: str, color: QColor) -> tuple:
+    """
+    Convert a color into wheel coordinates of the given space.
+
+    Args:
+        space (str): One of HARMONY_SPACES.
+        color (QColor): Color to convert.
+
+    Returns:
+        tuple: Hue, radius and value between 0 and 1.
+    """
+    if space == "hsv":
+        return color.hueF(), color.saturationF(), color.valueF()
+    (lightness, chroma, hue), = srgb_to_oklch([(color.redF(), color.greenF(), color.blueF())])
+    return hue / 360, min(chroma / OKLCH_MAX_CHROMA, 1.0), lightness
+
+
+def harmony_colors(hue: float, saturation: float, value: float, harmony: Harmony,
+                   space: str = "hsv") -> tuple:
+    """
+    Get the derived colors of a harmony, memoized on the quantized base color.
+
+    The returned colors are shared between callers and must not be modified.
+
+    Args:
+        hue (float): Hue of the base color.
+        saturation (float): Saturation of the base color.
+        value (float): Value of the base color.
+        harmony (Harmony): Harmony to evaluate.
+        space (str, optional): Space the harmony is applied in. Defaults to "hsv".
+
+    Returns:
+        tuple: Derived colors as QColor.
+    """
+    key = (round(hue * HSV_STEPS), round(saturation * HSV_STEPS),
+           round(value * HSV_STEPS), harmony, space)
+
+    def evaluate() -> tuple:
+        rows = compile_harmony(harmony)
+        derived = derive_hsv(key[0] / HSV_STEPS, key[1] / HSV_STEPS, key[2] / HSV_STEPS, rows)
+        return tuple(to_color(space, derived))
+
+    return HARMONY_CACHE.get_or_compute(key, evaluate)
+
+
 class ColorWheel(QtWidgets.QFrame):
     """
     Colorwheel widget to display color in Hue and saturation.
@@ -73,19 +176,32 @@ class ColorWheel(QtWidgets.QFrame):
         self.selected_color = QColor.fromHsvF(*startcolor)
         self.x = 0.5
         self.y = 0.5
+        self.margin = margin
+        self.square = QRect()
+        self._circle_size = 12
+
+        # set_color reads the space and paints the harmony, set up both first.
+        self._harmony = None
+        self._calc_colors = []
+        self._space = "hsv"
 
         self.set_color(self.selected_color)
-        self.margin = margin
 
         qsp = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding,
                                     QtWidgets.QSizePolicy.Expanding)
         qsp.setHeightForWidth(True)
         self.setSizePolicy(qsp)
 
-        self._circle_size = 12
+        register_component("colorwheel", self.held_data)
 
-        self._harmony = None
-        self._calc_colors = []
+    def held_data(self) -> list:
+        """
+        Get the data held by the colorwheel, for memory accounting.
+
+        Returns:
+            list: Calculated colors of the current harmony.
+        """
+        return self._calc_colors
 
     def _update_harmony(self, harmony: Harmony, trigger: bool) -> None:
         """
@@ -122,6 +238,7 @@ class ColorWheel(QtWidgets.QFrame):
         self.square = QRect(0, 0, size, size)
         self.square.moveCenter(self.rect().center())
 
+    @traced("ColorWheel.paintEvent")
     def paintEvent(self, ev: QPaintEvent) -> None:
         """
         Override paintEvent.
@@ -134,20 +251,26 @@ class ColorWheel(QtWidgets.QFrame):
         p = QPainter(self)
         p.setViewport(self.margin, self.margin, self.width() -
                       2*self.margin, self.height()-2*self.margin)
-        hsv_grad = QConicalGradient(center, 90)
-        for deg in range(360):
-            col = QColor.fromHsvF(deg / 360, 1.0, self.v)
-            hsv_grad.setColorAt(deg / 360, col)
-
-        val_grad = QRadialGradient(center, self.radius)
-        val_grad.setColorAt(0.0, QColor.fromHsvF(0.0, 0.0, self.v, 1.0))
-        val_grad.setColorAt(1.0, Qt.transparent)
-
-        p.setPen(Qt.transparent)
-        p.setBrush(hsv_grad)
-        p.drawEllipse(self.square)
-        p.setBrush(val_grad)
-        p.drawEllipse(self.square)
+        if self._space == "hsv":
+            hsv_grad = QConicalGradient(center, 90)
+            for deg in range(360):
+                col = QColor.fromHsvF(deg / 360, 1.0, self.v)
+                hsv_grad.setColorAt(deg / 360, col)
+
+            val_grad = QRadialGradient(center, self.radius)
+            val_grad.setColorAt(0.0, QColor.fromHsvF(0.0, 0.0, self.v, 1.0))
+            val_grad.setColorAt(1.0, Qt.transparent)
+
+            p.setPen(Qt.transparent)
+            p.setBrush(hsv_grad)
+            p.drawEllipse(self.square)
+            p.setBrush(val_grad)
+            p.drawEllipse(self.square)
+        else:
+            size = self.square.width()
+            key = (self._space, size, round(self.v * 100))
+            wheel = WHEEL_CACHE.get_or_compute(key, partial(self.render_oklch_wheel, size, key[2] / 100))
+            p.drawPixmap(self.square.topLeft(), wheel)
 
         p.setPen(p_color)
         p.setBrush(self.selected_color)
@@ -160,25 +283,51 @@ class ColorWheel(QtWidgets.QFrame):
         p.drawEllipse(line.p2(), self._circle_size, self._circle_size)
 
         self.calculate_colors(angle=angle, p=p)
+        self.emit_color_changed()
+
+    @traced("ColorWheel.color_changed")
+    def emit_color_changed(self) -> None:
+        """
+        Emit the calculated colors to all connected slots, which run synchronously.
+        """
         self.color_changed.emit(self._calc_colors)
 
-    def get_target_color(self, color: QColor) -> QColor:
+    @staticmethod
+    def render_oklch_wheel(size: int, lightness: float):
         """
-        Calculate anohter color based on the given Harmony.
+        Render the OKLCH wheel at the given lightness into a pixmap.
+
+        Every hue is drawn as a thin pie with a radial gradient over its chromas.
 
         Args:
-            color (QColor): Colr as part from a harmony set.
+            size (int): Diameter of the wheel in pixels.
+            lightness (float): OKLCH lightness.
 
         Returns:
-            QColor: Calculated new color based on the given harmony color rules.
-        """
-        target = (
-            ((self.h * 360 + color.hue_offset) - 360) % 360) / 360
-
-        target_color = QColor().fromHsvF(
-            target, self.s*color.saturation_scale, self.v*color.value_scale)
-        return target_color
-
+            QtGui.QPixmap: Rendered wheel.
+        """
+        pixmap = QtGui.QPixmap(size, size)
+        pixmap.fill(Qt.transparent)
+        if size <= 0:
+            return pixmap
+        center = QPointF(size / 2, size / 2)
+        wheel = oklch_wheel(lightness)
+        span = 360 / len(wheel)
+
+        p = QPainter(pixmap)
+        p.setPen(Qt.NoPen)
+        for index, ramp in enumerate(wheel):
+            gradient = QRadialGradient(center, size / 2)
+            for step, rgb in enumerate(ramp):
+                gradient.setColorAt(step / (len(ramp) - 1), QColor.fromRgbF(*rgb))
+            p.setBrush(gradient)
+            # Overlap neighbouring pies slightly to avoid seams.
+            p.drawPie(QRect(0, 0, size, size), round((index * span + 90 - span) * 16),
+                      round(span * 2 * 16))
+        p.end()
+        return pixmap
+
+    @traced("ColorWheel.calculate_colors")
     def calculate_colors(self, angle: float, p=None) -> None:
         """
         Calculate all to be included on the current Harmony set and potentially draaw them.
@@ -192,13 +341,14 @@ class ColorWheel(QtWidgets.QFrame):
         if not self._harmony:
             return
 
-        center = self.rect().center()
+        derived = harmony_colors(self.h, self.s, self.v, self._harmony, self._space)
+        self._calc_colors.extend(derived)
+        if p is None:
+            return
 
-        for color in self._harmony.colors:
-            target_color = self.get_target_color(color)
-            self._calc_colors.append(target_color)
-            if p is not None:
-                self.draw_color_on_wheel(p, angle, center, color, target_color)
+        center = self.rect().center()
+        for color, target_color in zip(self._harmony.colors, derived):
+            self.draw_color_on_wheel(p, angle, center, color, target_color)
 
     def draw_color_on_wheel(self, p: QPainter, angle: float, center: float, color: Color, target_color: QColor):
         """
@@ -223,7 +373,10 @@ class ColorWheel(QtWidgets.QFrame):
         """
         Recalculate the selected color components and repaint widget.
         """
-        self.selected_color.setHsvF(self.h, self.s, self.v)
+        if self._space == "hsv":
+            self.selected_color.setHsvF(self.h, self.s, self.v)
+        else:
+            self.selected_color = to_color(self._space, [(self.h, self.s, self.v)])[0]
         self.repaint()
 
     def map_color(self, x: int, y: int) -> tuple:
@@ -250,7 +403,8 @@ class ColorWheel(QtWidgets.QFrame):
         self.x = ev.x() / self.width()
         self.y = ev.y() / self.height()
 
-        self.color_changed.emit(self._calc_colors)
+        TRACER.mark_input()
+        self.emit_color_changed()
 
         self.recalc()
 
@@ -268,16 +422,26 @@ class ColorWheel(QtWidgets.QFrame):
             color (QColor): color to update colorwheel to.
             repaint (bool, optional): If True a repaint will be triggered. Defaults to True.
         """
-        self.h = color.hueF()
-        self.s = color.saturationF()
-        self.v = color.valueF()
+        self.h, self.s, self.v = from_color(self._space, color)
         self.selected_color = color
         if repaint:
             self.repaint()
 
+    def set_space(self, space: str) -> None:
+        """
+        Set the space the wheel is shown in and the harmony is applied in.
+
+        The selected color is kept and converted into the new space.
+
+        Args:
+            space (str): One of HARMONY_SPACES.
+        """
+        self._space = space
+        self.set_color(self.selected_color)
+
     def set_value(self, value: float) -> None:
         """
-        Set the value component of the HSV color.
+        Set the value component of the HSV color, or the lightness in OKLCH.
 
         Args:
             value (float): Value component.
@@ -345,6 +509,7 @@ class ValueSlider(QtWidgets.QWidget):
         Args:
             value (float): New value of slider.
         """
+        TRACER.mark_input()
         self.value_changed.emit(value/self._scale_factor)
 
     @property
@@ -391,6 +556,7 @@ class HarmonieSelection(QtWidgets.QGroupBox):
 
     selection_changed = QtCore.Signal(object, bool)
     randomize_values = QtCore.Signal()
+    smart_randomize_values = QtCore.Signal()
     add_current_to_store = QtCore.Signal()
 
     def __init__(self, parent=None) -> None:
@@ -409,20 +575,21 @@ class HarmonieSelection(QtWidgets.QGroupBox):
         """
         Build widgets to add to this very widget.
         """
-        for harmony_set in HARMONY_SETS:
+        for harmony_set in load_harmonies():
             btn = HarmonyButton(harmony_set)
             self._harmony_btns.append(btn)
 
         self.btn_randomize = QtWidgets.QPushButton("randomize")
+        self.btn_smart_randomize = QtWidgets.QPushButton("smart randomize")
         self.btn_add_to_store = QtWidgets.QPushButton("add to store >>")
 
-        self.btn_randomize.setMaximumWidth(250)
-        self.btn_add_to_store.setMaximumWidth(250)
+        self.btn_smart_randomize.setToolTip(
+            "Score a batch of random colors and harmonies and apply the best one.")
 
-        self.btn_randomize.setObjectName("Button")
-        self.btn_add_to_store.setObjectName("Button")
-        set_style_sheet(self.btn_randomize)
-        set_style_sheet(self.btn_add_to_store)
+        for btn in (self.btn_randomize, self.btn_smart_randomize, self.btn_add_to_store):
+            btn.setMaximumWidth(250)
+            btn.setObjectName("Button")
+            set_style_sheet(btn)
 
     def build_layouts(self) -> None:
         """
@@ -434,6 +601,7 @@ class HarmonieSelection(QtWidgets.QGroupBox):
             button_layout.addWidget(btn)
         button_layout.addStretch()
         button_layout.addWidget(self.btn_randomize)
+        button_layout.addWidget(self.btn_smart_randomize)
         button_layout.addSpacing(10)
         button_layout.addWidget(self.btn_add_to_store)
 
@@ -449,6 +617,7 @@ class HarmonieSelection(QtWidgets.QGroupBox):
             btn.clicked.connect(self.emit_harmony_change)
 
         self.btn_randomize.clicked.connect(self.emit_randomize_values)
+        self.btn_smart_randomize.clicked.connect(self.smart_randomize_values.emit)
         self.btn_add_to_store.clicked.connect(self.emit_add_to_store)
 
     def restore(self, harmony: Harmony) -> None:
@@ -458,13 +627,28 @@ class HarmonieSelection(QtWidgets.QGroupBox):
         Args:
             harmony (Harmony): Harmony to set checked.
         """
-        self._current.setChecked(False)
+        if self._current:
+            self._current.setChecked(False)
         for btn in self._harmony_btns:
             if btn.harmony_set == harmony:
                 btn.setChecked(True)
                 self._current = btn
                 return
 
+    def select(self, harmony: Harmony, trigger: bool = True) -> None:
+        """
+        Check the button of the given harmony and emit the harmony change.
+
+        Args:
+            harmony (Harmony): Harmony to select.
+            trigger (bool, optional): Option to trigger signals further down. Defaults to True.
+        """
+        for btn in self._harmony_btns:
+            if btn.harmony_set == harmony:
+                btn.setChecked(True)
+                self.emit_harmony_change(btn=btn, trigger=trigger)
+                return
+
     def emit_harmony_change(self, _=None, btn: HarmonyButton = None, trigger: bool = True) -> None:
         """
         Emit harmony changed signal and set current harmony on widget.
@@ -506,95 +690,149 @@ class HarmonieSelection(QtWidgets.QGroupBox):
         self.add_current_to_store.emit()
 
 
-class Variation(QtWidgets.QWidget):
+class ColorStrip(QtWidgets.QWidget):
     """
-    Widget to show the a specific color with overlay of its RGB colors.
+    Widget to show any amount of colors as bars with an overlay of their RGB values.
+
+    All bars are painted in a single pass. Labels and font metrics are cached and
+    only the rects of bars whose color changed are repainted.
     """
 
-    def __init__(self, color=None, parent=None) -> None:
+    min_bars = 5
+    spacing = 6
+
+    def __init__(self, parent=None) -> None:
         super().__init__(parent=parent)
-        self._clear_color = QColor(0.0, 0.0, 0.0, 0.0)
-        self._color = color or self._clear_color
-        self._color_label = ""
-        self._active = False
+        self._colors = []
+        self._rgbs = []
+        self._shown = []
+        self._deficiency = None
+        self._labels = {}
+        self._font = QtGui.QFont("Decorative", 10)
+        self._text_height = QtGui.QFontMetrics(self._font).lineSpacing() * 4
 
-    def set_color(self, color: QColor) -> None:
+    def sizeHint(self) -> QtCore.QSize:
         """
-        Apply given color to the background.
+        Override size hint.
+
+        Returns:
+            QtCore.QSize: Size used as siz hint.
+        """
+        return QtCore.QSize(1000, 400)
+
+    def bar_rect(self, index: int) -> QRect:
+        """
+        Get the area of the bar at the given index.
 
         Args:
-            color (QColor): Color to apply onto widget.
+            index (int): Index of the bar.
+
+        Returns:
+            QRect: Area of the bar.
         """
-        self._color = color
-        palette = self.palette()
-        palette.setColor(QtGui.QPalette.Window, color)
-        self.setPalette(palette)
-        self.setAutoFillBackground(True)
-        self.build_overlay()
-        self._active = True
+        slots = max(len(self._colors), self.min_bars)
+        width = (self.width() - self.spacing * (slots - 1)) / slots
+        left = round(index * (width + self.spacing))
+        return QRect(left, 0, round(width), self.height())
 
-    def sizeHint(self) -> QtCore.QSize:
+    def label(self, rgb: tuple) -> str:
         """
-        Override size hint.
+        Get the cached overlay text of the given color.
+
+        Args:
+            rgb (tuple): Rgb values as floats.
 
         Returns:
-            QtCore.QSize: Size used as siz hint.
+            str: Overlay text.
         """
-        return QtCore.QSize(200, 400)
+        label = self._labels.get(rgb)
+        if label is None:
+            if len(self._labels) > 256:
+                self._labels.clear()
+            label = f"red:     {rgb[0]:.2f}\ngreen: {rgb[1]:.2f}\nblue:   {rgb[2]:.2f}\n"
+            self._labels[rgb] = label
+        return label
 
-    def clear_color(self) -> None:
+    def set_colors(self, colors: list) -> None:
         """
-        Clear out color on the variation widget.
+        Apply given colors onto the bars, repainting only the changed ones.
+
+        Args:
+            colors (list): Colors to display.
         """
-        self._color = self._clear_color
-        self.set_color(self._clear_color)
-        self._active = False
+        rgbs = [color.getRgbF()[:3] for color in colors]
+        if len(rgbs) != len(self._rgbs):
+            dirty = None
+        else:
+            dirty = [index for index, (old, new) in enumerate(zip(self._rgbs, rgbs)) if old != new]
 
-    @property
-    def color(self) -> QColor:
+        self._colors = [QColor(color) for color in colors]
+        self._rgbs = rgbs
+        self._shown = self.shown_colors()
+
+        if dirty is None:
+            super().update()
+            return
+        for index in dirty:
+            super().update(self.bar_rect(index))
+
+    def shown_colors(self) -> list:
         """
-        Access protected attribute as property.
+        Get the colors to paint, simulated if a deficiency is previewed.
 
         Returns:
-            QColor: Protected attribte _color.
+            list: Colors as QColor.
         """
-        return self._color
+        if self._deficiency is None:
+            return self._colors
+        return [QColor.fromRgbF(*rgb) for rgb in simulate(self._rgbs, self._deficiency)]
 
-    def build_overlay(self) -> None:
+    def set_deficiency(self, deficiency: str) -> None:
         """
-        Assemble overlay text for variation.
+        Preview the colors as seen with the given color vision deficiency.
+
+        Args:
+            deficiency (str): Name in DEFICIENCIES or None for normal vision.
         """
-        rgb = self._color.getRgbF()[:3]
-        rgb_colors = f"red:     {rgb[0]:.2f}\ngreen: {rgb[1]:.2f}\nblue:   {rgb[2]:.2f}\n"
-        self._color_label = rgb_colors
+        self._deficiency = deficiency
+        self._shown = self.shown_colors()
+        super().update()
 
-    def paintEvent(self, event) -> None:
+    def clear_colors(self) -> None:
         """
-        Override PaintEvent.
+        Clear out all colors.
+        """
+        self.set_colors([])
 
-        Args:
-            event (QPaintEvent): PaintEvent.
+    @property
+    def colors(self) -> list:
         """
-        if self._active:
-            painter = QtGui.QPainter()
-            painter.begin(self)
-            self.draw_text(event, painter)
-            painter.end()
+        Access protected attribute _colors.
 
-    def draw_text(self, event, painter: QPainter) -> None:
+        Returns:
+            list: Displayed colors.
         """
-        Draw text onto the Variation widget.
+        return self._colors
+
+    def paintEvent(self, event) -> None:
+        """
+        Override PaintEvent. Paints all bars intersecting the dirty region.
 
         Args:
             event (QPaintEvent): PaintEvent.
-            painter (QPainter): QPainter.
         """
-        p_color = pen_color(self._color.valueF())
-        painter.setPen(p_color)
-        painter.setFont(QtGui.QFont("Decorative", 10))
-        painter.drawText(event.rect(),
-                         QtCore.Qt.AlignBottom,
-                         self._color_label)
+        painter = QtGui.QPainter(self)
+        painter.setFont(self._font)
+        for index, (color, rgb) in enumerate(zip(self._shown, self._rgbs)):
+            rect = self.bar_rect(index)
+            if not event.rect().intersects(rect):
+                continue
+            painter.fillRect(rect, color)
+            painter.setPen(pen_color(color.valueF()))
+            painter.drawText(rect.adjusted(0, rect.height() - self._text_height, 0, 0),
+                             QtCore.Qt.AlignBottom,
+                             self.label(rgb))
+        painter.end()
 
 
 class ColorBars(QtWidgets.QGroupBox):
@@ -602,61 +840,169 @@ class ColorBars(QtWidgets.QGroupBox):
     Widget to hold the different color variations.
     """
 
+    deficiency_changed = QtCore.Signal(object)
+
     def __init__(self, parent=None):
         super(ColorBars, self).__init__(parent=parent)
         self.setTitle("Preview")
-        self._variations = []
 
         self.build_widgets()
         self.build_layouts()
+        self.set_up_signals()
 
     def build_widgets(self) -> None:
         """
         Build widgets to add to this very widget.
         """
-        for _ in range(5):
-            new_var = Variation(parent=self)
-            self._variations.append(new_var)
+        self.strip = ColorStrip(parent=self)
+        self.vision_box = QtWidgets.QComboBox()
+        self.vision_box.addItem("normal vision", None)
+        for deficiency in DEFICIENCIES:
+            self.vision_box.addItem(deficiency, deficiency)
+        self.vision_box.setToolTip(
+            "Simulate a color vision deficiency on the preview and the store.")
 
     def build_layouts(self) -> None:
         """
         Build widget layout and add other widgets accordingly.
         """
-        bars_layout = QtWidgets.QHBoxLayout()
-        for var in self._variations:
-            bars_layout.addWidget(var)
-
         main_layout = QtWidgets.QVBoxLayout()
-        main_layout.addLayout(bars_layout)
+        main_layout.addWidget(self.vision_box, alignment=QtCore.Qt.AlignRight)
+        main_layout.addWidget(self.strip)
         self.setLayout(main_layout)
 
+    def set_up_signals(self) -> None:
+        """
+        Connect signals from widgets to adapt UI.
+        """
+        self.vision_box.currentIndexChanged.connect(self.emit_deficiency)
+
+    def emit_deficiency(self, index: int) -> None:
+        """
+        Preview the selected deficiency on the strip and emit it.
+
+        Args:
+            index (int): Index of the selected entry.
+        """
+        deficiency = self.vision_box.itemData(index)
+        self.strip.set_deficiency(deficiency)
+        self.deficiency_changed.emit(deficiency)
+
     def update(self, colors: list) -> None:
         """
-        Set given coolor onto the variations.
+        Set given coolor onto the color strip.
 
         Args:
             colors (list): Colors to be displayed on the colorbars widget.
         """
-        self.clear_colors()
-        for index, color in enumerate(colors):
-            self._variations[index].set_color(color)
+        self.strip.set_colors(colors)
 
     def clear_colors(self) -> None:
         """
-        Clear out every color on the variations.
+        Clear out every color on the color strip.
         """
-        for var in self._variations:
-            var.clear_color()
+        self.strip.clear_colors()
 
     @property
-    def variations(self) -> list:
+    def colors(self) -> list:
         """
-        Access protected atribte _variations.
+        Access the currently displayed colors.
 
         Returns:
-            list: protected atribte _variations.
+            list: Colors on the color strip.
         """
-        return self._variations
+        return self.strip.colors
+
+
+class PaletteExplorer(QtWidgets.QGroupBox):
+    """
+    Grid of candidate palettes around the current base color, painted from one cached image.
+    """
+
+    palette_selected = QtCore.Signal(object, object)
+
+    atlas_cache = LruCache("explorer_atlas", maxsize=32, maxbytes=IMAGE_CACHE_BUDGET)
+
+    def __init__(self, parent=None):
+        super(PaletteExplorer, self).__init__(parent=parent)
+        self.setTitle("Explorer")
+        self.setMinimumHeight(300)
+        self._key = None
+        self._rows = []
+        self._atlas = None
+
+    def set_base(self, color: QColor) -> None:
+        """
+        Update the grid around the given base color. Only rebuilds on a changed base.
+
+        Args:
+            color (QColor): Base color.
+        """
+        harmonies = load_harmonies()
+        key = (round(color.hueF() * HSV_STEPS), round(color.saturationF() * HSV_STEPS),
+               round(color.valueF() * HSV_STEPS), harmonies)
+        if key == self._key:
+            return
+        self._key = key
+        self._rows, self._atlas = self.atlas_cache.get_or_compute(
+            key, partial(self.build_atlas, HSV(*(step / HSV_STEPS for step in key[:3])), harmonies))
+        self.update()
+
+    @staticmethod
+    def build_atlas(base: HSV, harmonies: tuple) -> tuple:
+        """
+        Build the cells and their atlas image for the given base color.
+
+        Args:
+            base (HSV): Base color.
+            harmonies (tuple): Harmonies to sweep across.
+
+        Returns:
+            tuple: Rows of cells and the atlas as QImage.
+        """
+        rows = explorer_cells(base, harmonies)
+        pixels, width, height = render_atlas(rows)
+        image = QtGui.QImage(pixels, width, height, width * 4, QtGui.QImage.Format_ARGB32)
+        return rows, image.copy()
+
+    def atlas_rect(self) -> QRect:
+        """
+        Get the area inside the widget which displays the atlas.
+
+        Returns:
+            QRect: Area of the atlas.
+        """
+        return self.contentsRect().adjusted(10, 20, -10, -10)
+
+    def paintEvent(self, event) -> None:
+        """
+        Override PaintEvent.
+
+        Args:
+            event (QPaintEvent): PaintEvent.
+        """
+        super(PaletteExplorer, self).paintEvent(event)
+        if self._atlas is None:
+            return
+        painter = QtGui.QPainter(self)
+        painter.drawImage(self.atlas_rect(), self._atlas)
+        painter.end()
+
+    def mousePressEvent(self, event) -> None:
+        """
+        Emit the palette of the clicked cell.
+
+        Args:
+            event (QMouseEvent): MouseEvent.
+        """
+        rect = self.atlas_rect()
+        if self._atlas is None or not rect.contains(event.pos()):
+            return
+        x = (event.x() - rect.x()) * self._atlas.width() / rect.width()
+        y = (event.y() - rect.y()) * self._atlas.height() / rect.height()
+        cell = cell_at(self._rows, x, y)
+        if cell:
+            self.palette_selected.emit(cell[0], cell[1])
 
 
 class HarmonyStore(QtWidgets.QGroupBox):
@@ -665,14 +1011,77 @@ class HarmonyStore(QtWidgets.QGroupBox):
     """
 
     restore_store_item = QtCore.Signal(object)
+    replace_store_item = QtCore.Signal(object)
+    quantize_store_item = QtCore.Signal(object)
+    bake_store_item = QtCore.Signal(object)
+    animate_store_item = QtCore.Signal(object)
 
-    def __init__(self, parent=None):
+    sort_modes = ("Added", "Contrast", "Distinctness")
+
+    def __init__(self, parent=None, path: str = STORE_PATH):
         super(HarmonyStore, self).__init__(parent=parent)
         self.setTitle("Harmony Store")
+        self.sort_mode = "Added"
+        self.deficiency = None
+        self.path = path
+        self.imported_ids = set()
         self.build_widgets()
         self.build_layouts()
         self.set_up_window_properties()
         self.set_up_signals()
+        self.load()
+        register_component("store", self.held_data)
+
+    def held_data(self) -> list:
+        """
+        Get the data held by all StoreItems, for memory accounting.
+
+        Returns:
+            list: Color set, palette id and legibility per item.
+        """
+        return [(item.color_set, item.palette_id, item.legibility) for item in self.items]
+
+    def load(self) -> None:
+        """
+        Fill the store with the palettes saved in a previous session, if saving is
+        enabled. A store file which can not be read is skipped with a warning.
+        """
+        if self.path is None:
+            return
+        try:
+            palettes, self.imported_ids = load_store(self.path)
+        except (OSError, ValueError) as error:
+            LOGGER.warning("Skipped loading the harmony store: %s", error)
+            return
+        self.add_palettes([(harmony, [QColor.fromRgbF(*rgb) for rgb in rgbs], name, palette_id)
+                           for palette_id, name, harmony, rgbs in palettes], save=False)
+
+    def save(self) -> None:
+        """
+        Save all palettes with their ids and the imported palette ids, if saving is enabled.
+        """
+        if self.path is None:
+            return
+        try:
+            save_store(self.path,
+                       [(item.palette_id, item.name, item.harmony,
+                         [color.getRgbF()[:3] for color in item.color_set])
+                        for item in self.items],
+                       self.imported_ids)
+        except OSError as error:
+            LOGGER.warning("Could not save the harmony store: %s", error)
+
+    def record_import(self, remove_orphans: bool) -> None:
+        """
+        Record the palettes of the store as imported into Nuke.
+
+        Args:
+            remove_orphans (bool): Whether groups of palettes which are not part of the
+                store anymore have been removed, so their ids are forgotten.
+        """
+        palette_ids = {item.palette_id for item in self.items}
+        self.imported_ids = palette_ids if remove_orphans else self.imported_ids | palette_ids
+        self.save()
 
     def build_widgets(self) -> None:
         """
@@ -681,12 +1090,17 @@ class HarmonyStore(QtWidgets.QGroupBox):
         self.list_widget = QtWidgets.QListWidget()
         self.list_widget.setSelectionMode(
             QtWidgets.QAbstractItemView.SingleSelection)
+        self.sort_box = QtWidgets.QComboBox()
+        self.sort_box.addItems(self.sort_modes)
+        self.sort_box.setToolTip(
+            "Sort by best WCAG contrast or by the smallest OKLab distance within each palette.")
 
     def build_layouts(self) -> None:
         """
         Build widget layout and add other widgets accordingly.
         """
         main_layout = QtWidgets.QVBoxLayout()
+        main_layout.addWidget(self.sort_box)
         main_layout.addWidget(self.list_widget)
         self.setLayout(main_layout)
 
@@ -707,6 +1121,7 @@ class HarmonyStore(QtWidgets.QGroupBox):
                                  self.context_menu)
 
         self.list_widget.itemDoubleClicked.connect(self.item_double_clicked)
+        self.sort_box.currentTextChanged.connect(self.sort_items)
 
     @property
     def items(self) -> list:
@@ -729,6 +1144,69 @@ class HarmonyStore(QtWidgets.QGroupBox):
         store_item = StoreItem(
             harmony=harmony, color_set=color_set, parent=self)
         self.list_widget.addItem(store_item)
+        if self.sort_mode != "Added":
+            self.list_widget.sortItems()
+        self.save()
+
+    def replace_colors(self, item, harmony: Harmony, color_set: list) -> None:
+        """
+        Replace harmony and colors of given item, keeping its palette id.
+
+        Args:
+            item (StoreItem): Item to replace.
+            harmony (Harmony): Harmony Set.
+            color_set (list): Colors as list.
+        """
+        item.replace(harmony, color_set)
+        if self.sort_mode != "Added":
+            self.list_widget.sortItems()
+        self.save()
+
+    def set_deficiency(self, deficiency: str) -> None:
+        """
+        Redraw all swatches as seen with the given color vision deficiency.
+
+        Args:
+            deficiency (str): Name in DEFICIENCIES or None for normal vision.
+        """
+        self.deficiency = deficiency
+        for item in self.items:
+            item.draw_background()
+
+    def add_palettes(self, palettes: list, save: bool = True) -> None:
+        """
+        Add many palettes at once. Their legibility is analyzed in one batch and the
+        list is only repainted and sorted once at the end.
+
+        Args:
+            palettes (list): Tuples of harmony, colors as QColor, name and palette id
+                to keep, the latter two can be None.
+            save (bool, optional): Save the store afterwards. Defaults to True.
+        """
+        legibilities = analyze_store([[color.getRgbF()[:3] for color in palette[1]]
+                                      for palette in palettes])
+        self.list_widget.setUpdatesEnabled(False)
+        try:
+            for (harmony, color_set, name, palette_id), legibility in zip(palettes, legibilities):
+                self.list_widget.addItem(StoreItem(harmony=harmony, color_set=color_set,
+                                                   parent=self, legibility=legibility,
+                                                   name=name, palette_id=palette_id))
+            if self.sort_mode != "Added":
+                self.list_widget.sortItems()
+        finally:
+            self.list_widget.setUpdatesEnabled(True)
+        if save:
+            self.save()
+
+    def sort_items(self, mode: str) -> None:
+        """
+        Sort the items in the store, least legible first.
+
+        Args:
+            mode (str): One of sort_modes.
+        """
+        self.sort_mode = mode
+        self.list_widget.sortItems()
 
     def context_menu(self, QPos: QPointF) -> None:
         """
@@ -741,6 +1219,14 @@ class HarmonyStore(QtWidgets.QGroupBox):
         menu_item = self.listMenu.addAction("Remove Item")
         self.connect(menu_item, QtCore.SIGNAL(
             "triggered()"), self.remove_selected_items)
+        replace_item = self.listMenu.addAction("Replace with Current Colors")
+        replace_item.triggered.connect(self.emit_replace_item)
+        quantize_item = self.listMenu.addAction("Quantize Image to Palette")
+        quantize_item.triggered.connect(self.emit_quantize_item)
+        bake_item = self.listMenu.addAction("Export as 3D LUT")
+        bake_item.triggered.connect(self.emit_bake_item)
+        animate_item = self.listMenu.addAction("Animate ...")
+        animate_item.triggered.connect(self.emit_animate_item)
         parentPosition = self.list_widget.mapToGlobal(QtCore.QPoint(0, 0))
         self.listMenu.move(parentPosition + QPos)
         self.listMenu.show()
@@ -751,6 +1237,35 @@ class HarmonyStore(QtWidgets.QGroupBox):
         """
         for item in self.list_widget.selectedItems():
             self.list_widget.takeItem(self.list_widget.row(item))
+        self.save()
+
+    def emit_replace_item(self) -> None:
+        """
+        Emit signal to replace the colors of the selected item with the current ones.
+        """
+        for item in self.list_widget.selectedItems():
+            self.replace_store_item.emit(item)
+
+    def emit_quantize_item(self) -> None:
+        """
+        Emit signal to quantize an image to the palette of the selected item.
+        """
+        for item in self.list_widget.selectedItems():
+            self.quantize_store_item.emit(item)
+
+    def emit_bake_item(self) -> None:
+        """
+        Emit signal to bake the palette of the selected item into a 3D LUT.
+        """
+        for item in self.list_widget.selectedItems():
+            self.bake_store_item.emit(item)
+
+    def emit_animate_item(self) -> None:
+        """
+        Emit signal to animate the palette of the selected item.
+        """
+        for item in self.list_widget.selectedItems():
+            self.animate_store_item.emit(item)
 
     def item_double_clicked(self, item) -> None:
         """
@@ -774,24 +1289,88 @@ class StoreItem(QtWidgets.QListWidgetItem):
     Widget to hold data as item in the Store.
     """
 
-    def __init__(self, harmony, color_set, parent=None):
+    _counter = count()
+
+    def __init__(self, harmony, color_set, parent=None, legibility: Legibility = None,
+                 name: str = None, palette_id: str = None):
         super(StoreItem, self).__init__(parent=parent)
         self._parent = parent
+        self._name = name
+        self._palette_id = palette_id or new_palette_id()
+        self._order = next(self._counter)
+        self.replace(harmony, color_set, legibility)
+
+    def replace(self, harmony, color_set, legibility: Legibility = None) -> None:
+        """
+        Replace harmony and colors of this item. The palette id is kept, so the group
+        imported from it before is updated on the next import.
+
+        Args:
+            harmony (Harmony): Harmony Set.
+            color_set (list): Colors as list.
+            legibility (Legibility, optional): Analysis of the colors, if already known.
+        """
         self._harmony = harmony
         self._color_set = color_set.copy()
-        self.setText(self._harmony.name)
+        self._legibility = legibility or analyze([color.getRgbF()[:3] for color in self._color_set])
+        label = f"{self._name} ({self._harmony.name})" if self._name else self._harmony.name
+        self.setText(f"{label}  {self._legibility.best_contrast:.1f}:1")
+        self.setIcon(QtGui.QIcon())
         self.draw_background()
+        self.draw_badge()
 
     def draw_background(self):
+        colors = self.color_set
+        if self._parent.deficiency is not None:
+            rgbs = [color.getRgbF()[:3] for color in colors]
+            colors = [QColor.fromRgbF(*rgb) for rgb in simulate(rgbs, self._parent.deficiency)]
         gradient = QLinearGradient(0, 0, self._parent.width(), 0)
-        sub_stop = 1.0/(len(self.color_set))
-        for index, color in enumerate(self.color_set):
+        sub_stop = 1.0/(len(colors))
+        for index, color in enumerate(colors):
             gradient.setColorAt(sub_stop * index, color)
             gradient.setColorAt((sub_stop * index) +
                                 (sub_stop - 0.0001), color)
         brush = QBrush(gradient)
         self.setBackground(brush)
 
+    def draw_badge(self) -> None:
+        """
+        Show a warning badge and tooltip if the palette is hard to read.
+        """
+        warnings = self._legibility.warnings
+        if warnings:
+            self.setIcon(QtWidgets.QApplication.style().standardIcon(
+                QtWidgets.QStyle.SP_MessageBoxWarning))
+        if self._legibility.size < 2:
+            self.setToolTip("Single color, no pairs to compare.")
+            return
+        self.setToolTip("\n".join(warnings) or
+                        f"Best contrast {self._legibility.best_contrast:.1f}:1, "
+                        f"smallest ΔE {self._legibility.min_delta_e:.3f}")
+
+    def sort_key(self, mode: str) -> float:
+        """
+        Get the value to sort this item by.
+
+        Args:
+            mode (str): One of HarmonyStore.sort_modes.
+
+        Returns:
+            float: Sort value, ascending. Single colors can not be hard to read and
+                are sorted last.
+        """
+        if mode != "Added" and self._legibility.size < 2:
+            return float("inf")
+        if mode == "Contrast":
+            return self._legibility.best_contrast
+        if mode == "Distinctness":
+            return self._legibility.min_delta_e
+        return self._order
+
+    def __lt__(self, other) -> bool:
+        mode = self._parent.sort_mode
+        return self.sort_key(mode) < other.sort_key(mode)
+
     @property
     def color_set(self) -> list:
         """
@@ -812,6 +1391,37 @@ class StoreItem(QtWidgets.QListWidgetItem):
         """
         return self._harmony
 
+    @property
+    def legibility(self) -> Legibility:
+        """
+        Access protected attribute _legibility.
+
+        Returns:
+            Legibility: Contrast and distance analysis of the color set.
+        """
+        return self._legibility
+
+    @property
+    def name(self) -> str:
+        """
+        Access protected attribute _name.
+
+        Returns:
+            str: Name of an imported palette or None.
+        """
+        return self._name
+
+    @property
+    def palette_id(self) -> str:
+        """
+        Access protected attribute _palette_id.
+
+        Returns:
+            str: Id assigned on creation and kept through replacements, to recognize
+                the palette of this item on re-import, in later sessions as well.
+        """
+        return self._palette_id
+
 
 class ColorHarmonyUi(QtWidgets.QDialog):
     """
@@ -819,20 +1429,30 @@ class ColorHarmonyUi(QtWidgets.QDialog):
     """
     export_as_nukefile = QtCore.Signal(object, object, str)
     export_for_clipboard = QtCore.Signal(object, object, str)
-    export_for_csv = QtCore.Signal(object, object)
-    import_to_nuke = QtCore.Signal(object, object, str)
+    export_nodes_for_clipboard = QtCore.Signal(object, object, str)
+    export_for_csv = QtCore.Signal(object, str, object, str)
+    export_for_writer = QtCore.Signal(object, str, str, object, str)
+    export_for_shards = QtCore.Signal(object, str, bool, object, str)
+    export_for_cube = QtCore.Signal(object, str, int, float, float, object, str)
+    export_cvd_report = QtCore.Signal(object, str, object, str)
+    animate_store = QtCore.Signal(object, object, int, int, float, str, object, str)
+    import_to_nuke = QtCore.Signal(object, object, bool, object, str)
     toggle_link = QtCore.Signal(bool)
+    color_transform_changed = QtCore.Signal(str, str)
     current_colors = QtCore.Signal(object)
 
     def __init__(self):
         super(ColorHarmonyUi, self).__init__()
 
-        self._controller = HarmonyController(self)
+        self._controller = attach_controller(self)
 
         self._harmony = None
         self._color_set = []
-        self._variations = []
         self._live_link_activated = False
+        # Colors shown from a linked group, which must not be sent back to it.
+        self._applying_link = False
+        self._linked_colors = None
+        self._rng = Random()
 
         self.build_widgets()
         self.build_menu()
@@ -848,8 +1468,17 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         self.value_slider = ValueSlider()
         self.harmonies = HarmonieSelection(self)
         self.colorbars = ColorBars(self)
+        self.explorer = PaletteExplorer(self)
+        self.explorer.setVisible(False)
         self.harmony_store = HarmonyStore(self)
         self.status_bar = QtWidgets.QStatusBar()
+        self.latency_label = QtWidgets.QLabel()
+        self.status_bar.addPermanentWidget(self.latency_label)
+        self.latency_timer = QtCore.QTimer(self)
+        self.latency_timer.setInterval(500)
+        self.latency_timer.timeout.connect(self.update_latency)
+        if TRACER.enabled:
+            self.latency_timer.start()
 
     def build_layouts(self) -> None:
         """
@@ -867,6 +1496,7 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         main_layout.addWidget(self.tool_bar)
         main_layout.addLayout(top_layout)
         main_layout.addWidget(self.colorbars)
+        main_layout.addWidget(self.explorer)
         main_layout.addWidget(self.status_bar)
         self.setLayout(main_layout)
 
@@ -880,10 +1510,23 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         self.export_menu = self.menu_bar.addMenu("Export ..")
         export_nuke = QtWidgets.QAction("Export as .nk", self)
         export_clipboard = QtWidgets.QAction("Copy to Clipboard", self)
+        export_clipboard_nodes = QtWidgets.QAction("Copy to Clipboard as Nodes", self)
+        # Nodes need the root format and version of a running Nuke.
+        export_clipboard_nodes.setEnabled(IN_NUKE)
         export_csv = QtWidgets.QAction("Export CSV", self)
+        export_shards = QtWidgets.QAction("Export Sharded", self)
+        export_cvd = QtWidgets.QAction("Export Color Vision Report", self)
+        export_trace = QtWidgets.QAction("Export Trace", self)
         self.export_menu.addAction(export_nuke)
         self.export_menu.addAction(export_clipboard)
+        self.export_menu.addAction(export_clipboard_nodes)
         self.export_menu.addAction(export_csv)
+        self.export_menu.addAction(export_shards)
+        self.export_menu.addAction(export_cvd)
+        self.export_menu.addAction(export_trace)
+        self.writer_menu = self.export_menu.addMenu("Export As")
+        self.writer_menu.aboutToShow.connect(self.build_writer_menu)
+        self.build_color_space_menu()
 
         import_into_nuke = QtWidgets.QAction("Import Store into Nuke", self)
         self.tool_bar.addAction(import_into_nuke)
@@ -891,6 +1534,52 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         import_into_nuke.setToolTip(
             "Import items in store into current session.")
 
+        self.remove_orphans = QtWidgets.QAction("Remove Orphans", self)
+        self.remove_orphans.setCheckable(True)
+        self.remove_orphans.setToolTip(
+            "On import, delete the groups this store imported before whose palette has been removed from it.")
+        self.tool_bar.addAction(self.remove_orphans)
+
+        import_palettes = QtWidgets.QAction("Import Palettes", self)
+        import_palettes.setToolTip(
+            "Add the palettes of an .ase, .aco or .gpl library to the store, each fit to its closest harmony.")
+        self.tool_bar.addAction(import_palettes)
+        import_palettes.triggered.connect(self.import_palettes)
+
+        show_explorer = QtWidgets.QAction("Explorer", self)
+        show_explorer.setCheckable(True)
+        show_explorer.setToolTip(
+            "Show a grid of palettes around the current color. Click one to apply it.")
+        self.tool_bar.addAction(show_explorer)
+        show_explorer.triggered.connect(self.toggle_explorer)
+
+        extract_from_image = QtWidgets.QAction("Extract from Image", self)
+        extract_from_image.setToolTip(
+            "Seed the colorwheel and store with the dominant colors of an image.")
+        self.tool_bar.addAction(extract_from_image)
+        extract_from_image.triggered.connect(self.extract_from_image)
+
+        perceptual = QtWidgets.QAction("OKLCH", self)
+        perceptual.setCheckable(True)
+        perceptual.setToolTip(
+            "Apply harmonies in the perceptual OKLCH space, keeping derived colors even in lightness.")
+        self.tool_bar.addAction(perceptual)
+        perceptual.triggered.connect(self.toggle_perceptual)
+
+        trace = QtWidgets.QAction("Trace", self)
+        trace.setCheckable(True)
+        trace.setChecked(TRACER.enabled)
+        trace.setToolTip(
+            "Time the colorwheel, live link and exports and show the input to knob write latency.")
+        self.tool_bar.addAction(trace)
+        trace.triggered.connect(self.toggle_tracing)
+
+        show_memory = QtWidgets.QAction("Memory", self)
+        show_memory.setToolTip(
+            "Show the memory held by the store, the caches and the live link.")
+        self.tool_bar.addAction(show_memory)
+        show_memory.triggered.connect(self.show_memory)
+
         activate_link = QtWidgets.QAction("LiveLink", self)
         activate_link.setCheckable(True)
         self.tool_bar.addAction(activate_link)
@@ -898,11 +1587,41 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         import_into_nuke.triggered.connect(self.import_into_nuke)
         export_nuke.triggered.connect(self.export_nuke)
         export_clipboard.triggered.connect(self.export_clipboard)
+        export_clipboard_nodes.triggered.connect(self.export_clipboard_nodes)
         export_csv.triggered.connect(self.export_csv)
+        export_shards.triggered.connect(self.export_shards)
+        export_cvd.triggered.connect(self.export_cvd)
+        export_trace.triggered.connect(self.export_trace)
         activate_link.triggered.connect(self.toggle_live_link)
         activate_link.setToolTip(
             "Active Live link between Panel and selected harmony nodes.")
 
+    def build_writer_menu(self) -> None:
+        """
+        Fill the submenu with one action per registered writer. Writers are only
+        discovered once the menu is opened first.
+        """
+        if self.writer_menu.actions():
+            return
+        for name, writer in load_writers().items():
+            action = self.writer_menu.addAction(f"{writer.label} ({writer.extension})")
+            action.triggered.connect(partial(self.export_writer, name, writer))
+
+    def build_color_space_menu(self) -> None:
+        """
+        Build a submenu per export target to select the color transform applied on export.
+        """
+        color_space_menu = self.export_menu.addMenu("Color Space")
+        for target in EXPORT_TARGETS:
+            target_menu = color_space_menu.addMenu(target)
+            group = QtWidgets.QActionGroup(target_menu)
+            for name in TRANSFORMS:
+                action = QtWidgets.QAction(name, group)
+                action.setCheckable(True)
+                action.setChecked(name == "display")
+                action.triggered.connect(partial(self.color_transform_changed.emit, target, name))
+                target_menu.addAction(action)
+
     def set_up_window_properties(self) -> None:
         """
         Set window properties on main widget.
@@ -922,9 +1641,17 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         self.value_slider.value_changed.connect(self.slider_value_changed)
         self.harmonies.selection_changed.connect(self.harmony_selection_change)
         self.harmonies.randomize_values.connect(self.randomize_values)
+        self.harmonies.smart_randomize_values.connect(self.smart_randomize_values)
         self.harmonies.add_current_to_store.connect(self.add_current_to_store)
         self.harmony_store.restore_store_item.connect(self.restore_store_item)
+        self.harmony_store.replace_store_item.connect(self.replace_store_item)
+        self.harmony_store.quantize_store_item.connect(self.quantize_image)
+        self.harmony_store.bake_store_item.connect(self.export_cube)
+        self.harmony_store.animate_store_item.connect(self.animate)
         self.colorwheel.color_changed.connect(self.emit_current_colors)
+        self.colorwheel.color_changed.connect(self.update_explorer)
+        self.explorer.palette_selected.connect(self.apply_palette)
+        self.colorbars.deficiency_changed.connect(self.harmony_store.set_deficiency)
 
     def abort(self) -> None:
         """
@@ -950,12 +1677,21 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         Args:
             item (StoreItem): StoreItem to drive restore.
         """
-        color_set = item.color_set
-        value = color_set[0].valueF()
         self.colorwheel.restore(harmony=item.harmony, color=item.color_set[0])
-        self.value_slider.value = value
+        self.value_slider.value = self.colorwheel.v
         self.harmonies.restore(item.harmony)
 
+    def replace_store_item(self, item: StoreItem) -> None:
+        """
+        Replace the colors of given item with the current harmony and colors.
+
+        Args:
+            item (StoreItem): StoreItem to replace.
+        """
+        if self._color_set and self._harmony:
+            self.harmony_store.replace_colors(item, harmony=self._harmony,
+                                              color_set=self._color_set)
+
     def update_current_color_set(self, color_set) -> None:
         """
         Emit signal to update current color selection.
@@ -970,8 +1706,11 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         """
         Emit signal for nuke import.
         """
+        remove_orphans = self.remove_orphans.isChecked()
         self.import_to_nuke.emit(
-            self.get_items(), self.callback, "Imported into Nuke")
+            self.get_items(), self.harmony_store.imported_ids, remove_orphans,
+            self.callback, "Imported into Nuke")
+        self.harmony_store.record_import(remove_orphans)
 
     def export_nuke(self) -> None:
         self.export_as_nukefile.emit(self.get_items(),
@@ -989,6 +1728,124 @@ class ColorHarmonyUi(QtWidgets.QDialog):
                                      file_path,
                                      self.callback, f"exported as {file_path}")
 
+    def export_shards(self) -> None:
+        """
+        Emit signal to export the store split into part files, written in parallel.
+        .nk parts need the root format of a running Nuke, outside of it only .csv.
+        """
+        file_dialog = QtWidgets.QFileDialog()
+        file_path, __ = file_dialog.getSaveFileName(
+            filter="nk(*.nk);;csv(*.csv)" if IN_NUKE else "csv(*.csv)")
+        if not file_path:
+            return
+        concatenate = QtWidgets.QMessageBox.question(
+            self, "Export Sharded", "Concatenate the parts into a single file as well?"
+        ) == QtWidgets.QMessageBox.Yes
+        self.export_for_shards.emit(self.get_items(), file_path, concatenate,
+                                    self.callback, "exported in parts next to {path}")
+
+    def export_writer(self, name: str, writer: type) -> None:
+        """
+        Emit signal to stream the store into a file with the given writer.
+
+        Args:
+            name (str): Name of the writer.
+            writer (type): Writer class, providing label and extension.
+        """
+        file_dialog = QtWidgets.QFileDialog()
+        file_path, __ = file_dialog.getSaveFileName(
+            filter=f"{writer.label}(*{writer.extension})")
+        if file_path:
+            self.export_for_writer.emit(self.get_items(), name, file_path,
+                                        self.callback, f"exported as {file_path}")
+
+    def export_trace(self) -> None:
+        """
+        Write the recorded trace as Chrome trace event JSON.
+        """
+        file_dialog = QtWidgets.QFileDialog()
+        file_path, __ = file_dialog.getSaveFileName(filter="json(*.json)")
+        if file_path:
+            TRACER.write(file_path)
+            self.callback(f"exported trace as {file_path}")
+
+    def export_cvd(self) -> None:
+        """
+        Emit signal to export a report of the store under every color vision deficiency.
+        """
+        file_dialog = QtWidgets.QFileDialog()
+        file_path, __ = file_dialog.getSaveFileName(filter="csv(*.csv)")
+        if file_path:
+            self.export_cvd_report.emit(self.get_items(),
+                                        file_path,
+                                        self.callback, f"exported as {file_path}")
+
+    def export_cube(self, item: StoreItem) -> None:
+        """
+        Emit signal to bake the palette of the given item into a 3D LUT.
+
+        Args:
+            item (StoreItem): StoreItem holding the palette.
+        """
+        size, accepted = QtWidgets.QInputDialog.getItem(self, "3D LUT", "Lattice size",
+                                                        ["33", "65"], 0, False)
+        if not accepted:
+            return
+        strength, accepted = QtWidgets.QInputDialog.getDouble(self, "3D LUT", "Strength",
+                                                              1.0, 0.0, 1.0, 2)
+        if not accepted:
+            return
+        softness, accepted = QtWidgets.QInputDialog.getDouble(self, "3D LUT", "Softness",
+                                                              0.05, 0.0, 0.5, 3)
+        if not accepted:
+            return
+        file_dialog = QtWidgets.QFileDialog()
+        file_path, __ = file_dialog.getSaveFileName(filter="cube(*.cube)")
+        if file_path:
+            self.export_for_cube.emit([item], file_path, int(size), strength, softness,
+                                      self.callback, f"exported as {file_path}")
+
+    def animate(self, item: StoreItem) -> None:
+        """
+        Emit signal to animate the palette of the given item, morphing toward another
+        stored palette or rotating its hue over a frame range.
+
+        Args:
+            item (StoreItem): StoreItem holding the palette.
+        """
+        targets = [other for other in self.get_items() if other is not item]
+        modes = ["Rotate hue"] + [f"Morph to {index}: {other.harmony.name}"
+                                  for index, other in enumerate(targets, start=1)]
+        mode, accepted = QtWidgets.QInputDialog.getItem(self, "Animate", "Animation", modes, 0, False)
+        if not accepted:
+            return
+        target = targets[modes.index(mode) - 1] if modes.index(mode) else None
+        first, accepted = QtWidgets.QInputDialog.getInt(self, "Animate", "First frame",
+                                                        1001, -100000, 100000)
+        if not accepted:
+            return
+        last, accepted = QtWidgets.QInputDialog.getInt(self, "Animate", "Last frame",
+                                                       first + 99, first, 100000)
+        if not accepted:
+            return
+        degrees = 360.0
+        if target is None:
+            degrees, accepted = QtWidgets.QInputDialog.getDouble(self, "Animate", "Hue rotation",
+                                                                 360.0, -3600.0, 3600.0, 1)
+            if not accepted:
+                return
+        destination, accepted = QtWidgets.QInputDialog.getItem(
+            self, "Animate", "Destination", ["Import into Nuke", "Save as .nk"], 0, False)
+        if not accepted:
+            return
+        file_path = ""
+        if destination == "Save as .nk":
+            file_path, __ = QtWidgets.QFileDialog().getSaveFileName(filter="nk(*.nk)")
+            if not file_path:
+                return
+        self.animate_store.emit([item], target, first, last, degrees, file_path,
+                                self.callback, f"animated {item.harmony.name}")
+
     def export_clipboard(self) -> None:
         """
         Emit signal to copy the store to the clipboard.
@@ -996,6 +1853,13 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         self.export_for_clipboard.emit(self.get_items(),
                                        self.callback, "copied to clipboard")
 
+    def export_clipboard_nodes(self) -> None:
+        """
+        Emit signal to copy the store to the clipboard, pastable as nodes into Nuke.
+        """
+        self.export_nodes_for_clipboard.emit(self.get_items(),
+                                             self.callback, "copied to clipboard as nodes")
+
     def get_items(self) -> list:
         """
         Get all color_sets from the store.
@@ -1014,9 +1878,76 @@ class ColorHarmonyUi(QtWidgets.QDialog):
             self.colorwheel.setObjectName("")
         set_style_sheet(self.colorwheel)
 
+    def apply_linked_colors(self, rgbas: list) -> None:
+        """
+        Reflect colors edited on a linked group in Nuke.
+
+        An edited base color drives the colorwheel, which derives the harmony again.
+        Edits of other colors are only shown on the color bars, so they are kept.
+        Nothing is sent back to the group, neither while applying nor on later repaints,
+        until the colors are changed in the panel.
+
+        Args:
+            rgbas (list): Rgba tuples of the group, base color first. Values outside of
+                0 to 1, like scene linear highlights, are clipped for display only.
+        """
+        colors = [QColor.fromRgbF(*(min(max(value, 0.0), 1.0) for value in rgba))
+                  for rgba in rgbas]
+        self._applying_link = True
+        try:
+            if colors[0].getRgbF() != self.colorwheel.selected_color.getRgbF():
+                self.colorwheel.randomize_value(random_color=colors[0])
+                self.value_slider.value = self.colorwheel.v
+            else:
+                self._color_set = colors
+                self.colorbars.update(colors)
+        finally:
+            self._applying_link = False
+        self._linked_colors = [color.getRgbF() for color in self.colorwheel.current_color]
+
     def emit_current_colors(self) -> None:
-        if self._live_link_activated:
-            self.current_colors.emit(self.colorwheel.current_color)
+        """
+        Send the current colors over the live link, unless they are the colors
+        applied from a linked group.
+        """
+        if not self._live_link_activated or self._applying_link:
+            return
+        colors = self.colorwheel.current_color
+        if self._linked_colors is not None:
+            if [color.getRgbF() for color in colors] == self._linked_colors:
+                return
+            self._linked_colors = None
+        self.current_colors.emit(colors)
+
+    def toggle_tracing(self, flag: bool) -> None:
+        """
+        Start or stop tracing and the latency display in the status bar.
+
+        Args:
+            flag (bool): Whether to trace.
+        """
+        TRACER.enable(flag)
+        if flag:
+            self.latency_timer.start()
+        else:
+            self.latency_timer.stop()
+            self.latency_label.clear()
+
+    def show_memory(self) -> None:
+        """
+        Show the memory report of all components and caches and the cache counters.
+        """
+        dialog = QtWidgets.QMessageBox(self)
+        dialog.setWindowTitle("Memory")
+        dialog.setText("<pre>" + format_report(memory_report()) + "\n"
+                       + format_stats(cache_stats()) + "</pre>")
+        dialog.exec_()
+
+    def update_latency(self) -> None:
+        """
+        Show the recent input to knob write latencies in the status bar.
+        """
+        self.latency_label.setText(TRACER.latency_summary())
 
     def callback(self, status):
         self.status_bar.showMessage(status)
@@ -1066,8 +1997,125 @@ class ColorHarmonyUi(QtWidgets.QDialog):
         """
         Generate random HSV values and apply to slider and colorwheel.
         """
-        value = uniform(0.4, 1)
         random_color = QColor.fromHsvF(
-            uniform(0.2, 1), uniform(0.2, 1), value, 1.0)
-        self.value_slider.value = value
+            uniform(0.2, 1), uniform(0.2, 1), uniform(0.4, 1), 1.0)
         self.colorwheel.randomize_value(random_color=random_color)
+        self.value_slider.value = self.colorwheel.v
+
+    def smart_randomize_values(self) -> None:
+        """
+        Apply the best scored candidate from a batch of random colors and harmonies.
+        """
+        best = smart_randomize(load_harmonies(), rng=self._rng)
+        if best is not None:
+            self.apply_palette(*best[:2])
+
+    def apply_palette(self, base: HSV, harmony: Harmony) -> None:
+        """
+        Apply the given base color and harmony onto buttons, slider and colorwheel.
+
+        Args:
+            base (HSV): Base color.
+            harmony (Harmony): Harmony to select.
+        """
+        self.harmonies.select(harmony, trigger=False)
+        self.colorwheel.randomize_value(random_color=QColor.fromHsvF(*base, 1.0))
+        self.value_slider.value = self.colorwheel.v
+
+    def toggle_perceptual(self, flag: bool) -> None:
+        """
+        Switch the space harmonies are applied in between HSV and OKLCH.
+
+        Args:
+            flag (bool): If True OKLCH is used.
+        """
+        self.colorwheel.set_space("oklch" if flag else "hsv")
+        self.value_slider.value = self.colorwheel.v
+
+    def toggle_explorer(self, flag: bool) -> None:
+        """
+        Show or hide the palette explorer.
+
+        Args:
+            flag (bool): Visibility of the explorer.
+        """
+        self.explorer.setVisible(flag)
+        self.update_explorer()
+
+    def update_explorer(self, _=None) -> None:
+        """
+        Update the palette explorer around the current color, if it is visible.
+        """
+        if self.explorer.isVisible():
+            self.explorer.set_base(self.colorwheel.selected_color)
+
+    def seed_random(self, seed) -> None:
+        """
+        Seed the random generator of smart randomize for reproducible results.
+
+        Args:
+            seed (hashable): Seed to apply.
+        """
+        self._rng.seed(seed)
+
+    def import_palettes(self) -> None:
+        """
+        Add the palettes of a library file chosen by the user to the store.
+        """
+        file_dialog = QtWidgets.QFileDialog()
+        path, __ = file_dialog.getOpenFileName(filter="Palettes (*.ase *.aco *.gpl)")
+        if not path:
+            return
+        try:
+            palettes = [(harmony, [QColor.fromRgbF(*(min(max(value, 0.0), 1.0) for value in rgb))
+                                   for rgb in rgbs], name, None)
+                        for name, rgbs, harmony in fit_palettes(read_palettes(path), load_harmonies())]
+        except (OSError, ValueError) as error:
+            self.callback(str(error))
+            return
+        self.harmony_store.add_palettes(palettes)
+        self.callback(f"imported {len(palettes)} palettes from {path}")
+
+    def extract_from_image(self) -> None:
+        """
+        Seed colorwheel and store with the dominant colors of an image chosen by the user.
+        """
+        file_dialog = QtWidgets.QFileDialog()
+        file_path, __ = file_dialog.getOpenFileName(filter="images(*.ppm *.png *.jpg *.tif *.exr)")
+        if not file_path:
+            return
+        try:
+            colors = [QColor.fromRgbF(*rgb) for rgb in dominant_colors(sample_image(file_path))]
+        except (OSError, RuntimeError, ValueError) as error:
+            self.callback(str(error))
+            return
+        if not colors:
+            return
+
+        self.colorwheel.randomize_value(random_color=QColor(colors[0]))
+        self.value_slider.value = self.colorwheel.v
+        self.harmony_store.add_colors_to_store(harmony=EXTRACTED_HARMONY, color_set=colors)
+        self.callback(f"extracted {len(colors)} colors from {file_path}")
+
+    def quantize_image(self, item: StoreItem) -> None:
+        """
+        Map an image chosen by the user onto the palette of the given item and report coverage.
+
+        Args:
+            item (StoreItem): StoreItem holding the palette.
+        """
+        file_dialog = QtWidgets.QFileDialog()
+        src, __ = file_dialog.getOpenFileName(filter="ppm(*.ppm)")
+        if not src:
+            return
+        dst, __ = file_dialog.getSaveFileName(filter="ppm(*.ppm)")
+        if not dst:
+            return
+        quantizer = PaletteQuantizer([color.getRgbF()[:3] for color in item.color_set])
+        try:
+            stats = quantizer.quantize_ppm(src, dst=dst)
+        except (OSError, ValueError) as error:
+            self.callback(str(error))
+            return
+        coverage = ", ".join(f"{fraction:.0%}" for fraction in stats["coverage"])
+        self.callback(f"quantized to {dst}, coverage: {coverage}")
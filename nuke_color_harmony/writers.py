@@ -0,0 +1,297 @@
+"""
+This module holds the pluggable writers which stream color sets into files.
+
+A writer declares its format and writes one color set at a time into a file
+like sink, so exports need constant memory for any size of store. Writers are
+discovered on first use: the builtin writers of this module, writers
+registered with register_writer and writers published by other packages under
+the entry point group WRITER_ENTRY_POINTS.
+
+Classes:
+    Writer
+    CsvWriter
+    JsonWriter
+    HexWriter
+    GplWriter
+    AseWriter
+    OcioWriter
+
+Functions:
+    register_writer
+    load_writers
+    get_writer
+"""
+
+import json
+import logging
+import struct
+from functools import lru_cache
+
+try:
+    from importlib.metadata import entry_points
+except ImportError:
+    entry_points = None
+
+from nuke_color_harmony.formatter import csv_line, hex_line
+
+WRITER_ENTRY_POINTS = "nuke_color_harmony.writers"
+LOGGER = logging.getLogger(__name__)
+_REGISTERED = {}
+
+
+class Writer(object):
+    """
+    Base of all writers. Subclasses declare their format and implement the hooks.
+    """
+
+    name = ""
+    label = ""
+    extension = ""
+    binary = False
+
+    def __init__(self, **options) -> None:
+        """
+        Args:
+            options: Format specific options, like the delimiter or the color space.
+        """
+        self.options = options
+
+    def begin(self, sink) -> None:
+        """
+        Write everything in front of the first color set.
+
+        Args:
+            sink (file): File like object to write into.
+        """
+
+    def write_set(self, sink, index: int, name: str, rgbs: list) -> None:
+        """
+        Write one color set.
+
+        Args:
+            sink (file): File like object to write into.
+            index (int): Index of the color set.
+            name (str): Name of the harmony.
+            rgbs (list): Rgb tuples of the color set.
+        """
+        raise NotImplementedError
+
+    def end(self, sink, amount: int) -> None:
+        """
+        Write everything behind the last color set.
+
+        Args:
+            sink (file): File like object to write into.
+            amount (int): Amount of written color sets.
+        """
+
+    def write(self, sink, rgb_sets) -> int:
+        """
+        Stream all color sets into the sink.
+
+        Args:
+            sink (file): File like object to write into.
+            rgb_sets (iterable): Tuples of harmony name and rgb tuples.
+
+        Returns:
+            int: Amount of written color sets.
+        """
+        self.begin(sink)
+        amount = 0
+        for index, (name, rgbs) in enumerate(rgb_sets):
+            self.write_set(sink, index, name, rgbs)
+            amount += 1
+        self.end(sink, amount)
+        return amount
+
+
+class CsvWriter(Writer):
+
+    name = "csv"
+    label = "CSV"
+    extension = ".csv"
+
+    def write_set(self, sink, index: int, name: str, rgbs: list) -> None:
+        sink.write(csv_line(rgbs, self.options.get("delimiter", "|")))
+
+
+class JsonWriter(Writer):
+
+    name = "json"
+    label = "JSON"
+    extension = ".json"
+
+    def begin(self, sink) -> None:
+        sink.write("[")
+
+    def write_set(self, sink, index: int, name: str, rgbs: list) -> None:
+        sink.write(("," if index else "")
+                   + json.dumps({"harmony": name, "colors": [list(rgb) for rgb in rgbs]}))
+
+    def end(self, sink, amount: int) -> None:
+        sink.write("]")
+
+
+class HexWriter(Writer):
+
+    name = "hex"
+    label = "Hex List"
+    extension = ".txt"
+
+    def write_set(self, sink, index: int, name: str, rgbs: list) -> None:
+        sink.write(hex_line(rgbs))
+
+
+def _byte(value: float) -> int:
+    return round(min(max(value, 0.0), 1.0) * 255)
+
+
+class GplWriter(Writer):
+
+    name = "gpl"
+    label = "GIMP Palette"
+    extension = ".gpl"
+
+    def begin(self, sink) -> None:
+        sink.write("GIMP Palette\nName: nuke_color_harmony\nColumns: 5\n#\n")
+
+    def write_set(self, sink, index: int, name: str, rgbs: list) -> None:
+        sink.write(f"# {name}\n" + "".join(
+            f"{_byte(rgb[0]):3d} {_byte(rgb[1]):3d} {_byte(rgb[2]):3d}\t{name} {number}\n"
+            for number, rgb in enumerate(rgbs, start=1)))
+
+
+def _ase_name(name: str) -> bytes:
+    encoded = (name + "\0").encode("utf-16-be")
+    return struct.pack(">H", len(encoded) // 2) + encoded
+
+
+def _ase_block(block_type: int, data: bytes) -> bytes:
+    return struct.pack(">HI", block_type, len(data)) + data
+
+
+class AseWriter(Writer):
+    """
+    Adobe Swatch Exchange, one group per color set. The block count in the header
+    is patched once all sets are written, so the sink has to be seekable.
+    """
+
+    name = "ase"
+    label = "Adobe Swatch Exchange"
+    extension = ".ase"
+    binary = True
+
+    def begin(self, sink) -> None:
+        if not sink.seekable():
+            raise ValueError("Adobe Swatch Exchange files need a seekable sink.")
+        self._start = sink.tell()
+        sink.write(b"ASEF" + struct.pack(">HHI", 1, 0, 0))
+
+    def write_set(self, sink, index: int, name: str, rgbs: list) -> None:
+        blocks = [_ase_block(0xC001, _ase_name(f"{name} {index + 1}"))]
+        blocks.extend(_ase_block(0x0001, _ase_name(f"{name} {index + 1}.{number}") + b"RGB "
+                                 + struct.pack(">3fH", *rgb[:3], 2))
+                      for number, rgb in enumerate(rgbs, start=1))
+        blocks.append(_ase_block(0xC002, b""))
+        sink.write(b"".join(blocks))
+
+    def write(self, sink, rgb_sets) -> int:
+        self.begin(sink)
+        amount = 0
+        blocks = 0
+        for index, (name, rgbs) in enumerate(rgb_sets):
+            self.write_set(sink, index, name, rgbs)
+            amount += 1
+            blocks += len(rgbs) + 2
+        end = sink.tell()
+        sink.seek(self._start + 8)
+        sink.write(struct.pack(">I", blocks))
+        sink.seek(end)
+        return amount
+
+
+# OCIO names of the color transforms in colorspace.TRANSFORMS, as in the ACES configs.
+OCIO_COLOR_SPACES = {"display": "sRGB - Display",
+                     "srgb_linear": "Linear Rec.709 (sRGB)",
+                     "rec709_linear": "Linear Rec.709 (sRGB)",
+                     "acescg": "ACEScg"}
+
+
+class OcioWriter(Writer):
+    """
+    Plain YAML in the style of an OCIO config, naming the OCIO color space the values
+    were exported in. Unnamed transforms are named Raw.
+    """
+
+    name = "ocio"
+    label = "OCIO Style YAML"
+    extension = ".yaml"
+
+    def begin(self, sink) -> None:
+        color_space = OCIO_COLOR_SPACES.get(self.options.get("color_transform", "display"), "Raw")
+        sink.write(f"# nuke_color_harmony palettes\ncolorspace: {color_space}\npalettes:\n")
+
+    def write_set(self, sink, index: int, name: str, rgbs: list) -> None:
+        colors = ", ".join(f"[{rgb[0]:.6f}, {rgb[1]:.6f}, {rgb[2]:.6f}]" for rgb in rgbs)
+        sink.write(f"  - name: {json.dumps(name)}\n    colors: [{colors}]\n")
+
+
+BUILTIN_WRITERS = (CsvWriter, JsonWriter, HexWriter, GplWriter, AseWriter, OcioWriter)
+
+
+def register_writer(writer: type) -> None:
+    """
+    Register a writer class, replacing a writer of the same name.
+
+    Args:
+        writer (type): Subclass of Writer.
+    """
+    _REGISTERED[writer.name] = writer
+    load_writers.cache_clear()
+
+
+def _entry_point_writers() -> list:
+    if entry_points is None:
+        return []
+    try:
+        found = entry_points(group=WRITER_ENTRY_POINTS)
+    except TypeError:
+        found = entry_points().get(WRITER_ENTRY_POINTS, [])
+    writers = []
+    for entry_point in found:
+        try:
+            writers.append(entry_point.load())
+        except Exception as error:
+            LOGGER.warning("Skipping writer %s: %s", entry_point.name, error)
+    return writers
+
+
+@lru_cache(maxsize=None)
+def load_writers() -> dict:
+    """
+    Discover all writers. Only searches on first call.
+
+    Returns:
+        dict: Writer classes by name, builtins first.
+    """
+    writers = {}
+    for writer in (*BUILTIN_WRITERS, *_entry_point_writers(), *_REGISTERED.values()):
+        writers[writer.name] = writer
+    return writers
+
+
+def get_writer(name: str, **options) -> Writer:
+    """
+    Get a writer by name.
+
+    Args:
+        name (str): Name of the writer.
+        options: Format specific options.
+
+    Raises:
+        KeyError: If no writer of that name is known.
+
+    Returns:
+        Writer: Writer instance.
+    """
+    return load_writers()[name](**options)
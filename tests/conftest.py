@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# Keep the panels created by tests away from the store of the user.
+os.environ.setdefault("NUKE_COLOR_HARMONY_STORE",
+                      os.path.join(tempfile.mkdtemp(), "store.json"))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    QtWidgets = pytest.importorskip("PySide2.QtWidgets")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
@@ -0,0 +1,54 @@
+from math import sin
+from random import Random
+
+import pytest
+
+from nuke_color_harmony.animation import TOLERANCE, curve, hue_rotation, morph, reduce_keys, to_curves
+
+
+def interpolate(values: list, keys: list) -> list:
+    result = []
+    for start, end in zip(keys, keys[1:]):
+        for index in range(start, end):
+            result.append(values[start] + (values[end] - values[start]) * (index - start) / (end - start))
+    return result + [values[keys[-1]]]
+
+
+@pytest.mark.parametrize("values", [
+    [sin(frame / 7) for frame in range(200)],
+    [Random(5).random() for __ in range(50)],
+    [0.25] * 30,
+    [frame / 99 for frame in range(100)],
+])
+def test_keys_reproduce_samples(values):
+    keys = reduce_keys(values)
+
+    assert keys[0] == 0 and keys[-1] == len(values) - 1
+    assert max(abs(a - b) for a, b in zip(interpolate(values, keys), values)) <= TOLERANCE + 1e-12
+
+
+def test_linear_values_need_two_keys():
+    assert reduce_keys([frame / 99 for frame in range(100)]) == [0, 99]
+
+
+def test_curve():
+    assert curve(10, [0.0, 0.25, 0.5, 0.75, 1.0, 1.0, 1.0, 0.2]) == "{curve L x10 0 x14 1 x16 1 0.2}"
+    assert curve(1, [0.5]) == "{curve L x1 0.5}"
+
+
+def test_to_curves_splits_colors():
+    samples = [(0.0, 0.1, 0.2), (1.0, 1.0, 1.0), (0.5, 0.6, 0.7), (1.0, 1.0, 1.0)]
+
+    assert to_curves(samples, 2, 1) == [("{curve L x1 0 0.5}", "{curve L x1 0.1 0.6}", "{curve L x1 0.2 0.7}"),
+                                        ("{curve L x1 1 1}",) * 3]
+
+
+def test_samples_are_frame_major():
+    start, end = [(1.0, 0.0, 0.0), (0.0, 0.0, 1.0)], [(0.0, 1.0, 0.0)]
+
+    samples = morph(start, end, 1, 5)
+
+    assert len(samples) == 10
+    assert samples[0] == pytest.approx(start[0], abs=1e-6)
+    assert samples[-1] == pytest.approx(end[0], abs=1e-6)
+    assert len(hue_rotation(start, 1, 5)) == 10
@@ -0,0 +1,76 @@
+import pytest
+
+from nuke_color_harmony.cache import CACHES, LruCache, cache_stats, format_stats
+
+
+@pytest.fixture
+def cache():
+    cache = LruCache("test", maxsize=2)
+    yield cache
+    CACHES.pop("test", None)
+
+
+def test_evicts_least_recently_used(cache):
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_counts_hits_and_misses(cache):
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.stats == {"hits": 2, "misses": 1, "size": 1, "maxsize": 2, "maxbytes": None}
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+def test_get_or_compute_computes_once(cache):
+    calls = []
+
+    def compute():
+        calls.append(None)
+        return None
+
+    assert cache.get_or_compute("a", compute) is None
+    assert cache.get_or_compute("a", compute) is None
+    assert len(calls) == 1
+
+
+def test_evicts_beyond_budget(cache):
+    cache.maxsize = 100
+    cache.maxbytes = 10000
+    for index in range(100):
+        cache.put(index, bytes(1000))
+
+    assert cache.nbytes <= 10000
+    assert 0 < len(cache) < 10
+    assert cache.get(99) is not None
+    assert cache.get(0) is None
+
+
+def test_setting_budget_evicts(cache):
+    cache.maxsize = 100
+    for index in range(10):
+        cache.put(index, bytes(1000))
+
+    cache.maxbytes = 3000
+
+    assert cache.nbytes <= 3000
+    assert cache.get(9) is not None
+
+
+def test_stats_are_registered(cache):
+    cache.put("a", 1)
+    cache.get("a")
+
+    assert cache_stats()["test"]["hits"] == 1
+    report = format_stats(cache_stats())
+    assert "test" in report.split()
+    assert "100%" in report.splitlines()[[line.split()[0] for line in report.splitlines()].index("test")]
@@ -0,0 +1,61 @@
+import pytest
+
+from nuke_color_harmony.harmonies import Color, Harmony
+
+pytest.importorskip("PySide2")
+
+HARMONY = Harmony(name="complementary", colors=(Color(hue_offset=180.0),))
+RGBS = [(1.0, 0.0, 0.0), (0.0, 0.5, 1.0)]
+
+
+@pytest.fixture
+def mime(qapp):
+    from PySide2.QtGui import QColor
+
+    from nuke_color_harmony.clipboard import PaletteMimeData
+
+    return PaletteMimeData([([QColor.fromRgbF(*rgb) for rgb in RGBS], HARMONY)],
+                           nuke_frame=(1920, 1080, "13.2 v1"))
+
+
+def test_formats_render_on_request(mime):
+    from nuke_color_harmony import clipboard
+    from nuke_color_harmony.formatter import (csv_line, hex_line, json_text,
+                                              nuke_group, nuke_script_frame)
+
+    rgb_sets = [(HARMONY.name, [pytest.approx(rgb, abs=1e-4) for rgb in RGBS])]
+    header, footer = nuke_script_frame("13.2 v1")
+    assert mime.formats() == [clipboard.PLAIN_TEXT, clipboard.CSV, clipboard.JSON,
+                              clipboard.HEX, clipboard.NUKE_SCRIPT]
+    assert mime._rgb_sets is None
+    assert mime._rendered == {}
+
+    for mime_type in mime.formats()[1:]:
+        data = mime.retrieveData(mime_type, None)
+
+        assert list(mime._rendered) == list(mime.formats()[1:mime.formats().index(mime_type) + 1])
+        assert bytes(data).decode("utf-8") == mime._rendered[mime_type]
+    assert mime.rgb_sets == rgb_sets
+    rgb_sets = mime.rgb_sets
+    assert mime._rendered == {clipboard.CSV: "".join(csv_line(rgbs) for __, rgbs in rgb_sets),
+                              clipboard.JSON: json_text(rgb_sets),
+                              clipboard.HEX: "".join(hex_line(rgbs) for __, rgbs in rgb_sets),
+                              clipboard.NUKE_SCRIPT: header + nuke_group(HARMONY.name, rgb_sets[0][1],
+                                                                         1, 1920, 1080) + footer}
+
+
+def test_plain_text_reuses_the_plain_format(mime):
+    from nuke_color_harmony import clipboard
+
+    text = mime.retrieveData(clipboard.PLAIN_TEXT, None)
+
+    assert text == mime.text() == mime._rendered[clipboard.CSV]
+    assert list(mime._rendered) == [clipboard.CSV]
+
+
+def test_unknown_formats_are_not_offered(mime):
+    from nuke_color_harmony import clipboard
+    from nuke_color_harmony.clipboard import PaletteMimeData
+
+    assert not mime.hasFormat("image/png")
+    assert not PaletteMimeData([], plain_format=clipboard.NUKE_SCRIPT).hasFormat(clipboard.NUKE_SCRIPT)
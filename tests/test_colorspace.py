@@ -0,0 +1,52 @@
+import pytest
+
+from nuke_color_harmony.colorspace import (TRANSFORMS, ColorTransform, linear_to_oklab,
+                                           linear_to_srgb, oklab_to_linear, oklch_to_srgb,
+                                           srgb_to_linear, srgb_to_oklch)
+
+RGBS = [(0.0, 0.0, 0.0), (1.0, 1.0, 1.0), (0.5, 0.25, 0.75), (0.04, 0.9, 0.3)]
+
+
+def test_srgb_round_trip():
+    for rgb in RGBS:
+        assert linear_to_srgb(srgb_to_linear(rgb)) == pytest.approx(rgb)
+    assert srgb_to_linear((0.5, 0.04045, 2.0)) == pytest.approx((0.2140411, 0.0031308, 1.0), abs=1e-7)
+
+
+def test_oklab():
+    assert linear_to_oklab((1.0, 1.0, 1.0)) == pytest.approx((1.0, 0.0, 0.0), abs=1e-4)
+    for rgb in RGBS:
+        assert oklab_to_linear(linear_to_oklab(rgb)) == pytest.approx(rgb, abs=1e-6)
+
+
+def test_oklch_maps_into_gamut_keeping_hue():
+    (rgb,) = oklch_to_srgb([(0.7, 0.4, 150.0)])
+
+    assert all(0.0 <= value <= 1.0 for value in rgb)
+    lightness, __, hue = srgb_to_oklch([rgb])[0]
+    assert (lightness, hue) == pytest.approx((0.7, 150.0), abs=1e-3)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("display", (0.5, 0.25, 0.75)),
+    ("srgb_linear", srgb_to_linear((0.5, 0.25, 0.75))),
+    ("rec709_linear", (((0.5 + 0.099) / 1.099) ** (1 / 0.45), ((0.25 + 0.099) / 1.099) ** (1 / 0.45),
+                       ((0.75 + 0.099) / 1.099) ** (1 / 0.45))),
+])
+def test_transforms(name, expected):
+    assert TRANSFORMS[name].apply([(0.5, 0.25, 0.75)]) == [pytest.approx(expected)]
+
+
+def test_acescg_keeps_white():
+    assert TRANSFORMS["acescg"].apply([(1.0, 1.0, 1.0)]) == [pytest.approx((1.0, 1.0, 1.0), abs=1e-5)]
+
+
+def test_transfer_clips_input():
+    assert ColorTransform("srgb").apply([(-0.5, 1.5, 0.0)]) == [(0.0, 1.0, 0.0)]
+
+
+def test_apply_sets_keeps_sets():
+    transform = TRANSFORMS["srgb_linear"]
+    rgb_sets = [("a", RGBS[:1]), ("b", []), ("c", RGBS[1:])]
+
+    assert transform.apply_sets(rgb_sets) == [(name, transform.apply(rgbs)) for name, rgbs in rgb_sets]
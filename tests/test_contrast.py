@@ -0,0 +1,39 @@
+import pytest
+
+from nuke_color_harmony.contrast import analyze, analyze_store
+from nuke_color_harmony.cvd import cvd_report
+
+
+def test_black_and_white():
+    legibility = analyze([(0.0, 0.0, 0.0), (1.0, 1.0, 1.0)])
+
+    assert legibility.size == 2
+    assert legibility.best_contrast == pytest.approx(21.0)
+    assert legibility.min_delta_e == pytest.approx(1.0, abs=1e-4)
+    assert legibility.warnings == ()
+
+
+def test_similar_colors_warn():
+    legibility = analyze([(0.5, 0.5, 0.5), (0.51, 0.5, 0.5)])
+
+    assert len(legibility.warnings) == 2
+
+
+@pytest.mark.parametrize("rgbs", [[(0.5, 0.5, 0.5)], []])
+def test_single_color_has_no_warnings(rgbs):
+    legibility = analyze(rgbs)
+
+    assert legibility.min_delta_e == float("inf")
+    assert legibility.warnings == ()
+
+
+def test_store_matches_single_analysis():
+    rgb_sets = [[(0.1, 0.2, 0.3), (0.9, 0.8, 0.7)], [(0.5, 0.5, 0.5)], [(1.0, 0.0, 0.0), (0.0, 1.0, 0.0)]]
+
+    assert analyze_store(rgb_sets) == [analyze(rgbs) for rgbs in rgb_sets]
+
+
+def test_report_leaves_single_colors_empty():
+    lines = cvd_report([("extracted", [(0.5, 0.5, 0.5)])]).splitlines()
+
+    assert lines[1] == "extracted,normal,,#808080"
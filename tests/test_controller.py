@@ -0,0 +1,41 @@
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("PySide2")
+
+
+def test_attach_once(qapp):
+    from nuke_color_harmony.controller import attach, service
+    from nuke_color_harmony.view import ColorHarmonyUi
+
+    ui = ColorHarmonyUi()
+    controller = attach(ui)
+
+    assert attach(ui) is controller
+    assert [item for item in service.controllers if item.view is ui] == [controller]
+    ui.close()
+
+
+def test_slot_called_once_per_emit(qapp, monkeypatch):
+    from nuke_color_harmony.controller import Controller, attach
+    from nuke_color_harmony.view import ColorHarmonyUi
+
+    export_for_csv = mock.Mock()
+    set_color_transform = mock.Mock()
+    monkeypatch.setattr(Controller, "export_for_csv", export_for_csv)
+    monkeypatch.setattr(Controller, "set_color_transform", set_color_transform)
+
+    # The panel attaches itself, attaching again must not connect a second time.
+    ui = ColorHarmonyUi()
+    attach(ui).set_up_signals()
+    attach(ui)
+
+    ui.export_for_csv.emit([], "palettes.csv", None, "")
+    ui.color_transform_changed.emit("csv", "acescg")
+    ui.color_transform_changed.emit("nuke", "display")
+
+    export_for_csv.assert_called_once_with([], "palettes.csv", None, "")
+    assert set_color_transform.call_args_list == [mock.call("csv", "acescg"),
+                                                  mock.call("nuke", "display")]
+    ui.close()
@@ -0,0 +1,16 @@
+import pytest
+
+from nuke_color_harmony.extract import ppm_header, sample_image
+
+
+def test_ppm_header():
+    assert ppm_header(memoryview(b"P6\n# comment\n2 1\n255\n" + bytes(6))) == (2, 1, 21)
+
+
+@pytest.mark.parametrize("content", [b"P6\n4 4", b"P6\n# comment", b"P6\n4 4 255"])
+def test_truncated_header(tmp_path, content):
+    path = tmp_path / "truncated.ppm"
+    path.write_bytes(content)
+
+    with pytest.raises(ValueError, match="Truncated"):
+        sample_image(str(path))
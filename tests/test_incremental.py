@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from nuke_color_harmony.incremental import INDEX_SUFFIX, write_incremental
+
+FRAME = (1920, 1080, "13.2 v5")
+
+
+def rgb_sets(amount, changed=None):
+    sets = [(f"harmony{index}", [(index / 100, 0.5, 1.0 - index / 100), (0.25, 0.25, 0.25)])
+            for index in range(amount)]
+    if changed is not None:
+        sets[changed] = ("edited", [(1.0, 0.0, 0.0)])
+    return sets
+
+
+def full_rewrite(tmp_path, sets):
+    path = str(tmp_path / "full.nk")
+    write_incremental(path, sets, *FRAME, patch=False)
+    with open(path, "rb") as src:
+        return src.read()
+
+
+def patched(tmp_path, before, after):
+    path = str(tmp_path / "patched.nk")
+    write_incremental(path, before, *FRAME)
+    index = write_incremental(path, after, *FRAME)
+    with open(path, "rb") as src:
+        content = src.read()
+    assert index["size"] == len(content)
+    return content
+
+
+@pytest.mark.parametrize("before, after", [
+    (rgb_sets(5), rgb_sets(5, changed=3)),
+    (rgb_sets(5), rgb_sets(5, changed=0)),
+    (rgb_sets(5), rgb_sets(8)),
+    (rgb_sets(8), rgb_sets(5)),
+    (rgb_sets(5), rgb_sets(0)),
+    (rgb_sets(5), rgb_sets(5)),
+], ids=["edit", "edit-first", "append", "truncate", "empty", "unchanged"])
+def test_patch_matches_rewrite(tmp_path, before, after):
+    assert patched(tmp_path, before, after) == full_rewrite(tmp_path, after)
+
+
+def test_stale_index_is_ignored(tmp_path):
+    path = str(tmp_path / "patched.nk")
+    write_incremental(path, rgb_sets(5), *FRAME)
+    # The script is edited in Nuke and keeps its size, only the index is left behind.
+    with open(path, "r+b") as dst:
+        dst.seek(-4, os.SEEK_END)
+        dst.write(b"edit")
+    os.utime(path, ns=(0, 0))
+
+    write_incremental(path, rgb_sets(5, changed=4), *FRAME)
+
+    with open(path, "rb") as src:
+        assert src.read() == full_rewrite(tmp_path, rgb_sets(5, changed=4))
+
+
+def test_missing_script_is_written(tmp_path):
+    path = str(tmp_path / "patched.nk")
+    write_incremental(path, rgb_sets(5), *FRAME)
+    os.remove(path)
+
+    write_incremental(path, rgb_sets(5), *FRAME)
+
+    assert os.path.exists(path + INDEX_SUFFIX)
+    with open(path, "rb") as src:
+        assert src.read() == full_rewrite(tmp_path, rgb_sets(5))
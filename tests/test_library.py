@@ -0,0 +1,91 @@
+import struct
+
+import pytest
+
+from nuke_color_harmony.harmonies import Color, Harmony
+from nuke_color_harmony.library import fit_palettes, read_aco, read_ase, read_gpl
+
+GPL = b"""GIMP Palette
+Name: Sunset
+Columns: 2
+# comment
+255 0 0 red
+0 255
+0 0 255\tblue
+"""
+
+
+
+def ase_name(name):
+    return struct.pack(">H", len(name) + 1) + (name + "\0").encode("utf-16-be")
+
+
+def ase_block(block_type, data):
+    return struct.pack(">HI", block_type, len(data)) + data
+
+
+def ase_swatch(name, model, values):
+    return ase_block(0x0001, ase_name(name) + model + struct.pack(f">{len(values)}f", *values)
+                     + struct.pack(">H", 2))
+
+
+ASE_BLOCKS = [ase_block(0xC001, ase_name("Sky")),
+              ase_swatch("blue", b"RGB ", (0.0, 0.5, 1.0)),
+              ase_swatch("gray", b"Gray", (0.25,)),
+              ase_block(0xC002, b""),
+              ase_block(0xC001, ase_name("Empty")),
+              ase_block(0xC002, b""),
+              ase_swatch("cyan", b"CMYK", (1.0, 0.0, 0.0, 0.5)),
+              ase_swatch("unknown", b"HSV ", (0.0, 0.0, 0.0)),
+              ase_swatch("white", b"LAB ", (1.0, 0.0, 0.0))]
+ASE = b"ASEF" + struct.pack(">HHI", 1, 0, len(ASE_BLOCKS)) + b"".join(ASE_BLOCKS)
+
+ACO = struct.pack(">HH", 1, 5) + b"".join(struct.pack(">HHHHH", *record) for record in [
+    (0, 65535, 0, 32768, 0),
+    (1, 0, 65535, 65535, 0),
+    # Inverted ink, full magenta.
+    (2, 65535, 0, 65535, 65535),
+    (7, 10000, 0, 0, 0),
+    (8, 2500, 0, 0, 0)])
+
+
+def test_ase_groups_and_loose_swatches():
+    palettes = list(read_ase(ASE, chunk_size=2))
+
+    assert [name for name, __ in palettes] == ["Sky", "swatches"]
+    assert palettes[0][1] == pytest.approx([(0.0, 0.5, 1.0), (0.25, 0.25, 0.25)])
+    assert [value for rgb in palettes[1][1] for value in rgb] \
+        == pytest.approx([0.0, 0.5, 0.5, 1.0, 1.0, 1.0], abs=1e-3)
+
+
+def test_ase_rejects_other_files():
+    with pytest.raises(ValueError):
+        list(read_ase(b"GIMP Palette\n"))
+
+
+def test_aco_color_spaces():
+    palettes = list(read_aco(ACO, chunk_size=3))
+
+    assert [(name, len(rgbs)) for name, rgbs in palettes] == [("swatches", 3), ("swatches", 2)]
+    assert [value for __, rgbs in palettes for rgb in rgbs for value in rgb] == pytest.approx(
+        [1.0, 0.0, 32768 / 65535,
+         1.0, 0.0, 0.0,
+         1.0, 0.0, 1.0,
+         1.0, 1.0, 1.0,
+         0.75, 0.75, 0.75], abs=1e-3)
+
+
+def test_aco_rejects_truncated_files():
+    with pytest.raises(ValueError):
+        list(read_aco(ACO[:-10]))
+
+
+def test_gpl_skips_short_rows():
+    assert list(read_gpl(GPL)) == [("Sunset", [(1.0, 0.0, 0.0), (0.0, 0.0, 1.0)])]
+
+
+def test_fit_keeps_names():
+    harmonies = [Harmony(name="complementary", colors=(Color(hue_offset=180.0),))]
+
+    assert [(name, harmony.name) for name, __, harmony in fit_palettes(read_gpl(GPL), harmonies)] \
+        == [("Sunset", "complementary")]
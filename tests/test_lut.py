@@ -0,0 +1,52 @@
+from itertools import product
+
+import pytest
+
+from nuke_color_harmony.colorspace import linear_to_oklab, srgb_to_linear
+from nuke_color_harmony.lut import lattice, write_cube
+
+PALETTE = [(0.0, 0.0, 0.0), (1.0, 1.0, 1.0), (1.0, 0.0, 0.0), (0.2, 0.4, 0.8)]
+SIZE = 5
+
+
+def points():
+    # Red varies fastest.
+    return [(red / (SIZE - 1), green / (SIZE - 1), blue / (SIZE - 1))
+            for blue, green, red in product(range(SIZE), repeat=3)]
+
+
+def distance(first: tuple, second: tuple) -> float:
+    first, second = (linear_to_oklab(srgb_to_linear(rgb)) for rgb in (first, second))
+    return sum((a - b) ** 2 for a, b in zip(first, second))
+
+
+def test_snaps_to_nearest():
+    for point, output in zip(points(), lattice(PALETTE, SIZE)):
+        assert output in PALETTE
+        assert distance(point, output) == pytest.approx(
+            min(distance(point, rgb) for rgb in PALETTE), abs=1e-9)
+
+
+def test_palette_colors_are_kept():
+    outputs = dict(zip(points(), lattice(PALETTE, SIZE, softness=0.05)))
+
+    for rgb in PALETTE[:3]:
+        assert outputs[rgb] == pytest.approx(rgb, abs=1e-6)
+
+
+def test_strength_blends_input():
+    assert list(lattice(PALETTE, SIZE, strength=0.0)) == points()
+    for point, half, full in zip(points(), lattice(PALETTE, SIZE, strength=0.5), lattice(PALETTE, SIZE)):
+        assert half == pytest.approx([(a + b) / 2 for a, b in zip(point, full)])
+
+
+def test_write_cube(tmp_path):
+    path = tmp_path / "palette.cube"
+
+    write_cube(str(path), PALETTE, size=SIZE, title="test")
+
+    lines = path.read_text().splitlines()
+    assert lines[:4] == ['TITLE "test"', f"LUT_3D_SIZE {SIZE}", "DOMAIN_MIN 0 0 0", "DOMAIN_MAX 1 1 1"]
+    assert len(lines) == 4 + SIZE ** 3
+    assert lines[4] == "0.000000 0.000000 0.000000"
+    assert lines[-1] == "1.000000 1.000000 1.000000"
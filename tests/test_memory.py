@@ -0,0 +1,30 @@
+from nuke_color_harmony import memory
+from nuke_color_harmony.contrast import LEGIBILITY_CACHE, analyze
+from nuke_color_harmony.cvd import SIMULATION_CACHE, simulate
+from nuke_color_harmony.memory import estimate_size, format_report, memory_report, register_component
+
+RGBS = [(0.1, 0.2, 0.3), (0.9, 0.8, 0.7), (0.5, 0.5, 0.5)]
+
+
+def test_report_accounts_caches():
+    analyze(RGBS)
+    simulate(RGBS, "protanopia")
+
+    usages = {usage.name: usage for usage in memory_report()}
+
+    for cache in (LEGIBILITY_CACHE, SIMULATION_CACHE):
+        usage = usages[f"cache {cache.name}"]
+        assert usage.count == len(cache) > 0
+        assert 0 < usage.size == cache.nbytes <= cache.maxbytes
+    assert "cache legibility" in format_report(memory_report())
+
+
+def test_report_accounts_components():
+    data = [bytes(1000)]
+    register_component("test data", lambda: data)
+
+    usage = next(usage for usage in memory_report() if usage.name == "test data")
+
+    assert usage.size == estimate_size(data) >= 1000
+    assert usage.count == 1
+    del memory._components["test data"]
@@ -0,0 +1,57 @@
+import struct
+from random import Random
+
+import pytest
+
+from nuke_color_harmony.colorspace import linear_to_oklab, srgb_to_linear
+from nuke_color_harmony.quantize import PaletteQuantizer
+
+PALETTE = [(0.0, 0.0, 0.0), (1.0, 1.0, 1.0), (0.9, 0.1, 0.1), (0.1, 0.3, 0.9)]
+WIDTH, HEIGHT = 7, 5
+
+
+def nearest(rgb8: tuple) -> int:
+    # The lookup table is built from the center of the 5 bit bin of each channel.
+    lab = linear_to_oklab(srgb_to_linear(tuple(((value >> 3) + 0.5) / 32 for value in rgb8)))
+    palette = [linear_to_oklab(srgb_to_linear(rgb)) for rgb in PALETTE]
+    distances = [sum((first - second) ** 2 for first, second in zip(lab, color)) for color in palette]
+    return distances.index(min(distances))
+
+
+@pytest.fixture
+def pixels():
+    rng = Random(7)
+    return bytes(rng.randrange(256) for __ in range(WIDTH * HEIGHT * 3))
+
+
+def test_quantize_pixels(pixels):
+    indices, quantized = PaletteQuantizer(PALETTE).quantize_pixels(pixels)
+
+    expected = [nearest(tuple(pixels[index:index + 3])) for index in range(0, len(pixels), 3)]
+    assert list(indices) == expected
+    assert quantized == bytes(round(value * 255) for index in expected for value in PALETTE[index])
+
+
+def test_tiles_and_workers_agree(tmp_path, pixels):
+    src = b"P6\n%d %d\n255\n" % (WIDTH, HEIGHT) + pixels
+    quantizer = PaletteQuantizer(PALETTE)
+
+    whole = quantizer.quantize_ppm(src, dst=str(tmp_path / "whole.ppm"))
+    tiled = quantizer.quantize_ppm(src, dst=str(tmp_path / "tiled.ppm"), tile_rows=2, workers=3)
+
+    assert whole == tiled
+    assert sum(whole["pixels"]) == WIDTH * HEIGHT
+    assert (tmp_path / "whole.ppm").read_bytes() == (tmp_path / "tiled.ppm").read_bytes()
+    assert (tmp_path / "whole.ppm").read_bytes().endswith(quantizer.quantize_pixels(pixels)[1])
+
+
+def test_raw_floats_match_ppm():
+    rng = Random(3)
+    values = [rng.choice((0.0, 1.0)) for __ in range(WIDTH * HEIGHT * 4)]
+    raw = struct.pack(f"={len(values)}f", *values)
+    # Alpha is dropped, 0 and 1 encode exactly.
+    rgb8 = bytes(round(value * 255) for index, value in enumerate(values) if index % 4 != 3)
+    quantizer = PaletteQuantizer(PALETTE)
+
+    assert quantizer.quantize_raw(raw, WIDTH, HEIGHT, channels=4, tile_rows=2) \
+        == quantizer.quantize_ppm(b"P6\n%d %d\n255\n" % (WIDTH, HEIGHT) + rgb8)
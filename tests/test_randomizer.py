@@ -0,0 +1,36 @@
+from random import Random
+
+import pytest
+
+from nuke_color_harmony.colorspace import linear_to_oklab, srgb_to_linear
+from nuke_color_harmony.harmonies import Color, Harmony
+from nuke_color_harmony.randomizer import relative_luminance, score_palette, smart_randomize
+
+HARMONIES = [Harmony(name="complementary", colors=(Color(hue_offset=180.0),)),
+             Harmony(name="triad", colors=(Color(hue_offset=120.0), Color(hue_offset=240.0)))]
+
+
+def test_luminance_matches_decode():
+    for rgb in [(0.0, 0.0, 0.0), (1.0, 1.0, 1.0), (0.25, 0.5, 0.75)]:
+        red, green, blue = srgb_to_linear(rgb)
+        assert relative_luminance(rgb) == pytest.approx(0.2126 * red + 0.7152 * green + 0.0722 * blue,
+                                                        abs=1e-3)
+
+
+def test_spread_is_oklab_distance():
+    # Gray and white, without contrast cap or penalty the score is their OKLab distance.
+    gray, white = linear_to_oklab(srgb_to_linear((0.5, 0.5, 0.5))), linear_to_oklab((1.0, 1.0, 1.0))
+    distance = sum((first - second) ** 2 for first, second in zip(gray, white)) ** 0.5
+    contrast = 1.05 / (srgb_to_linear((0.5,))[0] + 0.05)
+
+    assert score_palette([(0.0, 0.0, 0.5), (0.0, 0.0, 1.0)]) == pytest.approx(distance + contrast / 7.0,
+                                                                             abs=2e-3)
+
+
+def test_seeded_results_repeat():
+    assert smart_randomize(HARMONIES, candidates=64, rng=Random(1)) \
+        == smart_randomize(HARMONIES, candidates=64, rng=Random(1))
+
+
+def test_without_harmonies():
+    assert smart_randomize([], rng=Random(1)) is None
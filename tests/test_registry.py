@@ -0,0 +1,73 @@
+import json
+import logging
+
+import pytest
+
+from nuke_color_harmony import registry
+from nuke_color_harmony.harmonies import Color, Harmony
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    user, show = tmp_path / "user", tmp_path / "show"
+    user.mkdir()
+    show.mkdir()
+    monkeypatch.setattr(registry, "USER_PATH", str(user))
+    monkeypatch.setenv(registry.HARMONY_PATH_ENV, str(show))
+    registry.load_harmonies.cache_clear()
+    yield user, show
+    registry.load_harmonies.cache_clear()
+
+
+def write(directory, file_name, harmonies):
+    (directory / file_name).write_text(json.dumps({"harmonies": harmonies}), encoding="utf-8")
+
+
+def test_loads_builtins(paths):
+    names = [harmony.name for harmony in registry.load_harmonies()]
+
+    assert "complementary" in names
+    assert len(names) == len(set(names))
+
+
+def test_later_paths_override(paths):
+    user, show = paths
+    write(user, "user.json", [{"name": "complementary", "colors": [{"hue_offset": 90}]}])
+    write(show, "show.json", [{"name": "complementary", "colors": [{"hue_offset": 150}],
+                               "tooltip": "show"}])
+
+    harmonies = {harmony.name: harmony for harmony in registry.load_harmonies()}
+
+    assert harmonies["complementary"] == Harmony(name="complementary",
+                                                 colors=(Color(hue_offset=150.0),), tooltip="show")
+
+
+def test_malformed_user_file_is_skipped(paths, caplog):
+    user, show = paths
+    (user / "broken.json").write_text("{", encoding="utf-8")
+    write(show, "show.json", [{"name": "negative", "colors": [{"value_scale": -1}]},
+                              {"name": "valid", "colors": [{"hue_offset": 45}]}])
+
+    with caplog.at_level(logging.WARNING, logger=registry.__name__):
+        names = [harmony.name for harmony in registry.load_harmonies()]
+
+    assert "valid" in names
+    assert "negative" not in names
+    assert "broken.json" in caplog.text
+    assert "negative" in caplog.text
+
+
+def test_malformed_builtin_raises(paths, tmp_path, monkeypatch):
+    builtin = tmp_path / "builtin"
+    builtin.mkdir()
+    write(builtin, "builtin.json", [{"name": "unknown", "colors": [{"hue": 45}]}])
+    monkeypatch.setattr(registry, "BUILTIN_PATH", str(builtin))
+
+    with pytest.raises(ValueError, match="unknown fields"):
+        registry.load_harmonies()
+
+
+def test_compile_harmony():
+    harmony = Harmony(name="triad", colors=(Color(hue_offset=120.0), Color(hue_offset=240.0, value_scale=0.5)))
+
+    assert registry.compile_harmony(harmony) == ((120.0, 1.0, 1.0), (240.0, 1.0, 0.5))
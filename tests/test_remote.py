@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from nuke_color_harmony.remote import LinkReceiver, RemoteLinker, decode, encode
+
+RGBAS = [(0.25, 0.5, 0.75, 1.0), (2.5, 0.0, 0.1, 1.0)]
+
+
+class Collector(object):
+
+    def __init__(self, expected=None) -> None:
+        self.updates = []
+        self.expected = expected
+        self.received = threading.Event()
+
+    def __call__(self, rgbas: list) -> None:
+        self.updates.append((time.monotonic(), rgbas))
+        if self.expected is None or rgbas == self.expected:
+            self.received.set()
+
+
+@pytest.fixture
+def link():
+    started = []
+
+    def start(collector, **options):
+        receiver = LinkReceiver(collector, port=0)
+        receiver.start()
+        sender = RemoteLinker(port=receiver.address[1], **options)
+        sender.start()
+        started.append((receiver, sender))
+        return sender
+
+    yield start
+    for receiver, sender in started:
+        sender.stop()
+        receiver.stop()
+
+
+def test_encode_round_trip():
+    assert decode(encode(RGBAS)) == RGBAS
+
+
+@pytest.mark.parametrize("line", [b"[]", b'{"colors": 1}', b'{"colors": [[1, 2]]}',
+                                  b'{"colors": [[true, 0, 0]]}', b"not json"])
+def test_decode_rejects(line):
+    with pytest.raises(ValueError):
+        decode(line)
+
+
+def test_socket_round_trip(link):
+    collector = Collector()
+    sender = link(collector)
+
+    sender.write(RGBAS)
+
+    assert collector.received.wait(5.0)
+    assert collector.updates[-1][1] == RGBAS
+
+
+def test_receiver_coalesces_burst():
+    scheduled = []
+    collector = Collector()
+    receiver = LinkReceiver(collector, schedule=scheduled.append, port=0)
+    try:
+        for value in range(100):
+            receiver.receive([(value / 100, 0.0, 0.0, 1.0)])
+
+        assert len(scheduled) == 1
+        scheduled.pop()()
+        assert [rgbas for __, rgbas in collector.updates] == [[(0.99, 0.0, 0.0, 1.0)]]
+
+        receiver.receive(RGBAS)
+        assert len(scheduled) == 1
+    finally:
+        receiver.stop()
+
+
+def test_sender_rate_limit(link):
+    max_rate = 20
+    latest = [(1.0, 1.0, 1.0, 1.0)]
+    collector = Collector(expected=latest)
+    sender = link(collector, max_rate=max_rate)
+
+    start = time.monotonic()
+    while time.monotonic() - start < 0.5:
+        sender.write([(time.monotonic() - start, 0.0, 0.0, 1.0)])
+        time.sleep(0.001)
+    sender.write(latest)
+    duration = time.monotonic() - start
+
+    assert collector.received.wait(5.0)
+    # One update may be sent right away, every further one waits for the interval.
+    assert len(collector.updates) <= duration * max_rate + 2
+    assert collector.updates[-1][1] == latest
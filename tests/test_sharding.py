@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from nuke_color_harmony.formatter import csv_line
+from nuke_color_harmony.incremental import write_incremental
+from nuke_color_harmony.sharding import export_sharded
+
+RGB_SETS = [(f"harmony{index}", [(index / 50, 0.5, 0.25), (0.1, 0.2, 0.3)])
+            for index in range(23)]
+FRAME = {"width": 1920, "height": 1080, "nuke_version": "13.2 v5"}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_concatenated_csv(tmp_path, workers):
+    path = tmp_path / "palettes.csv"
+
+    manifest = export_sharded(str(path), RGB_SETS, shard_size=5, workers=workers,
+                              concatenate=True)
+
+    content = path.read_bytes()
+    assert content == "".join(csv_line(rgbs, "|") for __, rgbs in RGB_SETS).encode("utf-8")
+    assert [content[offset:offset + length] for offset, length in manifest["concatenated"]["offsets"]] \
+        == [csv_line(rgbs, "|").encode("utf-8") for __, rgbs in RGB_SETS]
+    assert [shard["count"] for shard in manifest["shards"]] == [5, 5, 5, 5, 3]
+    assert json.loads((tmp_path / "palettes.manifest.json").read_text()) == manifest
+
+
+def test_concatenated_nk_matches_script(tmp_path):
+    path = tmp_path / "palettes.nk"
+    script = tmp_path / "script.nk"
+
+    export_sharded(str(path), RGB_SETS, shard_size=4, workers=1, concatenate=True, **FRAME)
+    write_incremental(str(script), RGB_SETS, patch=False, **FRAME)
+
+    assert path.read_bytes() == script.read_bytes()
+
+
+def test_shard_offsets(tmp_path):
+    manifest = export_sharded(str(tmp_path / "palettes.csv"), RGB_SETS, shard_size=10, workers=1)
+
+    shard = manifest["shards"][1]
+    content = (tmp_path / shard["file"]).read_bytes()
+    offset, length = shard["offsets"][0]
+    assert shard["first"] == 10
+    assert content[offset:offset + length] == csv_line(RGB_SETS[10][1], "|").encode("utf-8")
@@ -0,0 +1,23 @@
+from nuke_color_harmony.harmonies import Color, Harmony
+from nuke_color_harmony.store import load_store, new_palette_id, save_store
+
+HARMONY = Harmony(name="complementary", colors=(Color(), Color(hue_offset=180.0)),
+                  tooltip="<b>Complementary</b>")
+
+
+def test_round_trip_keeps_ids(tmp_path):
+    path = str(tmp_path / "store.json")
+    palettes = [(new_palette_id(), None, HARMONY, [(1.0, 0.5, 0.0), (0.0, 0.5, 1.0)]),
+                (new_palette_id(), "Grays", HARMONY, [(0.2, 0.2, 0.2), (0.8, 0.8, 0.8)])]
+
+    save_store(path, palettes, {palettes[0][0]})
+
+    assert load_store(path) == (palettes, {palettes[0][0]})
+
+
+def test_missing_store_is_empty(tmp_path):
+    assert load_store(str(tmp_path / "missing.json")) == ([], set())
+
+
+def test_ids_are_unique():
+    assert new_palette_id() != new_palette_id()
@@ -0,0 +1,34 @@
+import pytest
+
+from nuke_color_harmony.tracing import TRACER, trace_methods
+
+
+@trace_methods
+class Traced(object):
+
+    def consume(self) -> list:
+        return list(self.produce())
+
+    def produce(self):
+        yield from range(3)
+
+    @staticmethod
+    def produce_static():
+        yield 1
+
+
+@pytest.fixture
+def tracer():
+    TRACER.clear()
+    TRACER.enable()
+    yield TRACER
+    TRACER.enable(False)
+    TRACER.clear()
+
+
+def test_generators_are_not_wrapped(tracer):
+    traced = Traced()
+
+    assert traced.consume() == [0, 1, 2]
+    assert list(traced.produce_static()) == [1]
+    assert [name for name, *__ in tracer.recorded()] == ["Traced.consume"]
@@ -0,0 +1,53 @@
+import pytest
+
+pytest.importorskip("PySide2")
+
+
+def test_build_panel(qapp):
+    from nuke_color_harmony.view import ColorHarmonyUi
+
+    ui = ColorHarmonyUi()
+    ui.show()
+    qapp.processEvents()
+
+    assert ui.colorwheel.current_color
+    ui.close()
+
+
+def test_switch_space(qapp):
+    from nuke_color_harmony.view import ColorHarmonyUi
+
+    ui = ColorHarmonyUi()
+    hsv = (ui.colorwheel.h, ui.colorwheel.s, ui.colorwheel.v)
+    ui.toggle_perceptual(True)
+    qapp.processEvents()
+    ui.toggle_perceptual(False)
+
+    assert (ui.colorwheel.h, ui.colorwheel.s, ui.colorwheel.v) == pytest.approx(hsv, abs=1e-3)
+    ui.close()
+
+
+def test_linked_colors_are_not_sent_back(qapp):
+    from unittest import mock
+
+    from nuke_color_harmony.linker import Linker
+    from nuke_color_harmony.view import ColorHarmonyUi
+
+    ui = ColorHarmonyUi()
+    ui.show()
+    qapp.processEvents()
+    linker = Linker()
+    linker.write = mock.Mock()
+    ui._controller._linker = linker
+    ui._live_link_activated = True
+
+    # Scene linear base color, as edited on a linked group in Nuke.
+    ui.apply_linked_colors([(2.5, 0.4, 0.1, 1.0), (0.1, 0.4, 0.9, 1.0)])
+    ui.colorwheel.repaint()
+    qapp.processEvents()
+    linker.write.assert_not_called()
+
+    # Edits in the panel are sent again.
+    ui.randomize_values()
+    linker.write.assert_called()
+    ui.close()
@@ -0,0 +1,77 @@
+import io
+import json
+
+import pytest
+
+from nuke_color_harmony.library import read_ase, read_gpl
+from nuke_color_harmony.writers import AseWriter, get_writer, load_writers
+
+RGB_SETS = [("complementary", [(1.0, 0.5, 0.0), (0.0, 0.5, 1.0)]),
+            ("triad", [(0.2, 0.4, 0.6), (0.6, 0.2, 0.4), (0.4, 0.6, 0.2)])]
+
+
+def write(name: str, **options):
+    writer = get_writer(name, **options)
+    sink = io.BytesIO() if writer.binary else io.StringIO()
+    assert writer.write(sink, iter(RGB_SETS)) == len(RGB_SETS)
+    return sink.getvalue()
+
+
+def test_builtin_writers():
+    assert {"csv", "json", "hex", "gpl", "ase", "ocio"} <= set(load_writers())
+
+
+def test_ase_round_trip():
+    content = write("ase")
+
+    # Header, then a group start, one block per color and a group end per set.
+    assert content[:12] == b"ASEF\x00\x01\x00\x00\x00\x00\x00\x09"
+    palettes = list(read_ase(content))
+    assert [name for name, __ in palettes] == ["complementary 1", "triad 2"]
+    for (__, rgbs), (__, expected) in zip(palettes, RGB_SETS):
+        assert [value for rgb in rgbs for value in rgb] \
+            == pytest.approx([value for rgb in expected for value in rgb])
+
+
+def test_ase_after_offset():
+    sink = io.BytesIO(b"prefix")
+    sink.seek(6)
+    AseWriter().write(sink, RGB_SETS)
+
+    assert len(list(read_ase(sink.getvalue()[6:]))) == 2
+
+
+def test_ase_needs_seekable_sink():
+    class Stream(io.BytesIO):
+        def seekable(self):
+            return False
+
+    with pytest.raises(ValueError):
+        AseWriter().write(Stream(), RGB_SETS)
+
+
+def test_gpl_round_trip():
+    palettes = list(read_gpl(write("gpl").encode("utf-8"), chunk_size=5))
+
+    assert [name for name, __ in palettes] == ["nuke_color_harmony"]
+    assert palettes[0][1] == [tuple(round(value * 255) / 255 for value in rgb)
+                              for __, rgbs in RGB_SETS for rgb in rgbs]
+
+
+def test_json():
+    assert json.loads(write("json")) == [{"harmony": name, "colors": [list(rgb) for rgb in rgbs]}
+                                         for name, rgbs in RGB_SETS]
+
+
+def test_json_empty():
+    assert get_writer("json").write(io.StringIO(), []) == 0
+
+
+def test_ocio():
+    assert write("ocio", color_transform="acescg").splitlines()[:5] == [
+        "# nuke_color_harmony palettes",
+        "colorspace: ACEScg",
+        "palettes:",
+        '  - name: "complementary"',
+        "    colors: [[1.000000, 0.500000, 0.000000], [0.000000, 0.500000, 1.000000]]"]
+    assert write("ocio", color_transform=None).splitlines()[1] == "colorspace: Raw"